@@ -18,6 +18,8 @@ from services.oci_speech_realtime import start_realtime_session, OCIAudioProcess
 
 import components as component
 import services.database as database
+from services.database.files import EXTRACTION_PAGE_SIZE
+from services.database.vector_store_registry import VECTOR_STORE_WARM_UP
 import services as service
 import utils as utils
 from utils.constants import language_map, map_state, reverse_map_state
@@ -54,6 +56,30 @@ if login:
         db_doc_service                = database.DocService()
         utl_function_service          = utils.FunctionService()
         db_user_service               = database.UserService()
+        db_module_service_async       = database.ModuleServiceAsync()
+        db_agent_service_async        = database.AgentServiceAsync()
+        db_file_service_async         = database.FileServiceAsync()
+        db_user_service_async         = database.UserServiceAsync()
+
+        # Cliente de embeddings y vector store compartidos: se construyen una vez por proceso
+        if VECTOR_STORE_WARM_UP:
+            database.VectorStoreRegistry().warm_up()
+
+        def get_extraction_text(file_id, height):
+            """
+            Shows the file extraction one page at a time (read on demand).
+            """
+            page = st.session_state.get(f"extraction_page_{file_id}", 1)
+            text, total_length = db_file_service.get_extraction(file_id, (page - 1) * EXTRACTION_PAGE_SIZE)
+            pages = max(1, -(-total_length // EXTRACTION_PAGE_SIZE))
+            st.text_area("Text", value=text, disabled=True, height=height)
+            if pages > 1:
+                st.number_input(
+                    f"Page (of {pages}, {total_length:,} characters)",
+                    min_value=1,
+                    max_value=pages,
+                    key=f"extraction_page_{file_id}"
+                )
         st.header(":material/book_ribbon: Knowledge")
         st.caption("Manage Knowledge")
         st.set_page_config(layout="wide")
@@ -65,8 +91,6 @@ if login:
         user_group_id = st.session_state["user_group_id"]
         language = st.session_state["language"]
 
-        df_files = db_file_service.get_all_files(user_id)
-
         # Variables: Default
         file_src_strategy   = None
         trg_type            = None
@@ -76,6 +100,36 @@ if login:
         if not st.session_state["show_form_app"]:
             with st.container(border=True):
                 st.badge("List Files")
+
+                # Filtros en la base de datos; la lista se lee por páginas (keyset)
+                df_modules_filter = db_module_service.get_modules(user_id)
+                module_names      = dict(zip(df_modules_filter["MODULE_ID"], df_modules_filter["MODULE_NAME"]))
+                filter_col1, filter_col2, filter_col3 = st.columns([0.3, 0.2, 0.5])
+                filter_module_id = filter_col1.selectbox(
+                    "Module",
+                    options=[None] + list(module_names),
+                    format_func=lambda mid: "All" if mid is None else module_names[mid],
+                    key="files_filter_module"
+                )
+                filter_state = filter_col2.selectbox(
+                    "Status",
+                    options=[None, 1, 2],
+                    format_func=lambda state: "All" if state is None else map_state[state],
+                    key="files_filter_state"
+                )
+                filter_name = filter_col3.text_input("Source File", key="files_filter_name").strip()
+
+                df_files = component.get_pager(
+                    "files_pager",
+                    lambda after_id: db_file_service.get_files_page(
+                        user_id,
+                        after_id,
+                        module_id=filter_module_id,
+                        file_state=filter_state,
+                        file_name=filter_name
+                    ),
+                    filters={"module_id": filter_module_id, "file_state": filter_state, "file_name": filter_name}
+                )
                 
                 if df_files.empty:
                     st.info("No files found.")
@@ -103,7 +157,6 @@ if login:
                             "FILE_TRG_TOT_TIME"   : None,
                             "FILE_TRG_LANGUAGE"   : None,
                             "FILE_TRG_PII"        : None,
-                            "FILE_TRG_EXTRACTION" : None,
                             "OWNER"               : None,
                             "FILE_DESCRIPTION"    : None,
                             "USER_EMAIL"          : None,
@@ -207,9 +260,6 @@ if login:
                                         msg = db_file_service.delete_file_user_by_user(file_id, user_id, file_name)
                                         component.get_success(msg, icon=":material/remove_circle:")
 
-                                db_file_service.get_all_files.clear()
-                                db_file_service.get_all_files(user_id)
-
                         except Exception as e:
                             component.get_error(f"[Error] Deleting File:\n{e}")
                         finally:
@@ -227,8 +277,11 @@ if login:
                 data = st.session_state["selected_file"]
 
                 if mode == "create":
-                    df_modules = db_module_service.get_modules_cache(user_id, force_update=True)
-                    df_agents = db_agent_service.get_all_agents_cache(user_id, force_update=True)
+                    # Consultas independientes en paralelo
+                    df_modules, df_agents = database.gather(
+                        db_module_service_async.get_modules(user_id),
+                        db_agent_service_async.get_all_agents(user_id)
+                    )
                     df_agents = df_agents[df_agents["AGENT_TYPE"] == "Extraction"]
 
                     if not df_modules.empty:
@@ -842,8 +895,6 @@ if login:
                                             )
 
                                         db_module_service.get_modules_files_cache(user_id, force_update=True)
-                                        db_file_service.get_all_files.clear()
-                                        db_file_service.get_all_files(user_id)
 
                                     component.get_success(msg_module)
 
@@ -912,11 +963,11 @@ if login:
                             except Exception as e:
                                 st.error(f"Error cargando imagen: {e}")
                         with col_text:
-                            st.text_area("Text", value=data["FILE_TRG_EXTRACTION"], disabled=True, height=840)
+                            get_extraction_text(data["FILE_ID"], height=840)
                         
 
                     else:
-                        st.text_area("Text", value=data["FILE_TRG_EXTRACTION"], disabled=True, height=500)
+                        get_extraction_text(data["FILE_ID"], height=500)
 
                     btn_col1, btn_col2 = st.columns([2.2, 8])
 
@@ -927,19 +978,19 @@ if login:
                 elif mode == "share":
                     file_id = data["FILE_ID"]
 
-                    # Usuarios ya compartidos para este archivo
-                    df = db_file_service.get_all_file_user_cache(user_id, force_update=True)
-                    
                     # Obtener el grupo del usuario actual
                     is_admin = data["USER_GROUP_ID"] == 0  
 
-                    # Cargar usuarios disponibles
+                    # Usuarios ya compartidos para este archivo y usuarios disponibles, en paralelo
+                    df, df_users = database.gather(
+                        db_file_service_async.get_all_file_user(user_id),
+                        db_user_service_async.get_all_users() if is_admin else db_user_service_async.get_all_user_group_shared(user_id)
+                    )
+
                     if is_admin:
-                        df_users = db_user_service.get_all_users_cache(force_update=True)
                         st.caption("You are sharing as **Administrator**. All users are available.")
                         row_users = df[df["FILE_ID"] == file_id]["USER_ID"].tolist()
                     else:
-                        df_users = db_user_service.get_all_user_group_shared_cache(user_id, force_update=True)
                         row_users = df[(df["FILE_ID"] == file_id) & (df["USER_GROUP_ID"] == user_group_id)]["USER_ID"].tolist()
                     
                     # Si no hay usuarios disponibles, mostrar mensaje
@@ -948,13 +999,16 @@ if login:
                     else:
                         old_users = row_users
 
+                        # Compartir con todo el grupo (INSERT ... SELECT en la base de datos)
+                        share_group = False if is_admin else st.toggle("Share with all users of my group")
+
                         selected_user_ids = st.pills(
                             "Select Users to Share With",
                             options=df_users["USER_ID"],
                             format_func=lambda uid: f"{uid}: {df_users.loc[df_users['USER_ID'] == uid, 'USER_USERNAME'].values[0]}",
                             selection_mode="multi",
                             default=old_users,
-                            disabled=df_users.empty
+                            disabled=df_users.empty or share_group
                         )
 
                         new_users = selected_user_ids
@@ -963,13 +1017,11 @@ if login:
 
                     if btn_col1.button("Save", type="primary", width="stretch", disabled=df_users.empty):
                         try:
-                            if set(old_users) != set(new_users):
+                            if share_group or set(old_users) != set(new_users):
                                 component.get_processing(True)
-                                msg = db_file_service.update_file_user(file_id, new_users)
+                                msg = db_file_service.update_file_user(file_id, user_group_id=user_group_id) if share_group else db_file_service.update_file_user(file_id, new_users)
                                 component.get_success(msg, icon=":material/update:")
                                 db_file_service.get_all_file_user_cache(user_id, force_update=True)
-                                db_file_service.get_all_files.clear()
-                                db_file_service.get_all_files(user_id)
                                 st.session_state["show_form_app"] = False
                                 st.rerun()
                             else:
@@ -5,6 +5,7 @@ from .st_processing import get_processing
 from .st_error import get_error
 from .st_success import get_success
 from .st_warning import get_warning
+from .st_pager import get_pager
 
 __all__ = [
     "get_toast",
@@ -13,5 +14,6 @@ __all__ = [
     "get_processing",
     "get_error",
     "get_success",
-    "get_warning"
+    "get_warning",
+    "get_pager"
 ]
\ No newline at end of file
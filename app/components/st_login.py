@@ -147,8 +147,9 @@ def get_menu(modules, user):
         if st.button(":material/exit_to_app: Sign out", type="secondary"):
             st.set_page_config(layout="centered")
             st.set_page_config(initial_sidebar_state="collapsed")
-            st.cache_data.clear()
-            st.cache_resource.clear()
+            # Solo se eliminan las consultas en caché de esta sesión
+            database.QueryCache().drop_user(st.session_state["user_id"])
+            database.AgentRegistry().drop_user(st.session_state["user_id"])
             st.session_state.clear()
             st.rerun()
 
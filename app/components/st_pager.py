@@ -0,0 +1,42 @@
+import streamlit as st
+
+def get_pager(key: str, fetch_page, filters: dict = None):
+    """
+    Keyset pagination for a list: keeps the after_id of every visited page
+    in the session and shows Previous/Next buttons.
+
+    Args:
+        key (str): Unique key for the list (session state and buttons).
+        fetch_page (callable): Receives the after_id of the page and returns
+                               (pd.DataFrame, next_after_id).
+        filters (dict): Current filters; when they change, the list goes
+                        back to the first page.
+
+    Returns:
+        pd.DataFrame: The rows of the current page.
+    """
+    state = st.session_state.setdefault(key, {"filters": filters, "after_ids": [None]})
+    if state["filters"] != filters:
+        state.update(filters=filters, after_ids=[None])
+
+    df, next_after_id = fetch_page(state["after_ids"][-1])
+
+    # La página quedó vacía (p. ej. tras borrar su último registro): volver a la anterior
+    if df.empty and len(state["after_ids"]) > 1:
+        state["after_ids"].pop()
+        st.rerun()
+
+    page = len(state["after_ids"])
+    col_prev, col_page, col_next, _ = st.columns([0.1, 0.1, 0.1, 0.7])
+
+    if col_prev.button(key=f"{key}_prev", help="Previous page", label="", type="secondary", width="stretch", icon=":material/chevron_left:", disabled=page == 1):
+        state["after_ids"].pop()
+        st.rerun()
+
+    col_page.caption(f"Page {page}")
+
+    if col_next.button(key=f"{key}_next", help="Next page", label="", type="secondary", width="stretch", icon=":material/chevron_right:", disabled=next_after_id is None):
+        state["after_ids"].append(next_after_id)
+        st.rerun()
+
+    return df
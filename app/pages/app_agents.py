@@ -9,6 +9,8 @@ import utils as utils
 db_module_service = database.ModuleService()
 db_agent_service = database.AgentService()
 db_user_service = database.UserService()
+db_agent_service_async = database.AgentServiceAsync()
+db_user_service_async = database.UserServiceAsync()
 
 st.set_page_config(
     page_title="Oracle AI Accelerator: Agents",
@@ -36,7 +38,6 @@ if login:
     
     user_id       = st.session_state["user_id"]
     user_group_id = st.session_state["user_group_id"]
-    df_agents     = db_agent_service.get_all_agents_cache(user_id, force_update=True)
     df_models     = db_agent_service.get_all_models()
     df_users      = db_user_service.get_all_users_cache()
 
@@ -44,6 +45,34 @@ if login:
         with st.container(border=True):
             st.badge("List Agents")
 
+            # Filtros en la base de datos; la lista se lee por páginas (keyset)
+            filter_col1, filter_col2, filter_col3 = st.columns([0.3, 0.2, 0.5])
+            filter_type = filter_col1.selectbox(
+                "Type",
+                options=[None, "Chat", "Extraction", "Analytics"],
+                format_func=lambda agent_type: "All" if agent_type is None else agent_type,
+                key="agents_filter_type"
+            )
+            filter_state = filter_col2.selectbox(
+                "Status",
+                options=[None, 1, 2],
+                format_func=lambda state: "All" if state is None else map_agent_state[state],
+                key="agents_filter_state"
+            )
+            filter_name = filter_col3.text_input("Name", key="agents_filter_name").strip()
+
+            df_agents = component.get_pager(
+                "agents_pager",
+                lambda after_id: db_agent_service.get_agents_page(
+                    user_id,
+                    after_id,
+                    agent_type=filter_type,
+                    agent_state=filter_state,
+                    agent_name=filter_name
+                ),
+                filters={"agent_type": filter_type, "agent_state": filter_state, "agent_name": filter_name}
+            )
+
             if df_agents.empty:
                 st.info("No agents found.")
             else:
@@ -285,19 +314,19 @@ if login:
             elif mode == "share":
                 agent_id = data["AGENT_ID"]
                 
-                # Usuarios ya compartidos para este agente
-                df = db_agent_service.get_all_agent_user_cache(user_id, force_update=True)
-                
                 # Obtener el grupo del usuario actual
                 is_admin = data["USER_GROUP_ID"] == 0  
 
-                # Cargar usuarios disponibles
+                # Usuarios ya compartidos para este agente y usuarios disponibles, en paralelo
+                df, df_users = database.gather(
+                    db_agent_service_async.get_all_agent_user(user_id),
+                    db_user_service_async.get_all_users() if is_admin else db_user_service_async.get_all_user_group_shared(user_id)
+                )
+
                 if is_admin:
-                    df_users = db_user_service.get_all_users_cache(force_update=True)
                     st.caption("You are sharing as **Administrator**. All users are available.")
                     row_users = df[(df["AGENT_ID"] == agent_id)]["USER_ID"].tolist()
                 else:
-                    df_users = db_user_service.get_all_user_group_shared_cache(user_id, force_update=True)
                     row_users = df[(df["AGENT_ID"] == agent_id) & (df["USER_GROUP_ID"] == user_group_id)]["USER_ID"].tolist()
                 
                 # Si no hay usuarios disponibles, mostrar mensaje
@@ -306,13 +335,16 @@ if login:
                 else:
                     old_users = row_users
 
+                    # Compartir con todo el grupo (INSERT ... SELECT en la base de datos)
+                    share_group = False if is_admin else st.toggle("Share with all users of my group")
+
                     selected_user_ids = st.pills(
                         "Select Users to Share With",
                         options=df_users["USER_ID"],
                         format_func=lambda uid: f"{uid}: {df_users.loc[df_users['USER_ID'] == uid, 'USER_USERNAME'].values[0]}",
                         selection_mode="multi",
                         default=old_users,
-                        disabled=df_users.empty
+                        disabled=df_users.empty or share_group
                     )
 
                     new_users = selected_user_ids
@@ -321,9 +353,9 @@ if login:
 
                 if btn_col1.button("Save", type="primary", width="stretch", disabled=df_users.empty):
                     try:
-                        if set(old_users) != set(new_users):
+                        if share_group or set(old_users) != set(new_users):
                             component.get_processing(True)
-                            msg = db_agent_service.update_agent_user(agent_id, new_users)
+                            msg = db_agent_service.update_agent_user(agent_id, user_group_id=user_group_id) if share_group else db_agent_service.update_agent_user(agent_id, new_users)
                             component.get_success(msg, icon=":material/update:")
                             db_agent_service.get_all_agent_user_cache(user_id, force_update=True)
                             db_agent_service.get_all_agents_cache(user_id, force_update=True)
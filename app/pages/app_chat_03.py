@@ -12,6 +12,7 @@ import components as component
 import services.database as database
 import services as service
 import utils as utils
+from services.oci_generative_ai_chat import RAG_STREAMING
 
 # Initialize the service
 db_doc_service = database.DocService()
@@ -254,15 +255,14 @@ if login:
             
             start_time = time.time()
 
-            # Obtenemos la Retrieval Chain + modelo
-            chain = generative_service.get_chain(
-                file_id      = st.session_state["chat-objects"],
-                user_id      = user_id,
-                agent_id     = st.session_state["chat-agent"],
-                history      = messages_for_langchain,
-                input        = chat_human_prompt_input,
-                input_imagen = chat_human_prompt_image_input
-            )
+            chain_args = {
+                "file_id"      : st.session_state["chat-objects"],
+                "user_id"      : user_id,
+                "agent_id"     : st.session_state["chat-agent"],
+                "history"      : messages_for_langchain,
+                "input"        : chat_human_prompt_input,
+                "input_imagen" : chat_human_prompt_image_input
+            }
 
             #
             llm = generative_service.get_llm(user_id, st.session_state["chat-agent"])
@@ -270,21 +270,31 @@ if login:
             # Limpiamos la imagen de la sesión una vez usada
             st.session_state["chat-image"] = None            
 
-            elapsed_time = time.time() - start_time
-
-            # 3. Extraemos la respuesta final
-            chat_ai_answer = chain["answer"]
-
-            # 4. Calcular tokens (usando la utilidad del llm_model)
-            tokens_ids    = llm.get_token_ids(chat_ai_answer)
-            answer_tokens = len(tokens_ids)
-            token_rate    = answer_tokens / elapsed_time if elapsed_time > 0 else 0.0
-            chat_tokens_rate_answer = f"{token_rate:.2f} tokens/s"
-
             # Muestra la respuesta en la UI
             placeholder = st.empty()
             with placeholder.chat_message("ai", avatar="images/llm_meta.svg"):
-                st.markdown(chat_ai_answer)
+                if RAG_STREAMING:
+                    # 3. Respuesta token a token; TTFT y tokens/s medidos sobre el stream real
+                    stream         = generative_service.stream_chain(**chain_args)
+                    chat_ai_answer = st.write_stream(stream)
+                    chat_ai_answer = chat_ai_answer if isinstance(chat_ai_answer, str) else stream.answer
+                    answer_tokens  = stream.timings.get("tokens", 0)
+                    token_rate     = stream.timings.get("tokens_per_second", 0.0)
+                    chat_tokens_rate_answer = f"{token_rate:.2f} tokens/s · TTFT {stream.timings.get('ttft', 0.0):.2f} s"
+                else:
+                    # Obtenemos la Retrieval Chain + modelo
+                    chain = generative_service.get_chain(**chain_args)
+                    elapsed_time = time.time() - start_time
+
+                    # 3. Extraemos la respuesta final
+                    chat_ai_answer = chain["answer"]
+                    st.markdown(chat_ai_answer)
+
+                    # 4. Calcular tokens (usando la utilidad del llm_model)
+                    tokens_ids    = llm.get_token_ids(chat_ai_answer)
+                    answer_tokens = len(tokens_ids)
+                    token_rate    = answer_tokens / elapsed_time if elapsed_time > 0 else 0.0
+                    chat_tokens_rate_answer = f"{token_rate:.2f} tokens/s"
                 
                 # También calculamos los tokens de entrada
                 input_tokens = len(llm.get_token_ids(chat_human_prompt_input))
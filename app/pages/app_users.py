@@ -12,6 +12,7 @@ db_user_service            = database.UserService()
 db_select_ai_service       = database.SelectAIService()
 select_ai_service          = service.SelectAIService()
 select_ai_rag_service      = service.SelectAIRAGService()
+user_purge_service         = service.UserPurgeService()
 db_module_service          = database.ModuleService()
 db_agent_service           = database.AgentService()
 utl_function_service       = utils.FunctionService()
@@ -105,7 +106,7 @@ if login:
                                 user_id = row["USER_ID"]
                                 username = row["USER_USERNAME"]
 
-                                msg = db_user_service.delete_user(user_id, username)
+                                msg = user_purge_service.purge_user(user_id, username)
                                 component.get_success(msg, icon=":material/remove_circle:")
 
                             db_user_service.get_all_users_cache(force_update=True)
@@ -115,6 +116,26 @@ if login:
                     finally:
                         component.get_processing(False)
 
+            # Progreso de las eliminaciones en segundo plano (USER_PURGE)
+            df_purge = db_user_service.get_all_user_purge()
+            if not df_purge.empty and (df_purge["PURGE_STATE"] != 3).any():
+                with st.expander("User deletions in progress", icon=":material/auto_delete:"):
+                    df_purge["State"] = df_purge["PURGE_STATE"].map({1: "Running", 2: "Cleaning up", 3: "Done", 0: "Error"})
+                    st.dataframe(
+                        df_purge[["USER_USERNAME", "PURGE_STAGE", "PURGE_DOCS", "PURGE_FILES", "PURGE_AGENTS", "State", "PURGE_MESSAGE"]],
+                        column_config={
+                            "USER_USERNAME": "Username",
+                            "PURGE_STAGE": "Stage",
+                            "PURGE_DOCS": "Docs",
+                            "PURGE_FILES": "Files",
+                            "PURGE_AGENTS": "Agents",
+                            "PURGE_MESSAGE": "Message"
+                        },
+                        hide_index=True
+                    )
+                    if st.button("Refresh", icon=":material/refresh:"):
+                        st.rerun()
+
     # User form (create/edit)
     if st.session_state["show_form_users"]:
         mode = st.session_state["form_mode_users"]
@@ -7,10 +7,12 @@ from .oci_select_ai_rag import SelectAIRAGService
 from .oci_document_understanding import DocumentUnderstandingService
 from .oci_speech import SpeechService
 from .oci_document_multimodal import DocumentMultimodalService
+from .oci_generative_ai_pool import LLMPool
 from .oci_generative_ai_chat import GenerativeAIService
 from .open_anonymizer_engine import AnalyzerEngineService
 from .oci_speech_realtime import start_realtime_session, stop_realtime_session
 from .oci_ai_agent import DBMSAIAgentService
+from .user_purge import UserPurgeService
 
 __all__ = [
     "ClientService",
@@ -21,8 +23,10 @@ __all__ = [
     "SpeechService",
     "DocumentMultimodalService",
     "GenerativeAIService",
+    "LLMPool",
     "AnalyzerEngineService",
     "DBMSAIAgentService",
+    "UserPurgeService",
     "start_realtime_session",
     "stop_realtime_session",
 ]
@@ -1,11 +1,22 @@
-from .users import UserService
-from .modules import ModuleService
-from .agent import AgentService
-from .files import FileService
+from .users import UserService, UserServiceAsync
+from .modules import ModuleService, ModuleServiceAsync
+from .agent import AgentService, AgentServiceAsync
+from .files import FileService, FileServiceAsync
 from .docs import DocService
+from .vector_ingest import VectorIngest
+from .embedding_cache import EmbeddingCache
 from .select_ai import SelectAIService
 from .select_ai_rag import SelectAIRAGService
 from .dbms_ai_agent import DBMSAIAgentService
+from .connection_async import gather
+from .cache import QueryCache
+from .agent_registry import AgentConfig, AgentRegistry
+from .vector_store_registry import VectorStoreRegistry
+from .retrieval_cache import RetrievalCache, RewriteCache
+from .docs_retriever import DocsRetriever
+from .vector_index import VectorIndexService
+from .chunker import get_chunker, count_tokens, PAGE_SEPARATOR
+from .context_packer import ContextPacker, get_context_budget
 
 __all__ = [
     "UserService",
@@ -13,7 +24,27 @@ __all__ = [
     "AgentService",
     "FileService",
     "DocService",
+    "VectorIngest",
+    "EmbeddingCache",
     "SelectAIService",
     "SelectAIRAGService",
-    "DBMSAIAgentService"
+    "DBMSAIAgentService",
+    "UserServiceAsync",
+    "ModuleServiceAsync",
+    "AgentServiceAsync",
+    "FileServiceAsync",
+    "gather",
+    "QueryCache",
+    "AgentConfig",
+    "AgentRegistry",
+    "VectorStoreRegistry",
+    "RetrievalCache",
+    "RewriteCache",
+    "DocsRetriever",
+    "VectorIndexService",
+    "get_chunker",
+    "count_tokens",
+    "PAGE_SEPARATOR",
+    "ContextPacker",
+    "get_context_budget"
 ]
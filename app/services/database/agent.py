@@ -1,6 +1,143 @@
-import streamlit as st
 import pandas as pd
-from services.database.connection import Connection
+from services.database.connection import Connection, fetch_df
+from services.database.connection_async import AsyncConnection
+from services.database.cache import QueryCache, cached
+
+# Rows per page in the agent list (get_agents_page)
+AGENTS_PAGE_SIZE = 50
+
+AGENTS_BASE_QUERY = """
+    SELECT 
+        A.AGENT_ID,
+        A.AGENT_MODEL_ID,
+        AM.AGENT_MODEL_NAME,
+        AM.AGENT_MODEL_TYPE,
+        AM.AGENT_MODEL_PROVIDER,
+        A.AGENT_NAME,
+        A.AGENT_DESCRIPTION,
+        A.AGENT_TYPE,
+        A.AGENT_MAX_OUT_TOKENS,
+        A.AGENT_TEMPERATURE,
+        A.AGENT_TOP_P,
+        A.AGENT_TOP_K,
+        A.AGENT_FREQUENCY_PENALTY,
+        A.AGENT_PRESENCE_PENALTY,
+        A.AGENT_PROMPT_SYSTEM,
+        A.AGENT_PROMPT_MESSAGE,
+        A.AGENT_DATE,
+        A.AGENT_STATE,
+        AU1.USER_ID,
+        U1.USER_GROUP_ID,
+        AU2.OWNER,
+        AU2.USER_ID AS USER_ID_OWNER,                
+        U2.USER_USERNAME,
+        U2.USER_EMAIL
+    FROM 
+        AGENTS A
+    LEFT JOIN
+        AGENT_MODELS AM 
+        ON A.AGENT_MODEL_ID = AM.AGENT_MODEL_ID
+    JOIN
+        AGENT_USER AU1
+        ON AU1.AGENT_ID = A.AGENT_ID
+        AND AU1.USER_ID = :user_id
+    JOIN
+        USERS U1
+        ON U1.USER_ID = AU1.USER_ID
+    JOIN 
+        AGENT_USER AU2 
+        ON AU2.AGENT_ID = A.AGENT_ID
+        AND AU2.OWNER = 1
+    JOIN
+        USERS U2
+        ON U2.USER_ID = AU2.USER_ID
+    WHERE 
+        A.AGENT_STATE <> 0
+"""
+
+# Share count of the listed rows: one grouped join over the rows of the
+# list (AGENT_ID IN ...) instead of a correlated COUNT per row
+AGENTS_SHARES_QUERY = """
+    SELECT P.*, NVL(SC.AGENT_USERS, 0) AS AGENT_USERS
+    FROM ITEMS P
+    LEFT JOIN (
+        SELECT X.AGENT_ID, COUNT(1) AS AGENT_USERS
+        FROM AGENT_USER X
+        WHERE X.OWNER <> 1
+        AND X.AGENT_ID IN (SELECT AGENT_ID FROM ITEMS)
+        GROUP BY X.AGENT_ID
+    ) SC
+        ON SC.AGENT_ID = P.AGENT_ID
+    ORDER BY P.AGENT_ID DESC
+"""
+
+GET_ALL_AGENTS_QUERY = f"""
+    WITH ITEMS AS (
+{AGENTS_BASE_QUERY}
+    )
+{AGENTS_SHARES_QUERY}
+"""
+
+# Keyset pagination: rows after :after_id (newest first) with optional
+# filters; :page_rows is the page size + 1 to know if there is a next page
+GET_AGENTS_PAGE_QUERY = f"""
+    WITH ITEMS AS (
+{AGENTS_BASE_QUERY}
+        AND (:after_id IS NULL OR A.AGENT_ID < :after_id)
+        AND (:agent_type IS NULL OR A.AGENT_TYPE = :agent_type)
+        AND (:agent_state IS NULL OR A.AGENT_STATE = :agent_state)
+        AND (:agent_name IS NULL OR INSTR(UPPER(A.AGENT_NAME), UPPER(:agent_name)) > 0)
+        ORDER BY A.AGENT_ID DESC
+        FETCH FIRST :page_rows ROWS ONLY
+    )
+{AGENTS_SHARES_QUERY}
+"""
+
+GET_ALL_MODELS_QUERY = """
+    SELECT 
+        AM.AGENT_MODEL_ID,
+        AM.AGENT_MODEL_NAME,
+        AM.AGENT_MODEL_TYPE,
+        AM.AGENT_MODEL_PROVIDER,
+        AM.AGENT_MODEL_SERVICE_ENDPOINT,
+        AM.AGENT_MODEL_DATE
+    FROM AGENT_MODELS AM
+    WHERE 
+        AM.AGENT_MODEL_STATE = 1
+        AND AM.AGENT_MODEL_ID > 0
+    ORDER BY 
+        AM.AGENT_MODEL_ID ASC
+"""
+
+GET_ALL_AGENT_USER_QUERY = """
+    SELECT 
+        FU.AGENT_USER_ID,
+        FU.AGENT_ID,
+        F.AGENT_NAME,
+        F.AGENT_DESCRIPTION,
+        FU.USER_ID,
+        U.USER_USERNAME,
+        U.USER_NAME || ', ' || U.USER_LAST_NAME AS USER_FULL_NAME,
+        UG.USER_GROUP_ID,
+        UG.USER_GROUP_NAME,
+        FU.OWNER,
+        FU.AGENT_USER_STATE,
+        FU.AGENT_USER_DATE
+    FROM
+        AGENT_USER FU
+    JOIN AGENTS F 
+        ON FU.AGENT_ID = F.AGENT_ID
+    JOIN USERS U
+        ON FU.USER_ID = U.USER_ID
+    JOIN USER_GROUP UG
+        ON U.USER_GROUP_ID = UG.USER_GROUP_ID
+    WHERE
+        FU.USER_ID <> :user_id
+        AND FU.OWNER <> 1
+        AND F.AGENT_STATE <> 0
+    ORDER BY
+        FU.AGENT_USER_ID
+"""
 
 class AgentService:
     """
@@ -9,20 +146,21 @@ class AgentService:
 
     def __init__(self):
         """
-        Initializes the ModuleService with a shared database connection instance.
+        Initializes the AgentService with the shared connection manager; each
+        operation takes its own session through acquire().
         """
         self.conn_instance = Connection()
-        self.conn = self.conn_instance.get_connection()
+        self.cache         = QueryCache()
 
     def get_all_agents_cache(self, user_id, force_update=False):
         """
         Cached wrapper to retrieve agents assigned to specific user_id.
         """
         if force_update:
-            self.get_all_agents.clear()
+            self.get_all_agents.clear(user_id)
         return self.get_all_agents(user_id)
 
-    @st.cache_data
+    @cached("agents")
     def get_all_agents(_self, user_id):
         """
         Retrieves all agents assigned to the provided user_id, with model information included.
@@ -33,141 +171,130 @@ class AgentService:
         Returns:
             pd.DataFrame: List of agents assigned to user_id with model details.
         """
-        query = """
-            SELECT 
-                A.AGENT_ID,
-                A.AGENT_MODEL_ID,
-                AM.AGENT_MODEL_NAME,
-                AM.AGENT_MODEL_TYPE,
-                AM.AGENT_MODEL_PROVIDER,
-                A.AGENT_NAME,
-                A.AGENT_DESCRIPTION,
-                A.AGENT_TYPE,
-                A.AGENT_MAX_OUT_TOKENS,
-                A.AGENT_TEMPERATURE,
-                A.AGENT_TOP_P,
-                A.AGENT_TOP_K,
-                A.AGENT_FREQUENCY_PENALTY,
-                A.AGENT_PRESENCE_PENALTY,
-                A.AGENT_PROMPT_SYSTEM,
-                A.AGENT_PROMPT_MESSAGE,
-                A.AGENT_DATE,
-                A.AGENT_STATE,
-                AU1.USER_ID,
-                U1.USER_GROUP_ID,
-                AU2.OWNER,
-                AU2.USER_ID AS USER_ID_OWNER,                
-                U2.USER_USERNAME,
-                U2.USER_EMAIL,
-                (
-                    SELECT COUNT(1)
-                    FROM AGENT_USER FU3
-                    WHERE FU3.AGENT_ID = A.AGENT_ID
-                    AND FU3.OWNER <> 1
-                ) AS AGENT_USERS                              
-            FROM 
-                AGENTS A
-            LEFT JOIN
-                AGENT_MODELS AM 
-                ON A.AGENT_MODEL_ID = AM.AGENT_MODEL_ID
-            JOIN
-                AGENT_USER AU1
-                ON AU1.AGENT_ID = A.AGENT_ID
-                AND AU1.USER_ID = :user_id
-            JOIN
-                USERS U1
-                ON U1.USER_ID = AU1.USER_ID
-            JOIN 
-                AGENT_USER AU2 
-                ON AU2.AGENT_ID = A.AGENT_ID
-                AND AU2.OWNER = 1
-            JOIN
-                USERS U2
-                ON U2.USER_ID = AU2.USER_ID
-            WHERE 
-                A.AGENT_STATE <> 0
-            ORDER BY 
-                A.AGENT_ID DESC
+        return _self.conn_instance.read_df(GET_ALL_AGENTS_QUERY, params={"user_id": user_id})
+
+    @cached("agents")
+    def get_agents_page(
+            _self,
+            user_id,
+            after_id=None,
+            page_size=AGENTS_PAGE_SIZE,
+            agent_type=None,
+            agent_state=None,
+            agent_name=None
+        ):
+        """
+        Retrieves one page of the agents of a user, newest first. Pages are
+        read by keyset (AGENT_ID < after_id), so every page costs the same.
+
+        Args:
+            user_id (int): The ID of the user.
+            after_id (int): Last AGENT_ID of the previous page (None for the first page).
+            page_size (int): Rows per page.
+            agent_type (str): Only agents of this type.
+            agent_state (int): Only agents in this state.
+            agent_name (str): Only agents whose name contains this text.
+
+        Returns:
+            tuple: (pd.DataFrame, next_after_id); next_after_id is None on the last page.
         """
-        return pd.read_sql(query, con=_self.conn, params={"user_id": user_id})
+        df = _self.conn_instance.read_df(GET_AGENTS_PAGE_QUERY, params={
+            "user_id": user_id,
+            "after_id": after_id,
+            "agent_type": agent_type,
+            "agent_state": agent_state,
+            "agent_name": agent_name or None,
+            "page_rows": page_size + 1
+        })
+        if len(df) > page_size:
+            df = df.head(page_size)
+            return df, int(df["AGENT_ID"].iloc[-1])
+        return df, None
 
     def copy_agent_to_admin(self, user_id):
         """
         Sincroniza los agentes compartidos por el admin (USER_ID = 0) con el usuario dado.
         Primero elimina los agentes no compartidos por el admin y luego inserta los nuevos.
         """
-        query = """
-        DECLARE
-            agent_names VARCHAR2(4000) := '';
-            separator   VARCHAR2(5) := '';
-        BEGIN
-            -- Primero eliminar agentes que ya no están compartidos por el admin
-            DELETE FROM AGENT_USER AU_USER
-            WHERE AU_USER.USER_ID = :user_id
-            AND AU_USER.OWNER = 0
-            AND NOT EXISTS (
-                SELECT 1
-                FROM AGENT_USER AU_ADMIN
-                WHERE AU_ADMIN.AGENT_ID = AU_USER.AGENT_ID
-                AND AU_ADMIN.USER_ID = 0
-            );
-
-            -- Luego insertar nuevos agentes compartidos por admin
-            FOR base_agent IN (
-                SELECT A.AGENT_ID, A.AGENT_NAME
-                FROM AGENTS A
-                JOIN AGENT_USER AU_ADMIN ON AU_ADMIN.AGENT_ID = A.AGENT_ID
-                WHERE AU_ADMIN.USER_ID = 0
-                AND A.AGENT_STATE <> 0
+        with self.conn_instance.acquire() as conn:
+            query = """
+            DECLARE
+                agent_names VARCHAR2(4000) := '';
+                separator   VARCHAR2(5) := '';
+            BEGIN
+                -- Primero eliminar agentes que ya no están compartidos por el admin
+                DELETE FROM AGENT_USER AU_USER
+                WHERE AU_USER.USER_ID = :user_id
+                AND AU_USER.OWNER = 0
                 AND NOT EXISTS (
                     SELECT 1
-                    FROM AGENT_USER AU_USER
-                    WHERE AU_USER.AGENT_ID = A.AGENT_ID
-                    AND AU_USER.USER_ID = :user_id
-                )
-            ) LOOP
-                INSERT INTO AGENT_USER (
-                    agent_user_id,
-                    agent_id,
-                    user_id,
-                    owner
-                ) VALUES (
-                    agent_user_id_seq.NEXTVAL,
-                    base_agent.agent_id,
-                    :user_id,
-                    0
+                    FROM AGENT_USER AU_ADMIN
+                    WHERE AU_ADMIN.AGENT_ID = AU_USER.AGENT_ID
+                    AND AU_ADMIN.USER_ID = 0
                 );
 
-                agent_names := agent_names || separator || base_agent.agent_name;
-                separator := ', ';
-            END LOOP;
-
-            :agent_names := agent_names;
-        END;
-        """
-
-        with self.conn.cursor() as cur:
-            agent_name_var = cur.var(str)
-            cur.execute(query, {"user_id": user_id, "agent_names": agent_name_var})
-        self.conn.commit()
-
-        return f"Agent(s): {agent_name_var.getvalue()} has been assigned successfully."
+                -- Luego insertar nuevos agentes compartidos por admin
+                FOR base_agent IN (
+                    SELECT A.AGENT_ID, A.AGENT_NAME
+                    FROM AGENTS A
+                    JOIN AGENT_USER AU_ADMIN ON AU_ADMIN.AGENT_ID = A.AGENT_ID
+                    WHERE AU_ADMIN.USER_ID = 0
+                    AND A.AGENT_STATE <> 0
+                    AND NOT EXISTS (
+                        SELECT 1
+                        FROM AGENT_USER AU_USER
+                        WHERE AU_USER.AGENT_ID = A.AGENT_ID
+                        AND AU_USER.USER_ID = :user_id
+                    )
+                ) LOOP
+                    INSERT INTO AGENT_USER (
+                        agent_user_id,
+                        agent_id,
+                        user_id,
+                        owner
+                    ) VALUES (
+                        agent_user_id_seq.NEXTVAL,
+                        base_agent.agent_id,
+                        :user_id,
+                        0
+                    );
+
+                    agent_names := agent_names || separator || base_agent.agent_name;
+                    separator := ', ';
+                END LOOP;
+
+                :agent_names := agent_names;
+            END;
+            """
+
+            with conn.cursor() as cur:
+                agent_name_var = cur.var(str)
+                cur.execute(query, {"user_id": user_id, "agent_names": agent_name_var})
+            conn.commit()
+            self.cache.invalidate("agents")
+            self.cache.invalidate("agent_user")
+
+            return f"Agent(s): {agent_name_var.getvalue()} has been assigned successfully."
 
 
     def delete_agent_user_by_user(self, agent_id, user_id, agent_name):
-        delete_query = """
-            DELETE FROM AGENT_USER
-            WHERE AGENT_ID = :agent_id AND USER_ID = :user_id
-        """
-        with self.conn.cursor() as cur:
-            cur.execute(delete_query, {
-                "agent_id": agent_id,
-                "user_id": user_id
-            })
-
-        return f"You have been removed from access to agent **{agent_name}**."
-
-    @st.cache_data
+        with self.conn_instance.acquire() as conn:
+            delete_query = """
+                DELETE FROM AGENT_USER
+                WHERE AGENT_ID = :agent_id AND USER_ID = :user_id
+            """
+            with conn.cursor() as cur:
+                cur.execute(delete_query, {
+                    "agent_id": agent_id,
+                    "user_id": user_id
+                })
+
+            # El dueño ve el número de usuarios del agente
+            self.cache.invalidate("agents")
+            self.cache.invalidate("agent_user")
+            return f"You have been removed from access to agent **{agent_name}**."
+
+    @cached("models", per_user=False)
     def get_all_models(_self):
         """
         Retrieves all active agent models from the database.
@@ -175,22 +302,7 @@ class AgentService:
         Returns:
             pd.DataFrame: A DataFrame containing agent model information.
         """
-        query = """
-            SELECT 
-                AM.AGENT_MODEL_ID,
-                AM.AGENT_MODEL_NAME,
-                AM.AGENT_MODEL_TYPE,
-                AM.AGENT_MODEL_PROVIDER,
-                AM.AGENT_MODEL_SERVICE_ENDPOINT,
-                AM.AGENT_MODEL_DATE
-            FROM AGENT_MODELS AM
-            WHERE 
-                AM.AGENT_MODEL_STATE = 1
-                AND AM.AGENT_MODEL_ID > 0
-            ORDER BY 
-                AM.AGENT_MODEL_ID ASC
-        """
-        return pd.read_sql(query, con=_self.conn)
+        return _self.conn_instance.read_df(GET_ALL_MODELS_QUERY)
     
     def insert_agent(
             self,
@@ -230,78 +342,80 @@ class AgentService:
             str: A message indicating the result of the operation.
         """
 
-        # Primero validar si ya existe un agente con el mismo nombre
-        query = """
-            SELECT 1 FROM AGENTS
-            WHERE AGENT_NAME = :agent_name
-        """
-        df = pd.read_sql(query, con=self.conn, params={"agent_name": agent_name})
-
-        if not df.empty:
-            raise ValueError(f"Agent '{agent_name}' already exists. Please choose a different name.")
-
-        # Insertamos el nuevo agente
-        with self.conn.cursor() as cur:
-            agent_id_var = cur.var(int)
-            cur.execute("""
-                INSERT INTO AGENTS (
-                    AGENT_MODEL_ID,
-                    AGENT_NAME,
-                    AGENT_DESCRIPTION,
-                    AGENT_TYPE,
-                    AGENT_MAX_OUT_TOKENS,
-                    AGENT_TEMPERATURE,
-                    AGENT_TOP_P,
-                    AGENT_TOP_K,
-                    AGENT_FREQUENCY_PENALTY,
-                    AGENT_PRESENCE_PENALTY,
-                    AGENT_PROMPT_SYSTEM,
-                    AGENT_PROMPT_MESSAGE
-                ) VALUES (
-                    :agent_model_id,
-                    :agent_name,
-                    :agent_description,
-                    :agent_type,
-                    :agent_max_out_tokens,
-                    :agent_temperature,
-                    :agent_top_p,
-                    :agent_top_k,
-                    :agent_frequency_penalty,
-                    :agent_presence_penalty,
-                    :agent_prompt_system,
-                    :agent_prompt_message
-                ) RETURNING AGENT_ID INTO :agent_id
-            """, {
-                "agent_model_id": agent_model_id,
-                "agent_name": agent_name,
-                "agent_description": agent_description,
-                "agent_type": agent_type,
-                "agent_max_out_tokens": agent_max_out_tokens,
-                "agent_temperature": agent_temperature,
-                "agent_top_p": agent_top_p,
-                "agent_top_k": agent_top_k,
-                "agent_frequency_penalty": agent_frequency_penalty,
-                "agent_presence_penalty": agent_presence_penalty,
-                "agent_prompt_system": agent_prompt_system,
-                "agent_prompt_message": agent_prompt_message,
-                "agent_id": agent_id_var
-            })
-        self.conn.commit()
-
-        agent_id = agent_id_var.getvalue()[0]
-
-        # Insertamos la relación AGENT_USER
-        with self.conn.cursor() as cur:
-            cur.execute("""
-                INSERT INTO AGENT_USER (AGENT_ID, USER_ID)
-                VALUES (:agent_id, :user_id)
-            """, {
-                "agent_id": int(agent_id),
-                "user_id": int(user_id)
-            })
-        self.conn.commit()
-
-        return f"Agent '{agent_name}' has been created successfully.", agent_id
+        with self.conn_instance.acquire() as conn:
+            # Primero validar si ya existe un agente con el mismo nombre
+            query = """
+                SELECT 1 FROM AGENTS
+                WHERE AGENT_NAME = :agent_name
+            """
+            df = fetch_df(conn, query, params={"agent_name": agent_name})
+
+            if not df.empty:
+                raise ValueError(f"Agent '{agent_name}' already exists. Please choose a different name.")
+
+            # Insertamos el nuevo agente
+            with conn.cursor() as cur:
+                agent_id_var = cur.var(int)
+                cur.execute("""
+                    INSERT INTO AGENTS (
+                        AGENT_MODEL_ID,
+                        AGENT_NAME,
+                        AGENT_DESCRIPTION,
+                        AGENT_TYPE,
+                        AGENT_MAX_OUT_TOKENS,
+                        AGENT_TEMPERATURE,
+                        AGENT_TOP_P,
+                        AGENT_TOP_K,
+                        AGENT_FREQUENCY_PENALTY,
+                        AGENT_PRESENCE_PENALTY,
+                        AGENT_PROMPT_SYSTEM,
+                        AGENT_PROMPT_MESSAGE
+                    ) VALUES (
+                        :agent_model_id,
+                        :agent_name,
+                        :agent_description,
+                        :agent_type,
+                        :agent_max_out_tokens,
+                        :agent_temperature,
+                        :agent_top_p,
+                        :agent_top_k,
+                        :agent_frequency_penalty,
+                        :agent_presence_penalty,
+                        :agent_prompt_system,
+                        :agent_prompt_message
+                    ) RETURNING AGENT_ID INTO :agent_id
+                """, {
+                    "agent_model_id": agent_model_id,
+                    "agent_name": agent_name,
+                    "agent_description": agent_description,
+                    "agent_type": agent_type,
+                    "agent_max_out_tokens": agent_max_out_tokens,
+                    "agent_temperature": agent_temperature,
+                    "agent_top_p": agent_top_p,
+                    "agent_top_k": agent_top_k,
+                    "agent_frequency_penalty": agent_frequency_penalty,
+                    "agent_presence_penalty": agent_presence_penalty,
+                    "agent_prompt_system": agent_prompt_system,
+                    "agent_prompt_message": agent_prompt_message,
+                    "agent_id": agent_id_var
+                })
+            conn.commit()
+
+            agent_id = agent_id_var.getvalue()[0]
+
+            # Insertamos la relación AGENT_USER
+            with conn.cursor() as cur:
+                cur.execute("""
+                    INSERT INTO AGENT_USER (AGENT_ID, USER_ID)
+                    VALUES (:agent_id, :user_id)
+                """, {
+                    "agent_id": int(agent_id),
+                    "user_id": int(user_id)
+                })
+            conn.commit()
+
+            self.cache.invalidate("agents", [user_id])
+            return f"Agent '{agent_name}' has been created successfully.", agent_id
 
     def update_agent(
             self,
@@ -337,58 +451,168 @@ class AgentService:
         Returns:
             str: A message indicating success.
         """
-        with self.conn.cursor() as cur:
-            cur.execute("""
-                UPDATE AGENTS SET 
-                    AGENT_MODEL_ID          = :agent_model_id,
-                    AGENT_NAME              = :agent_name,
-                    AGENT_DESCRIPTION       = :agent_description,
-                    AGENT_MAX_OUT_TOKENS    = :agent_max_out_tokens,
-                    AGENT_TEMPERATURE       = :agent_temperature,
-                    AGENT_TOP_P             = :agent_top_p,
-                    AGENT_TOP_K             = :agent_top_k,
-                    AGENT_FREQUENCY_PENALTY = :agent_frequency_penalty,
-                    AGENT_PRESENCE_PENALTY  = :agent_presence_penalty,
-                    AGENT_PROMPT_SYSTEM     = :agent_prompt_system,
-                    AGENT_PROMPT_MESSAGE    = :agent_prompt_message,
-                    AGENT_STATE             = :state
-                WHERE AGENT_ID = :agent_id
-            """, {
-                "agent_model_id": agent_model_id,
-                "agent_name": agent_name,
-                "agent_description": agent_description,
-                "agent_max_out_tokens": agent_max_out_tokens,
-                "agent_temperature": agent_temperature,
-                "agent_top_p": agent_top_p,
-                "agent_top_k": agent_top_k,
-                "agent_frequency_penalty": agent_frequency_penalty,
-                "agent_presence_penalty": agent_presence_penalty,
-                "agent_prompt_system": agent_prompt_system,
-                "agent_prompt_message": agent_prompt_message,
-                "state": state,
-                "agent_id": agent_id
-            })
-        self.conn.commit()
-        return f"Agent '{agent_name}' has been updated successfully."
-
-    def update_agent_user(self, agent_id, user_ids):
-        delete_query = "DELETE FROM AGENT_USER WHERE AGENT_ID = :agent_id AND OWNER = 0"
-        with self.conn.cursor() as cur:
-            cur.execute(delete_query, {"agent_id": agent_id})
-            for uid in user_ids:
-                cur.execute(
-                    "INSERT INTO AGENT_USER (AGENT_USER_ID, AGENT_ID, USER_ID, OWNER) VALUES (AGENT_USER_ID_SEQ.NEXTVAL, :agent_id, :user_id, 0)",
-                    {"agent_id": agent_id, "user_id": uid}
-                )
-        self.conn.commit()
-        return f"Agent User relations for Agent ID [{agent_id}] updated successfully."
+        with self.conn_instance.acquire() as conn:
+            with conn.cursor() as cur:
+                cur.execute("""
+                    UPDATE AGENTS SET 
+                        AGENT_MODEL_ID          = :agent_model_id,
+                        AGENT_NAME              = :agent_name,
+                        AGENT_DESCRIPTION       = :agent_description,
+                        AGENT_MAX_OUT_TOKENS    = :agent_max_out_tokens,
+                        AGENT_TEMPERATURE       = :agent_temperature,
+                        AGENT_TOP_P             = :agent_top_p,
+                        AGENT_TOP_K             = :agent_top_k,
+                        AGENT_FREQUENCY_PENALTY = :agent_frequency_penalty,
+                        AGENT_PRESENCE_PENALTY  = :agent_presence_penalty,
+                        AGENT_PROMPT_SYSTEM     = :agent_prompt_system,
+                        AGENT_PROMPT_MESSAGE    = :agent_prompt_message,
+                        AGENT_STATE             = :state
+                    WHERE AGENT_ID = :agent_id
+                """, {
+                    "agent_model_id": agent_model_id,
+                    "agent_name": agent_name,
+                    "agent_description": agent_description,
+                    "agent_max_out_tokens": agent_max_out_tokens,
+                    "agent_temperature": agent_temperature,
+                    "agent_top_p": agent_top_p,
+                    "agent_top_k": agent_top_k,
+                    "agent_frequency_penalty": agent_frequency_penalty,
+                    "agent_presence_penalty": agent_presence_penalty,
+                    "agent_prompt_system": agent_prompt_system,
+                    "agent_prompt_message": agent_prompt_message,
+                    "state": state,
+                    "agent_id": agent_id
+                })
+            conn.commit()
+            self.cache.invalidate("agents")
+            return f"Agent '{agent_name}' has been updated successfully."
+
+    def update_agent_user(self, agent_id, user_ids=None, user_group_id=None):
+        """
+        Sets the users an agent is shared with (non-owner AGENT_USER rows) to the
+        given user list, or to all active users of a group.
+
+        Only the difference with the current share list is applied: removed
+        users are deleted and new users inserted set-based (NOT EXISTS), so
+        unchanged rows are kept. A group share is applied with INSERT ... SELECT,
+        without bringing the users to Python.
+
+        The change runs in one PL/SQL block, so it is applied whole or not at
+        all, and the AGENTS row is locked (FOR UPDATE) so two concurrent edits
+        of the list are applied one after the other instead of duplicating rows.
+
+        Args:
+            agent_id (int): The agent ID to update.
+            user_ids (list): User IDs to share this agent with.
+            user_group_id (int): Share with every active user of this group instead.
+
+        Returns:
+            str: Success message.
+        """
+        with self.conn_instance.acquire() as conn:
+            if user_group_id is not None:
+                with conn.cursor() as cur:
+                    cur.execute("""
+                        DECLARE
+                            v_agent_id AGENTS.AGENT_ID%TYPE;
+                        BEGIN
+                            SELECT AGENT_ID INTO v_agent_id
+                            FROM AGENTS
+                            WHERE AGENT_ID = :agent_id
+                            FOR UPDATE;
+
+                            DELETE FROM AGENT_USER
+                            WHERE AGENT_ID = :agent_id
+                            AND OWNER = 0
+                            AND USER_ID NOT IN (
+                                SELECT USER_ID FROM USERS
+                                WHERE USER_GROUP_ID = :user_group_id AND USER_STATE <> 0
+                            );
+
+                            INSERT INTO AGENT_USER (AGENT_USER_ID, AGENT_ID, USER_ID, OWNER)
+                            SELECT AGENT_USER_ID_SEQ.NEXTVAL, :agent_id, U.USER_ID, 0
+                            FROM USERS U
+                            WHERE U.USER_GROUP_ID = :user_group_id
+                            AND U.USER_STATE <> 0
+                            AND NOT EXISTS (
+                                SELECT 1 FROM AGENT_USER X
+                                WHERE X.AGENT_ID = :agent_id AND X.USER_ID = U.USER_ID
+                            );
+                        END;
+                    """, {"agent_id": agent_id, "user_group_id": user_group_id})
+                conn.commit()
+                self.cache.invalidate("agents")
+                self.cache.invalidate("agent_user")
+                return f"Agent User relations for Agent ID [{agent_id}] updated successfully."
+
+            user_list = conn.gettype("SYS.ODCINUMBERLIST")
+            with conn.cursor() as cur:
+                linked_var  = cur.var(user_list)
+                added_var   = cur.var(user_list)
+                changed_var = cur.var(int)
+                cur.execute("""
+                    DECLARE
+                        v_agent_id AGENTS.AGENT_ID%TYPE;
+                        v_users    SYS.ODCINUMBERLIST := :user_ids;
+                        v_linked   SYS.ODCINUMBERLIST;
+                        v_added    SYS.ODCINUMBERLIST;
+                        v_changed  NUMBER;
+                    BEGIN
+                        SELECT AGENT_ID INTO v_agent_id
+                        FROM AGENTS
+                        WHERE AGENT_ID = :agent_id
+                        FOR UPDATE;
+
+                        -- Lista actual: usuarios compartidos (OWNER = 0) y dueños
+                        SELECT USER_ID BULK COLLECT INTO v_linked
+                        FROM AGENT_USER
+                        WHERE AGENT_ID = v_agent_id;
+
+                        DELETE FROM AGENT_USER
+                        WHERE AGENT_ID = v_agent_id
+                        AND OWNER = 0
+                        AND USER_ID NOT IN (SELECT COLUMN_VALUE FROM TABLE(v_users));
+                        v_changed := SQL%ROWCOUNT;
+
+                        SELECT U.COLUMN_VALUE BULK COLLECT INTO v_added
+                        FROM TABLE(v_users) U
+                        WHERE NOT EXISTS (
+                            SELECT 1 FROM AGENT_USER X
+                            WHERE X.AGENT_ID = v_agent_id AND X.USER_ID = U.COLUMN_VALUE
+                        );
+
+                        FORALL i IN 1 .. v_added.COUNT
+                            INSERT INTO AGENT_USER (AGENT_USER_ID, AGENT_ID, USER_ID, OWNER)
+                            VALUES (AGENT_USER_ID_SEQ.NEXTVAL, v_agent_id, v_added(i), 0);
+
+                        :changed := v_changed + v_added.COUNT;
+                        :linked  := v_linked;
+                        :added   := v_added;
+                    END;
+                """, {
+                    "agent_id": agent_id,
+                    "user_ids": user_list.newobject(sorted({int(user_id) for user_id in user_ids or []})),
+                    "linked": linked_var,
+                    "added": added_var,
+                    "changed": changed_var
+                })
+            conn.commit()
+
+            # Solo cambia la lista de los usuarios vinculados (dueños y compartidos) y de los nuevos
+            if changed_var.getvalue():
+                linked_users = {int(user_id) for user_id in linked_var.getvalue().aslist()}
+                added_users  = {int(user_id) for user_id in added_var.getvalue().aslist()}
+                self.cache.invalidate("agents", linked_users | added_users)
+                # La lista de compartidos de cualquier otro usuario puede incluir este registro
+                self.cache.invalidate("agent_user")
+            return f"Agent User relations for Agent ID [{agent_id}] updated successfully."
     
     def get_all_agent_user_cache(self, user_id, force_update=False):
         if force_update:
-            self.get_all_agent_user.clear()
+            self.get_all_agent_user.clear(user_id)
         return self.get_all_agent_user(user_id)
 
-    @st.cache_data
+    @cached("agent_user", "agents")
     def get_all_agent_user(_self, user_id):
         """
         Retrieves AGENT_USER records for agents shared with other users (excluding current user_id).
@@ -399,33 +623,53 @@ class AgentService:
         Returns:
             pd.DataFrame: Shared AGENT_USER records (excluding agents belonging to user_id).
         """
-        query = """
-            SELECT 
-                FU.AGENT_USER_ID,
-                FU.AGENT_ID,
-                F.AGENT_NAME,
-                F.AGENT_DESCRIPTION,
-                FU.USER_ID,
-                U.USER_USERNAME,
-                U.USER_NAME || ', ' || U.USER_LAST_NAME AS USER_FULL_NAME,
-                UG.USER_GROUP_ID,
-                UG.USER_GROUP_NAME,
-                FU.OWNER,
-                FU.AGENT_USER_STATE,
-                FU.AGENT_USER_DATE
-            FROM
-                AGENT_USER FU
-            JOIN AGENTS F 
-                ON FU.AGENT_ID = F.AGENT_ID
-            JOIN USERS U
-                ON FU.USER_ID = U.USER_ID
-            JOIN USER_GROUP UG
-                ON U.USER_GROUP_ID = UG.USER_GROUP_ID
-            WHERE
-                FU.USER_ID <> :user_id
-                AND FU.OWNER <> 1
-                AND F.AGENT_STATE <> 0
-            ORDER BY
-                FU.AGENT_USER_ID
+        return _self.conn_instance.read_df(GET_ALL_AGENT_USER_QUERY, params={"user_id": user_id})
+
+
+class AgentServiceAsync:
+    """
+    Asyncio variant of AgentService for the read queries a page loads at once.
+    Run them concurrently with services.database.gather(); results are
+    shared with the sync service through the QueryCache.
+    """
+    def __init__(self):
+        """
+        Initializes the AgentServiceAsync with the shared async connection manager.
+        """
+        self.conn_instance = AsyncConnection()
+
+    @cached("agents", name="AgentService.get_all_agents")
+    async def get_all_agents(self, user_id):
+        """
+        Retrieves all agents assigned to the provided user_id, with model information included.
+
+        Args:
+            user_id (int): The ID of the user.
+
+        Returns:
+            pd.DataFrame: List of agents assigned to user_id with model details.
+        """
+        return await self.conn_instance.read_df(GET_ALL_AGENTS_QUERY, params={"user_id": user_id})
+
+    @cached("models", per_user=False, name="AgentService.get_all_models")
+    async def get_all_models(self):
+        """
+        Retrieves all active agent models from the database.
+
+        Returns:
+            pd.DataFrame: A DataFrame containing agent model information.
+        """
+        return await self.conn_instance.read_df(GET_ALL_MODELS_QUERY)
+
+    @cached("agent_user", "agents", name="AgentService.get_all_agent_user")
+    async def get_all_agent_user(self, user_id):
+        """
+        Retrieves AGENT_USER records for agents shared with other users (excluding current user_id).
+
+        Args:
+            user_id (int): The ID of the current user.
+
+        Returns:
+            pd.DataFrame: Shared AGENT_USER records (excluding agents belonging to user_id).
         """
-        return pd.read_sql(query, con=_self.conn, params={"user_id": user_id})
+        return await self.conn_instance.read_df(GET_ALL_AGENT_USER_QUERY, params={"user_id": user_id})
@@ -0,0 +1,127 @@
+import threading
+from services.database.agent import AgentService
+from services.database.cache import QueryCache
+
+class AgentConfig:
+    """
+    Configuration of one agent (a row of AGENTS + AGENT_MODELS), as a
+    compact record instead of a DataFrame row.
+    """
+    __slots__ = (
+        "agent_id",
+        "agent_name",
+        "agent_type",
+        "model_id",
+        "model_name",
+        "model_type",
+        "model_provider",
+        "max_out_tokens",
+        "temperature",
+        "top_p",
+        "top_k",
+        "frequency_penalty",
+        "presence_penalty",
+        "prompt_system",
+        "prompt_message"
+    )
+
+    def __init__(self, row):
+        """
+        Args:
+            row (namedtuple): A row of get_all_agents (DataFrame.itertuples).
+        """
+        self.agent_id          = int(row.AGENT_ID)
+        self.agent_name        = str(row.AGENT_NAME)
+        self.agent_type        = str(row.AGENT_TYPE)
+        self.model_id          = int(row.AGENT_MODEL_ID)
+        self.model_name        = str(row.AGENT_MODEL_NAME)
+        self.model_type        = str(row.AGENT_MODEL_TYPE)
+        self.model_provider    = str(row.AGENT_MODEL_PROVIDER)
+        self.max_out_tokens    = int(row.AGENT_MAX_OUT_TOKENS)
+        self.temperature       = float(row.AGENT_TEMPERATURE)
+        self.top_p             = float(row.AGENT_TOP_P)
+        self.top_k             = int(row.AGENT_TOP_K)
+        self.frequency_penalty = float(row.AGENT_FREQUENCY_PENALTY)
+        self.presence_penalty  = float(row.AGENT_PRESENCE_PENALTY)
+        self.prompt_system     = str(row.AGENT_PROMPT_SYSTEM)
+        self.prompt_message    = str(row.AGENT_PROMPT_MESSAGE)
+
+    def model_kwargs(self):
+        """
+        Returns:
+            dict: Every generation parameter of the agent (model_kwargs).
+        """
+        return {
+            "max_tokens"        : self.max_out_tokens,
+            "temperature"       : self.temperature,
+            "top_p"             : self.top_p,
+            "top_k"             : self.top_k,
+            "frequency_penalty" : self.frequency_penalty,
+            "presence_penalty"  : self.presence_penalty
+        }
+
+class AgentRegistry:
+    """
+    Singleton registry of the agents a user can use, indexed by AGENT_ID.
+
+    Built from get_all_agents and kept while the "agents" version of the
+    QueryCache does not change, so the agent writes (AgentService,
+    ModuleService) invalidate it too. A lookup is a dict access: no
+    DataFrame scans per chat turn.
+    """
+    _instance = None
+    _lock = threading.Lock()
+
+    def __new__(cls):
+        if cls._instance is None:
+            with cls._lock:
+                if cls._instance is None:
+                    instance = super(AgentRegistry, cls).__new__(cls)
+                    instance._agent_service = AgentService()
+                    instance._users = {}
+                    cls._instance = instance
+        return cls._instance
+
+    def get_agents(self, user_id):
+        """
+        Returns the agents of a user.
+
+        Args:
+            user_id (int): The ID of the user.
+
+        Returns:
+            dict: {AGENT_ID: AgentConfig}.
+        """
+        user_id = int(user_id)
+        version = QueryCache().version("agents", user_id=user_id)
+        entry   = self._users.get(user_id)
+        if entry is None or entry[0] != version:
+            df_agents = self._agent_service.get_all_agents(user_id)
+            entry = (version, {
+                int(row.AGENT_ID): AgentConfig(row)
+                for row in df_agents.itertuples(index=False)
+            })
+            self._users[user_id] = entry
+        return entry[1]
+
+    def get(self, user_id, agent_id):
+        """
+        Returns the configuration of one agent of a user.
+
+        Args:
+            user_id (int): The ID of the user.
+            agent_id (int): The ID of the agent.
+
+        Returns:
+            AgentConfig: The agent configuration.
+
+        Raises:
+            KeyError: The user has no such agent.
+        """
+        return self.get_agents(user_id)[int(agent_id)]
+
+    def drop_user(self, user_id):
+        """
+        Removes the agents of a user (e.g. on logout).
+        """
+        self._users.pop(int(user_id), None)
@@ -0,0 +1,195 @@
+import os
+import time
+import inspect
+import threading
+import functools
+from collections import OrderedDict
+from dotenv import load_dotenv
+
+load_dotenv()
+
+class QueryCache:
+    """
+    Singleton cache shared by all Streamlit sessions for the read methods of
+    the database services (replaces the per-function st.cache_data).
+
+    Entries are keyed by method, arguments and user. Every entity (files,
+    agents, users, ...) has a version counter, global and per user; the
+    write methods bump them with invalidate(), so an entry is only served
+    while the versions it was read with are current. A write that only
+    touches some users invalidates just their entries, and logging out
+    drops only that user's entries (drop_user).
+    """
+    _instance = None
+    _lock = threading.Lock()
+
+    def __new__(cls):
+        if cls._instance is None:
+            with cls._lock:
+                if cls._instance is None:
+                    instance = super(QueryCache, cls).__new__(cls)
+                    instance._entries = OrderedDict()
+                    instance._versions = {}
+                    instance._user_versions = {}
+                    instance._data_lock = threading.RLock()
+                    instance._ttl = float(os.getenv('CON_CACHE_TTL', 600))
+                    instance._max_entries = int(os.getenv('CON_CACHE_MAX_ENTRIES', 1000))
+                    instance._stats = {"hits": 0, "misses": 0, "invalidations": 0}
+                    cls._instance = instance
+        return cls._instance
+
+    def _version(self, entities, user_id):
+        """Current versions of the entities, for a given user."""
+        return tuple(
+            (self._versions.get(entity, 0), self._user_versions.get((entity, user_id), 0))
+            for entity in entities
+        )
+
+    def version(self, *entities, user_id=None):
+        """
+        Returns the current versions of the entities (for a user); a change
+        means a write invalidated them. Lets other caches follow the same
+        invalidations.
+        """
+        with self._data_lock:
+            return self._version(entities, None if user_id is None else int(user_id))
+
+    def get(self, key, entities, user_id):
+        """
+        Returns (True, value) for a fresh entry or (False, None) on a miss.
+        """
+        with self._data_lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                version, created, value = entry
+                expired = self._ttl > 0 and time.monotonic() - created > self._ttl
+                if version == self._version(entities, user_id) and not expired:
+                    self._entries.move_to_end(key)
+                    self._stats["hits"] += 1
+                    return True, value
+                del self._entries[key]
+            self._stats["misses"] += 1
+            return False, None
+
+    def set(self, key, entities, user_id, version, value):
+        """
+        Stores a value read with the given versions; it is discarded if a
+        write bumped them while the query was running.
+        """
+        with self._data_lock:
+            if version != self._version(entities, user_id):
+                return
+            self._entries[key] = (version, time.monotonic(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, entity, user_ids=None):
+        """
+        Bumps the version of an entity, for the given users only or, without
+        user_ids, for everyone.
+        """
+        with self._data_lock:
+            self._stats["invalidations"] += 1
+            if user_ids is None:
+                self._versions[entity] = self._versions.get(entity, 0) + 1
+                return
+            for user_id in user_ids:
+                key = (entity, int(user_id))
+                self._user_versions[key] = self._user_versions.get(key, 0) + 1
+
+    def discard(self, name, args=None):
+        """
+        Removes the entries of one method (optionally only those whose
+        arguments start with args, e.g. a user_id).
+        """
+        with self._data_lock:
+            for key in [k for k in self._entries if k[0] == name and (args is None or k[1][:len(args)] == args)]:
+                del self._entries[key]
+
+    def drop_user(self, user_id):
+        """
+        Removes every entry read for a user (e.g. on logout).
+        """
+        with self._data_lock:
+            for key in [k for k in self._entries if k[2] == int(user_id)]:
+                del self._entries[key]
+
+    def clear(self):
+        """Removes every entry."""
+        with self._data_lock:
+            self._entries.clear()
+
+    def get_stats(self):
+        """
+        Returns:
+            dict: hits, misses, invalidations and current entries.
+        """
+        with self._data_lock:
+            stats = dict(self._stats)
+            stats["entries"] = len(self._entries)
+        return stats
+
+def _copy(value):
+    """Copies a cached value (DataFrames, also inside tuples)."""
+    if isinstance(value, tuple):
+        return tuple(_copy(item) for item in value)
+    return value.copy() if hasattr(value, "copy") else value
+
+def cached(*entities, per_user=True, name=None):
+    """
+    Caches a service read method in the shared QueryCache. Coroutine methods
+    (the *ServiceAsync variants) are cached the same way.
+
+    Args:
+        entities (str): Entities the result depends on; a write that
+                        invalidates any of them refreshes the entry.
+        per_user (bool): The first argument is the user_id the result
+                         belongs to (used for per-user invalidation and logout).
+        name (str): Cache key of the method (default: its qualified name).
+                    An async variant passes the name of its sync method so
+                    both read and clear the same entries.
+
+    The wrapped method gets a clear(*args) function that drops its entries,
+    all of them or only those whose arguments start with the given ones.
+    """
+    def decorator(func):
+        key_name  = name or func.__qualname__
+        signature = inspect.signature(func)
+
+        def lookup(self, args, kwargs):
+            # Mismos argumentos, misma clave: posicionales, nombrados o por defecto
+            bound = signature.bind(self, *args, **kwargs)
+            bound.apply_defaults()
+            args = tuple(bound.arguments.values())[1:]
+
+            cache = QueryCache()
+            user_id = int(args[0]) if per_user and args else None
+            key = (key_name, args, user_id)
+            found, value = cache.get(key, entities, user_id)
+            with cache._data_lock:
+                version = cache._version(entities, user_id)
+            return cache, key, user_id, args, found, value, version
+
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def wrapper(self, *args, **kwargs):
+                cache, key, user_id, args, found, value, version = lookup(self, args, kwargs)
+                if not found:
+                    value = await func(self, *args)
+                    cache.set(key, entities, user_id, version, value)
+                # Callers may modify the DataFrame; never hand out the cached one
+                return _copy(value)
+        else:
+            @functools.wraps(func)
+            def wrapper(self, *args, **kwargs):
+                cache, key, user_id, args, found, value, version = lookup(self, args, kwargs)
+                if not found:
+                    value = func(self, *args)
+                    cache.set(key, entities, user_id, version, value)
+                # Callers may modify the DataFrame; never hand out the cached one
+                return _copy(value)
+
+        wrapper.clear = lambda *args: QueryCache().discard(key_name, args or None)
+        return wrapper
+    return decorator
@@ -0,0 +1,245 @@
+import os
+import re
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Chunker of the modules without MODULE_CHUNKER
+CHUNKER_DEFAULT = os.getenv('CON_CHUNKER_DEFAULT', 'characters:512:51')
+
+# Page break between the pages of an extraction (process_pdf)
+PAGE_SEPARATOR = "\f"
+
+CHUNK_SEPARATORS = ("\n\n", "\n", ". ", " ")
+
+# Words and punctuation: an approximation of the model tokens without a tokenizer
+TOKEN_RE    = re.compile(r"\w+|[^\w\s]")
+SENTENCE_RE = re.compile(r"[^.!?\n]+(?:[.!?]+|\n|$)")
+SRT_CUE_RE  = re.compile(
+    r"^\s*(\d+)\s*\n"
+    r"\s*(\d{1,2}:\d{2}:\d{2}[,.]\d{3})\s*-->\s*(\d{1,2}:\d{2}:\d{2}[,.]\d{3})[^\n]*\n"
+    r"(.*?)(?=\n\s*\n|\Z)",
+    re.DOTALL | re.MULTILINE
+)
+
+def count_tokens(text):
+    """Approximate token count of a text."""
+    return len(TOKEN_RE.findall(text or ""))
+
+def normalize(text):
+    """Collapses whitespace as "normalize": "all" does."""
+    text = re.sub(r"[ \t\r\f\v]+", " ", text or "")
+    return re.sub(r"\n\s*\n+", "\n\n", text).strip()
+
+class Chunk:
+    """
+    One chunk of an extraction: its (normalized) text, where it comes from
+    in the extraction (character offsets) and what it covers (page, SRT cues).
+    """
+    __slots__ = ("text", "start", "end", "metadata")
+
+    def __init__(self, text, start, end, **metadata):
+        self.text     = text
+        self.start    = start
+        self.end      = end
+        self.metadata = metadata
+
+    def get_metadata(self):
+        """
+        Returns:
+            dict: The chunk fields stored in DOCS.METADATA (chunk_start, chunk_end, ...).
+        """
+        return {"chunk_start": self.start, "chunk_end": self.end, **self.metadata}
+
+class Unit:
+    """A span of the extraction the chunkers pack (token, sentence, SRT cue)."""
+    __slots__ = ("start", "end", "tokens", "metadata")
+
+    def __init__(self, start, end, tokens, **metadata):
+        self.start    = start
+        self.end      = end
+        self.tokens   = tokens
+        self.metadata = metadata
+
+def token_units(text, start=0, end=None):
+    """Every token of text[start:end] as a unit."""
+    return [Unit(m.start(), m.end(), 1) for m in TOKEN_RE.finditer(text, start, len(text) if end is None else end)]
+
+def sentence_units(text, start=0, end=None, max_tokens=None):
+    """
+    The sentences (or lines) of text[start:end] as units; a sentence longer
+    than max_tokens is cut into token units.
+    """
+    units = []
+    for m in SENTENCE_RE.finditer(text, start, len(text) if end is None else end):
+        tokens = count_tokens(m.group())
+        if not tokens:
+            continue
+        if max_tokens and tokens > max_tokens:
+            units.extend(token_units(text, m.start(), m.end()))
+        else:
+            units.append(Unit(m.start(), m.end(), tokens))
+    return units
+
+def pack(text, units, max_tokens, overlap_tokens=0, overlap_units=0, **metadata):
+    """
+    Groups consecutive units into chunks of at most max_tokens, repeating
+    the last overlap_units units (or up to overlap_tokens tokens of them)
+    at the start of the next chunk.
+
+    Returns:
+        list: The chunks (Chunk).
+    """
+    chunks = []
+    i = 0
+    while i < len(units):
+        j, tokens = i, 0
+        while j < len(units) and (j == i or tokens + units[j].tokens <= max_tokens):
+            tokens += units[j].tokens
+            j += 1
+        start, end = units[i].start, units[j - 1].end
+        chunk_text = normalize(text[start:end])
+        if chunk_text:
+            chunk_metadata = dict(metadata, chunk_tokens=tokens)
+            for unit in (units[i], units[j - 1]):
+                for name, value in unit.metadata.items():
+                    # Primer y último valor cubiertos (p. ej. cue_start/cue_end)
+                    chunk_metadata.setdefault(f"{name}_start", value[0] if isinstance(value, tuple) else value)
+                    chunk_metadata[f"{name}_end"] = value[-1] if isinstance(value, tuple) else value
+            chunks.append(Chunk(chunk_text, start, end, **chunk_metadata))
+        if j >= len(units):
+            break
+        k, back = j, 0
+        while k - 1 > i and (j - k < overlap_units or back + units[k - 1].tokens <= overlap_tokens):
+            k -= 1
+            back += units[k].tokens
+        i = k
+    return chunks
+
+class CharacterChunker:
+    """
+    Chunks of at most max_chars characters cut at the coarsest separator
+    that fits (paragraph, line, sentence, word), overlapping overlap
+    characters: what SP_VECTOR_STORE does with utl_to_chunks.
+    """
+    def __init__(self, max_chars=512, overlap=51):
+        self.max_chars = int(max_chars)
+        self.overlap   = int(overlap)
+        self.spec      = f"characters:{self.max_chars}:{self.overlap}"
+
+    def split(self, text):
+        text   = text or ""
+        chunks = []
+        start  = 0
+        while start < len(text):
+            end = min(start + self.max_chars, len(text))
+            if end < len(text):
+                for separator in CHUNK_SEPARATORS:
+                    cut = text.rfind(separator, start + self.overlap + 1, end)
+                    if cut != -1:
+                        end = cut + len(separator)
+                        break
+            chunk = normalize(text[start:end])
+            if chunk:
+                chunks.append(Chunk(chunk, start, end))
+            if end >= len(text):
+                break
+            start = max(end - self.overlap, start + 1)
+        return chunks
+
+class TokenChunker:
+    """
+    Chunks of max_tokens tokens overlapping overlap_tokens: fewer, fuller
+    chunks than the character limit on long texts (transcripts).
+    """
+    def __init__(self, max_tokens=256, overlap_tokens=32):
+        self.max_tokens     = int(max_tokens)
+        self.overlap_tokens = int(overlap_tokens)
+        self.spec           = f"tokens:{self.max_tokens}:{self.overlap_tokens}"
+
+    def split(self, text):
+        return pack(text or "", token_units(text or ""), self.max_tokens, self.overlap_tokens)
+
+class SentenceChunker:
+    """
+    Whole sentences packed up to max_tokens, the last overlap_sentences
+    repeated in the next chunk.
+    """
+    def __init__(self, max_tokens=256, overlap_sentences=1):
+        self.max_tokens        = int(max_tokens)
+        self.overlap_sentences = int(overlap_sentences)
+        self.spec              = f"sentence:{self.max_tokens}:{self.overlap_sentences}"
+
+    def split_range(self, text, start=0, end=None, **metadata):
+        units = sentence_units(text, start, end, self.max_tokens)
+        return pack(text, units, self.max_tokens, overlap_units=self.overlap_sentences, **metadata)
+
+    def split(self, text):
+        return self.split_range(text or "")
+
+class PageChunker:
+    """
+    Sentence chunks that never cross a page break (PAGE_SEPARATOR); each
+    chunk records its page number.
+    """
+    def __init__(self, max_tokens=512, overlap_sentences=1):
+        self.sentences = SentenceChunker(max_tokens, overlap_sentences)
+        self.spec      = f"page:{self.sentences.max_tokens}:{self.sentences.overlap_sentences}"
+
+    def split(self, text):
+        text   = text or ""
+        chunks = []
+        start  = 0
+        for page, page_text in enumerate(text.split(PAGE_SEPARATOR), start=1):
+            end = start + len(page_text)
+            chunks.extend(self.sentences.split_range(text, start, end, page=page))
+            start = end + len(PAGE_SEPARATOR)
+        return chunks
+
+class SrtChunker:
+    """
+    Consecutive SRT cues packed up to max_tokens, never splitting a cue;
+    each chunk records its first/last cue and time. A text without cues
+    (TXT transcription) is chunked by sentence.
+    """
+    def __init__(self, max_tokens=256, overlap_cues=1):
+        self.max_tokens   = int(max_tokens)
+        self.overlap_cues = int(overlap_cues)
+        self.spec         = f"srt:{self.max_tokens}:{self.overlap_cues}"
+
+    def split(self, text):
+        text  = text or ""
+        units = [
+            Unit(m.start(), m.end(), count_tokens(m.group(4)), cue=int(m.group(1)), time=(m.group(2), m.group(3)))
+            for m in SRT_CUE_RE.finditer(text)
+            if m.group(4).strip()
+        ]
+        if not units:
+            return SentenceChunker(self.max_tokens).split(text)
+
+        # El texto del chunk son solo los textos de los cues (sin índices ni tiempos)
+        chunks = pack(text, units, self.max_tokens, overlap_units=self.overlap_cues)
+        for chunk in chunks:
+            chunk.text = normalize(" ".join(m.group(4) for m in SRT_CUE_RE.finditer(text, chunk.start, chunk.end)))
+        return [chunk for chunk in chunks if chunk.text]
+
+# Chunkers by name: "name[:arg[:arg]]" (MODULES.MODULE_CHUNKER)
+CHUNKERS = {
+    "characters" : CharacterChunker,
+    "tokens"     : TokenChunker,
+    "sentence"   : SentenceChunker,
+    "page"       : PageChunker,
+    "srt"        : SrtChunker
+}
+
+def get_chunker(spec=None):
+    """
+    Returns the chunker of a spec such as "tokens:256:32" or "page:512".
+
+    Args:
+        spec (str): Name and numeric arguments (default CON_CHUNKER_DEFAULT).
+    """
+    name, *args = (spec or CHUNKER_DEFAULT).strip().lower().split(":")
+    if name not in CHUNKERS:
+        raise ValueError(f"Unknown chunker '{name}'. Options: {', '.join(CHUNKERS)}")
+    return CHUNKERS[name](*[int(arg) for arg in args if arg])
@@ -1,81 +1,505 @@
 import os
 import ads
+import time
+import threading
 import oracledb
+import pandas as pd
+import pyarrow as pa
+from contextlib import contextmanager
 from dotenv import load_dotenv
 
 load_dotenv()
 
+# Fetch CLOB/BLOB columns as str/bytes so results stay valid after a pooled
+# session is released (and DataFrames can be kept in the QueryCache).
+oracledb.defaults.fetch_lobs = False
+
+# Errors that mean the session is gone (network drop, idle kill, ADB restart)
+DEAD_SESSION_ERRORS = (
+    "DPY-4011",  # the database or network closed the connection
+    "DPY-1001",  # not connected to database
+    "ORA-03113", # end-of-file on communication channel
+    "ORA-03114", # not connected to ORACLE
+    "ORA-03135"  # connection lost contact
+)
+
+# Rows per round trip when fetching DataFrames (arraysize/prefetchrows).
+# The driver default (100) costs many round trips on big results.
+FETCH_ARRAYSIZE = int(os.getenv('CON_FETCH_ARRAYSIZE', 1000))
+FETCH_ARRAYSIZE_LARGE = int(os.getenv('CON_FETCH_ARRAYSIZE_LARGE', 10000))
+
+def _get_bool(name, default="False"):
+    """Reads a boolean flag from the environment."""
+    return os.getenv(name, default).strip().lower() in ("1", "true", "yes", "y")
+
+def get_db_config():
+    """
+    Returns the credentials/wallet settings shared by the sync and async layers.
+    """
+    return {
+        "user": os.getenv('CON_ADB_DEV_USER_NAME'),
+        "password": os.getenv('CON_ADB_DEV_PASSWORD'),
+        "dsn": os.getenv('CON_ADB_DEV_SERVICE_NAME'),
+        "config_dir": os.getenv('CON_ADB_WALLET_LOCATION'),
+        "wallet_location": os.getenv('CON_ADB_WALLET_LOCATION'),
+        "wallet_password": os.getenv('CON_ADB_WALLET_PASSWORD')
+    }
+
+def get_pool_config():
+    """
+    Returns the pool/health-check settings (CON_POOL_*, CON_CONNECT_*).
+    """
+    return {
+        "enabled": _get_bool('CON_POOL_ENABLED'),
+        "min": int(os.getenv('CON_POOL_MIN', 1)),
+        "max": int(os.getenv('CON_POOL_MAX', 4)),
+        "increment": int(os.getenv('CON_POOL_INCREMENT', 1)),
+        "ping_interval": int(os.getenv('CON_POOL_PING_INTERVAL', 60)),
+        "timeout": int(os.getenv('CON_POOL_TIMEOUT', 60)),
+        "wait_timeout": int(float(os.getenv('CON_POOL_WAIT_TIMEOUT', 30)) * 1000),
+        "stmtcachesize": int(os.getenv('CON_POOL_STMT_CACHE_SIZE', 40)),
+        "retry_count": int(os.getenv('CON_CONNECT_RETRY_COUNT', 3)),
+        "retry_delay": float(os.getenv('CON_CONNECT_RETRY_DELAY', 0.5)),
+        "session_sql": [
+            stmt.strip() for stmt in os.getenv('CON_POOL_SESSION_SQL', '').split(';') if stmt.strip()
+        ]
+    }
+
+def is_dead_session(error):
+    """
+    Checks whether an error (or any error it was raised from, e.g. the
+    pandas DatabaseError wrapping the driver error) means the session is gone.
+    """
+    while error is not None:
+        message = str(error)
+        if any(code in message for code in DEAD_SESSION_ERRORS):
+            return True
+        error = error.__cause__ or error.__context__
+    return False
+
+# Integer columns declared as plain NUMBER (IDs, states, counters). The Arrow
+# fetch types NUMBER(p, 0) as int64 already, but unconstrained NUMBER arrives
+# as float64 whatever it holds.
+INTEGER_COLUMN_SUFFIXES = (
+    "ID", "_STATE", "OWNER", "_COUNT", "_PII", "_VERSION", "_PAGES", "_CHARACTERS",
+    "_SIZE", "_USERS", "_AGENTS", "_FILES", "_DOCS", "_CHUNKS", "HITS", "MISSES", "EVICTIONS"
+)
+
+def is_integer_column(name):
+    """Checks whether a column is one of the known integer columns."""
+    return name.upper().endswith(INTEGER_COLUMN_SUFFIXES)
+
+def to_pandas(odf):
+    """
+    Converts an OracleDataFrame (python-oracledb Arrow fetch) to pandas
+    through pyarrow, without building Python row tuples.
+
+    Known integer columns (INTEGER_COLUMN_SUFFIXES) stored as unconstrained
+    NUMBER arrive as float64; they are turned back into int64 when they have
+    no NULLs, so IDs behave as with pd.read_sql. Other float columns are left
+    as they are, even when a given result only holds whole numbers.
+    """
+    df = pa.Table.from_arrays(odf.column_arrays(), names=odf.column_names()).to_pandas()
+    for column in df.select_dtypes(include="float64").columns:
+        if not is_integer_column(column):
+            continue
+        values = df[column]
+        if len(values) and values.notna().all() and (values % 1 == 0).all():
+            df[column] = values.astype("int64")
+    return df
+
+def rows_to_df(description, rows):
+    """
+    Builds a DataFrame from cursor rows; used for column types the Arrow
+    fetch does not support (DPY-3030).
+    """
+    return pd.DataFrame(rows, columns=[col[0] for col in description])
+
+def is_arrow_unsupported(error):
+    """Checks whether the Arrow fetch rejected one of the column types."""
+    return "DPY-3030" in str(error)
+
+def fetch_df(conn, query, params=None, arraysize=None):
+    """
+    Runs a query on an open connection and returns a pandas DataFrame using
+    the Arrow fetch (fetch_df_all) with a tuned arraysize.
+
+    Args:
+        conn (oracledb.Connection): Connection or acquired pool session.
+        query (str): SELECT statement.
+        params (dict): Bind variables.
+        arraysize (int): Rows per round trip (default CON_FETCH_ARRAYSIZE).
+
+    Returns:
+        pd.DataFrame: The query result.
+    """
+    arraysize = arraysize or FETCH_ARRAYSIZE
+    try:
+        return to_pandas(conn.fetch_df_all(statement=query, parameters=params, arraysize=arraysize))
+    except oracledb.NotSupportedError as e:
+        if not is_arrow_unsupported(e):
+            raise
+    with conn.cursor() as cur:
+        cur.arraysize = arraysize
+        cur.prefetchrows = arraysize
+        cur.execute(query, params or {})
+        return rows_to_df(cur.description, cur.fetchall())
+
 class Connection:
     """
-    Singleton class for managing a reusable Oracle database connection.
+    Singleton class for managing reusable Oracle database connections.
+
+    Works in two modes, selected with CON_POOL_ENABLED:
+      - Single: one shared connection reused throughout the application.
+      - Pooled: an oracledb session pool; each operation takes a session
+        with acquire() and gives it back when it finishes.
 
-    Ensures only one instance of the connection is created and reused throughout the application.
+    Sessions are only pinged after CON_POOL_PING_INTERVAL seconds without a
+    successful call. Dead sessions are detected from the real driver errors,
+    replaced, and idempotent reads (read_df/run) are retried once on a fresh
+    session. Reconnects and retries are counted in get_stats().
     """
     _instance = None
+    _lock = threading.Lock()
 
     def __new__(cls):
         if cls._instance is None:
-            cls._instance = super(Connection, cls).__new__(cls)
-            # Persist configuration to allow seamless reconnection
-            cls._instance._db_config = {
-                "user": os.getenv('CON_ADB_DEV_USER_NAME'),
-                "password": os.getenv('CON_ADB_DEV_PASSWORD'),
-                "dsn": os.getenv('CON_ADB_DEV_SERVICE_NAME'),
-                "config_dir": os.getenv('CON_ADB_WALLET_LOCATION'),
-                "wallet_location": os.getenv('CON_ADB_WALLET_LOCATION'),
-                "wallet_password": os.getenv('CON_ADB_WALLET_PASSWORD')
-            }
-            cls._instance.conn = cls._instance._create_connection()
+            with cls._lock:
+                if cls._instance is None:
+                    instance = super(Connection, cls).__new__(cls)
+                    # Persist configuration to allow seamless reconnection
+                    instance._db_config = get_db_config()
+                    instance._pool_config = get_pool_config()
+                    instance.conn = None
+                    instance.pool = None
+                    instance._conn_lock = threading.RLock()
+                    instance._stats_lock = threading.Lock()
+                    instance._last_used = 0.0
+                    instance._stats = {
+                        "pings": 0,
+                        "dead_sessions": 0,
+                        "reconnects": 0,
+                        "retries": 0
+                    }
+                    if instance._pool_config["enabled"]:
+                        instance.pool = instance._create_pool()
+                    else:
+                        instance.conn = instance._create_connection()
+                    cls._instance = instance
         return cls._instance
 
+    def _init_session(self, conn, requested_tag=None):
+        """
+        Session callback: runs the CON_POOL_SESSION_SQL statements once for
+        every new database session (e.g. ALTER SESSION settings).
+        """
+        if not self._pool_config["session_sql"]:
+            return
+        with conn.cursor() as cur:
+            for statement in self._pool_config["session_sql"]:
+                cur.execute(statement)
+
+    def _count(self, name):
+        """Increments one of the health counters."""
+        with self._stats_lock:
+            self._stats[name] += 1
+
     def _create_connection(self):
         """
-        Create a new database connection using the stored configuration.
+        Create a new database connection using the stored configuration,
+        retrying CON_CONNECT_RETRY_COUNT times on failure.
         """
-        conn = oracledb.connect(
+        conn = self._connect()
+        self._last_used = time.monotonic()
+        return conn
+
+    def _connect(self):
+        """
+        Opens a standalone connection in autocommit, retrying
+        CON_CONNECT_RETRY_COUNT times on failure.
+        """
+        for attempt in range(self._pool_config["retry_count"] + 1):
+            try:
+                conn = oracledb.connect(
+                    user=self._db_config["user"],
+                    password=self._db_config["password"],
+                    dsn=self._db_config["dsn"],
+                    config_dir=self._db_config["config_dir"],
+                    wallet_location=self._db_config["wallet_location"],
+                    wallet_password=self._db_config["wallet_password"],
+                    stmtcachesize=self._pool_config["stmtcachesize"]
+                )
+                break
+            except oracledb.Error:
+                if attempt >= self._pool_config["retry_count"]:
+                    raise
+                time.sleep(self._pool_config["retry_delay"])
+        conn.autocommit = True
+        self._init_session(conn)
+        return conn
+
+    def _create_pool(self):
+        """
+        Create the session pool using the stored configuration.
+        """
+        return oracledb.create_pool(
             user=self._db_config["user"],
             password=self._db_config["password"],
             dsn=self._db_config["dsn"],
             config_dir=self._db_config["config_dir"],
             wallet_location=self._db_config["wallet_location"],
-            wallet_password=self._db_config["wallet_password"]
+            wallet_password=self._db_config["wallet_password"],
+            min=self._pool_config["min"],
+            max=self._pool_config["max"],
+            increment=self._pool_config["increment"],
+            ping_interval=self._pool_config["ping_interval"],
+            timeout=self._pool_config["timeout"],
+            wait_timeout=self._pool_config["wait_timeout"],
+            getmode=oracledb.POOL_GETMODE_TIMEDWAIT,
+            stmtcachesize=self._pool_config["stmtcachesize"],
+            session_callback=self._init_session
         )
-        conn.autocommit = True
-        return conn
 
     def _ensure_connection(self):
         """
         Ensure the connection is alive; recreate it if it was dropped by the
         network/database (e.g., DPY-4011, timeouts, etc.).
+
+        The ping round trip is only paid when the connection has been idle for
+        longer than CON_POOL_PING_INTERVAL; recently used connections are trusted
+        and a dead one is caught by the error handling in acquire().
+        """
+        with self._conn_lock:
+            if self.conn is None:
+                self.conn = self._create_connection()
+                return
+            if time.monotonic() - self._last_used < self._pool_config["ping_interval"]:
+                return
+            try:
+                # Health check after an idle period; raises if not connected
+                self._count("pings")
+                self.conn.ping()
+                self._last_used = time.monotonic()
+            except oracledb.Error:
+                # Recreate a fresh connection on any ping failure
+                self._discard_connection()
+                self.conn = self._create_connection()
+
+    def _discard_connection(self):
+        """
+        Closes the shared connection after it was found dead so the next call
+        opens a new one.
+        """
+        with self._conn_lock:
+            if self.conn is not None:
+                try:
+                    self.conn.close()
+                except Exception:
+                    pass
+                self.conn = None
+                self._count("reconnects")
+
+    def is_pooled(self):
         """
-        if self.conn is None:
-            self.conn = self._create_connection()
+        Returns:
+            bool: True when the instance hands out sessions from a pool.
+        """
+        return self.pool is not None
+
+    @contextmanager
+    def acquire(self):
+        """
+        Takes a database session for a single operation and gives it back on exit.
+
+        In pooled mode the session comes from the pool and is released when the
+        block ends (uncommitted work is rolled back by the pool). In single mode
+        the shared connection is yielded and stays open.
+
+        Yields:
+            oracledb.Connection: The database connection object.
+        """
+        conn = self.get_connection()
+        dead = False
+        try:
+            yield conn
+        except Exception as e:
+            dead = is_dead_session(e)
+            raise
+        finally:
+            if dead:
+                self._count("dead_sessions")
+                if self.pool is not None:
+                    # Remove the broken session instead of returning it
+                    self.pool.drop(conn)
+                    self._count("reconnects")
+                else:
+                    self._discard_connection()
+            else:
+                self._last_used = time.monotonic()
+                self.release(conn)
+
+    @contextmanager
+    def transaction(self):
+        """
+        Takes a session for a transaction of several statements: autocommit
+        is off inside the block, the work is committed when it ends and
+        rolled back if it raises.
+
+        In pooled mode the session comes from the pool (acquire()). In single
+        mode a dedicated connection is opened for the block and closed after
+        it, so the shared connection, used by every other thread, never
+        leaves autocommit.
+
+        Yields:
+            oracledb.Connection: The session of the transaction.
+        """
+        if self.pool is not None:
+            with self.acquire() as conn:
+                conn.autocommit = False
+                try:
+                    yield conn
+                    conn.commit()
+                except Exception:
+                    conn.rollback()
+                    raise
+                finally:
+                    conn.autocommit = True
             return
+
+        conn = self._connect()
         try:
-            # Fast health check; raises if not connected
-            self.conn.ping()
-        except oracledb.Error:
-            # Recreate a fresh connection on any ping failure
+            conn.autocommit = False
+            yield conn
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+
+    def run(self, callback, idempotent=False):
+        """
+        Runs callback(conn) on an acquired session.
+
+        Idempotent operations (reads) are retried once on a fresh session when
+        the first attempt fails because the session was dead.
+
+        Args:
+            callback (callable): Function receiving the oracledb.Connection.
+            idempotent (bool): Whether it is safe to run the callback twice.
+
+        Returns:
+            Any: The value returned by the callback.
+        """
+        attempts = 2 if idempotent else 1
+        for attempt in range(attempts):
             try:
-                self.conn.close()
-            except Exception:
-                pass
-            self.conn = self._create_connection()
+                with self.acquire() as conn:
+                    return callback(conn)
+            except Exception as e:
+                if attempt + 1 < attempts and is_dead_session(e):
+                    self._count("retries")
+                    continue
+                raise
+
+    def read_df(self, query, params=None, arraysize=None):
+        """
+        Executes a read-only query and returns the rows as a DataFrame,
+        retrying once on a fresh session if the session was dead.
+
+        Args:
+            query (str): SELECT statement.
+            params (dict): Bind variables.
+            arraysize (int): Rows per round trip (default CON_FETCH_ARRAYSIZE).
+
+        Returns:
+            pd.DataFrame: The query result.
+        """
+        return self.run(lambda conn: fetch_df(conn, query, params, arraysize), idempotent=True)
+
+    def read_df_batches(self, query, params=None, size=None):
+        """
+        Streams a large result as DataFrames of at most `size` rows
+        (fetch_df_batches), keeping the session until the last batch.
+
+        Args:
+            query (str): SELECT statement.
+            params (dict): Bind variables.
+            size (int): Rows per batch (default CON_FETCH_ARRAYSIZE).
+
+        Yields:
+            pd.DataFrame: One batch of the query result.
+        """
+        with self.acquire() as conn:
+            for odf in conn.fetch_df_batches(statement=query, parameters=params, size=size or FETCH_ARRAYSIZE):
+                yield to_pandas(odf)
 
     def get_connection(self):
         """
         Returns the Oracle database connection instance.
 
+        In pooled mode a session is taken from the pool and the caller must give
+        it back with release(); prefer acquire() for per-operation access.
+
         Returns:
             oracledb.Connection: The database connection object.
         """
+        if self.pool is not None:
+            conn = self.pool.acquire()
+            conn.autocommit = True
+            return conn
         self._ensure_connection()
         return self.conn
 
+    def release(self, conn):
+        """
+        Gives back a session obtained with get_connection() in pooled mode.
+        Does nothing in single mode.
+        """
+        if self.pool is not None and conn is not None:
+            self.pool.release(conn)
+
+    def get_pool_stats(self):
+        """
+        Returns the current pool usage, useful for sizing CON_POOL_MAX.
+
+        Returns:
+            dict: Opened, busy and max sessions (empty in single mode).
+        """
+        if self.pool is None:
+            return {}
+        return {
+            "opened": self.pool.opened,
+            "busy": self.pool.busy,
+            "max": self.pool.max
+        }
+
+    def get_stats(self):
+        """
+        Returns the health counters so reconnect/retry rates can be alerted on.
+
+        Returns:
+            dict: pings, dead_sessions, reconnects and retries since start-up,
+                  plus the pool usage in pooled mode.
+        """
+        with self._stats_lock:
+            stats = dict(self._stats)
+        stats.update(self.get_pool_stats())
+        return stats
+
     def close_connection(self):
         """
-        Closes the Oracle database connection if it is open.
+        Closes the Oracle database connection (or the pool) if it is open.
         """
+        if self.pool is not None:
+            try:
+                self.pool.close(force=True)
+                self.pool = None
+                Connection._instance = None
+            except oracledb.DatabaseError as e:
+                error, = e.args
+                print(f"Error closing the database pool: {error.message}")
+                raise
         if self.conn is not None:
             try:
                 self.conn.close()
@@ -98,4 +522,4 @@ class Connection:
         """
         Ensures the connection is closed when exiting the context.
         """
-        self.close_connection()
\ No newline at end of file
+        self.close_connection()
@@ -0,0 +1,240 @@
+import asyncio
+import threading
+import oracledb
+from services.database.connection import (
+    FETCH_ARRAYSIZE,
+    get_db_config,
+    get_pool_config,
+    is_dead_session,
+    is_arrow_unsupported,
+    rows_to_df,
+    to_pandas
+)
+
+class AsyncConnection:
+    """
+    Singleton class for the asyncio variant of the database layer.
+
+    Uses python-oracledb's async API with the same CON_ADB_* / CON_POOL_*
+    settings as Connection, and the same two modes (CON_POOL_ENABLED):
+      - Single: one shared async connection; gathered queries take turns on it.
+      - Pooled: create_pool_async sized by CON_POOL_*; gathered queries run
+        at the same time on up to CON_POOL_MAX sessions.
+
+    Streamlit runs pages synchronously, so the connection lives on its own
+    event loop in a background thread and the sync facade (run/gather)
+    submits coroutines to it. With gather() a page can run independent
+    queries at the same time and wait only for the slowest one.
+    """
+    _instance = None
+    _lock = threading.Lock()
+
+    def __new__(cls):
+        if cls._instance is None:
+            with cls._lock:
+                if cls._instance is None:
+                    instance = super(AsyncConnection, cls).__new__(cls)
+                    instance._db_config = get_db_config()
+                    instance._pool_config = get_pool_config()
+                    instance.pool = None
+                    instance.conn = None
+                    instance._conn_lock = None
+                    instance._loop = asyncio.new_event_loop()
+                    instance._thread = threading.Thread(
+                        target=instance._loop.run_forever,
+                        name="oracledb-async",
+                        daemon=True
+                    )
+                    instance._thread.start()
+                    cls._instance = instance
+        return cls._instance
+
+    async def _init_session(self, conn, requested_tag=None):
+        """
+        Session callback: runs the CON_POOL_SESSION_SQL statements once for
+        every new database session.
+        """
+        if not self._pool_config["session_sql"]:
+            return
+        with conn.cursor() as cur:
+            for statement in self._pool_config["session_sql"]:
+                await cur.execute(statement)
+
+    def _get_pool(self):
+        """
+        Returns the async pool, creating it on first use. Must be called from
+        the background loop, which the async pool is bound to.
+        """
+        if self.pool is None:
+            self.pool = oracledb.create_pool_async(
+                user=self._db_config["user"],
+                password=self._db_config["password"],
+                dsn=self._db_config["dsn"],
+                config_dir=self._db_config["config_dir"],
+                wallet_location=self._db_config["wallet_location"],
+                wallet_password=self._db_config["wallet_password"],
+                min=self._pool_config["min"],
+                max=self._pool_config["max"],
+                increment=self._pool_config["increment"],
+                ping_interval=self._pool_config["ping_interval"],
+                timeout=self._pool_config["timeout"],
+                wait_timeout=self._pool_config["wait_timeout"],
+                getmode=oracledb.POOL_GETMODE_TIMEDWAIT,
+                stmtcachesize=self._pool_config["stmtcachesize"],
+                session_callback=self._init_session
+            )
+        return self.pool
+
+    async def _connect(self):
+        """
+        Opens the shared async connection (single mode), retrying
+        CON_CONNECT_RETRY_COUNT times on failure.
+        """
+        for attempt in range(self._pool_config["retry_count"] + 1):
+            try:
+                conn = await oracledb.connect_async(
+                    user=self._db_config["user"],
+                    password=self._db_config["password"],
+                    dsn=self._db_config["dsn"],
+                    config_dir=self._db_config["config_dir"],
+                    wallet_location=self._db_config["wallet_location"],
+                    wallet_password=self._db_config["wallet_password"],
+                    stmtcachesize=self._pool_config["stmtcachesize"]
+                )
+                break
+            except oracledb.Error:
+                if attempt >= self._pool_config["retry_count"]:
+                    raise
+                await asyncio.sleep(self._pool_config["retry_delay"])
+        await self._init_session(conn)
+        return conn
+
+    async def _fetch_df(self, conn, query, params, arraysize):
+        """
+        Async counterpart of connection.fetch_df: Arrow fetch, falling back to
+        cursor rows for unsupported column types.
+        """
+        try:
+            return to_pandas(await conn.fetch_df_all(statement=query, parameters=params, arraysize=arraysize))
+        except oracledb.NotSupportedError as e:
+            if not is_arrow_unsupported(e):
+                raise
+        with conn.cursor() as cur:
+            cur.arraysize = arraysize
+            cur.prefetchrows = arraysize
+            await cur.execute(query, params or {})
+            return rows_to_df(cur.description, await cur.fetchall())
+
+    async def read_df(self, query, params=None, arraysize=None):
+        """
+        Executes a read-only query and returns the rows as a DataFrame,
+        retrying once on a fresh session if the session was dead.
+
+        Args:
+            query (str): SELECT statement.
+            params (dict): Bind variables.
+            arraysize (int): Rows per round trip (default CON_FETCH_ARRAYSIZE).
+
+        Returns:
+            pd.DataFrame: The query result.
+        """
+        for attempt in range(2):
+            try:
+                if self._pool_config["enabled"]:
+                    return await self._read_pooled(query, params, arraysize or FETCH_ARRAYSIZE)
+                return await self._read_single(query, params, arraysize or FETCH_ARRAYSIZE)
+            except Exception as e:
+                if attempt == 0 and is_dead_session(e):
+                    continue
+                raise
+
+    async def _read_pooled(self, query, params, arraysize):
+        """
+        Runs a query on a session of the async pool.
+        """
+        pool = self._get_pool()
+        conn = await pool.acquire()
+        try:
+            df = await self._fetch_df(conn, query, params, arraysize)
+        except Exception as e:
+            if is_dead_session(e):
+                # Remove the broken session instead of returning it
+                await pool.drop(conn)
+            else:
+                await pool.release(conn)
+            raise
+        await pool.release(conn)
+        return df
+
+    async def _read_single(self, query, params, arraysize):
+        """
+        Runs a query on the shared async connection, one query at a time.
+        """
+        # Created on first use, inside the background loop it belongs to
+        if self._conn_lock is None:
+            self._conn_lock = asyncio.Lock()
+        async with self._conn_lock:
+            if self.conn is None:
+                self.conn = await self._connect()
+            try:
+                return await self._fetch_df(self.conn, query, params, arraysize)
+            except Exception as e:
+                if is_dead_session(e):
+                    # The next query opens a new connection
+                    conn, self.conn = self.conn, None
+                    try:
+                        await conn.close()
+                    except Exception:
+                        pass
+                raise
+
+    def run(self, coro):
+        """
+        Runs a coroutine on the background loop and waits for its result.
+
+        Args:
+            coro (coroutine): e.g. FileServiceAsync().get_all_files(user_id).
+
+        Returns:
+            Any: The value returned by the coroutine.
+        """
+        return asyncio.run_coroutine_threadsafe(coro, self._loop).result()
+
+    def gather(self, *coros):
+        """
+        Runs several coroutines concurrently and waits for all of them.
+
+        Returns:
+            list: The results, in the same order as the coroutines.
+        """
+        async def _gather():
+            return await asyncio.gather(*coros)
+        return self.run(_gather())
+
+    def close_connection(self):
+        """
+        Closes the async pool or connection if it is open.
+        """
+        if self.pool is not None:
+            async def _close():
+                await self.pool.close(force=True)
+            self.run(_close())
+            self.pool = None
+        if self.conn is not None:
+            async def _close():
+                await self.conn.close()
+            self.run(_close())
+            self.conn = None
+
+def gather(*coros):
+    """
+    Sync facade for Streamlit pages: runs independent async service calls
+    concurrently and returns their results in order. Cached service reads
+    are answered from the QueryCache without a round trip.
+
+        df_modules, df_agents = database.gather(
+            db_module_service_async.get_modules(user_id),
+            db_agent_service_async.get_all_agents(user_id)
+        )
+    """
+    return AsyncConnection().gather(*coros)
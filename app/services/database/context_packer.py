@@ -0,0 +1,218 @@
+import os
+import re
+import threading
+from dotenv import load_dotenv
+
+from langchain_core.documents import Document
+
+from services.database.chunker import TOKEN_RE, count_tokens
+
+load_dotenv()
+
+# Tokens of retrieved context at most, whatever the model allows
+CONTEXT_MAX_TOKENS   = int(os.getenv('CON_RAG_CONTEXT_MAX_TOKENS', 4000))
+# Context window of the chat models (input + output)
+MODEL_CONTEXT_TOKENS = int(os.getenv('CON_GEN_AI_MODEL_CONTEXT_TOKENS', 128000))
+
+# Chunks whose shingles are this much contained in an earlier chunk are dropped
+DEDUP_SIMILARITY = float(os.getenv('CON_RAG_CONTEXT_DEDUP_SIMILARITY', 0.8))
+SHINGLE_WORDS    = 5
+
+# Chunks of the same file this many characters apart or less are merged
+MERGE_GAP_CHARS = 1
+
+WORD_RE = re.compile(r"\w+")
+
+def get_context_budget(max_out_tokens, reserved_tokens=0):
+    """
+    Tokens the retrieved context may take: what the model window leaves
+    after the answer (AGENT_MAX_OUT_TOKENS) and the rest of the prompt,
+    capped by CON_RAG_CONTEXT_MAX_TOKENS.
+
+    Args:
+        max_out_tokens (int): Output tokens of the agent.
+        reserved_tokens (int): Tokens of the prompt, history and question.
+    """
+    return max(0, min(CONTEXT_MAX_TOKENS, MODEL_CONTEXT_TOKENS - int(max_out_tokens or 0) - int(reserved_tokens)))
+
+def shingles(text):
+    """
+    Hashes of the SHINGLE_WORDS-word windows of a text (the words
+    themselves for shorter texts).
+    """
+    words = WORD_RE.findall(text.lower())
+    if len(words) < SHINGLE_WORDS:
+        return {hash(word) for word in words}
+    return {hash(" ".join(words[i:i + SHINGLE_WORDS])) for i in range(len(words) - SHINGLE_WORDS + 1)}
+
+def join_overlap(first, second, overlap):
+    """
+    Joins two texts, writing once the end of the first that the second
+    repeats at its start (the chunk overlap, about `overlap` characters
+    before whitespace normalization).
+    """
+    if overlap > 0:
+        for length in range(min(len(first), len(second), overlap + 16), min(overlap, 8) - 1, -1):
+            if length and first.endswith(second[:length]):
+                return first + second[length:]
+    return f"{first} {second}"
+
+def truncate_tokens(text, max_tokens):
+    """Cuts a text after its first max_tokens tokens."""
+    for i, match in enumerate(TOKEN_RE.finditer(text)):
+        if i == max_tokens:
+            return text[:match.start()].rstrip() + " ..."
+    return text
+
+class ContextPacker:
+    """
+    Singleton stage between the retriever and the combine step of the RAG
+    chat: packs the retrieved chunks into less prompt.
+
+    1. Chunks of the same file that overlap or touch (by the chunk_start /
+       chunk_end offsets in METADATA) are merged, so the overlap is sent
+       once. DOCS only holds the chunks of the current version of a file.
+    2. Chunks whose word shingles are mostly contained in a chunk already
+       kept (near-duplicates, e.g. from another copy of a file) are dropped.
+    3. The rest, in rank order, is cut to the token budget.
+
+    Tokens are counted with the chunker approximation (words and
+    punctuation); the counters add up the tokens saved by each step.
+    """
+    _instance = None
+    _lock = threading.Lock()
+
+    def __new__(cls):
+        if cls._instance is None:
+            with cls._lock:
+                if cls._instance is None:
+                    instance = super(ContextPacker, cls).__new__(cls)
+                    instance._stats_lock = threading.Lock()
+                    instance._stats = {
+                        "packs": 0,
+                        "docs_in": 0,
+                        "docs_out": 0,
+                        "merged": 0,
+                        "duplicates": 0,
+                        "truncated": 0,
+                        "tokens_in": 0,
+                        "tokens_out": 0
+                    }
+                    cls._instance = instance
+        return cls._instance
+
+    def merge(self, docs):
+        """
+        Merges the chunks of the same file that overlap or are adjacent. A merged chunk takes the place of its best ranked part.
+
+        Returns:
+            (list, int): The documents and how many chunks were merged into others.
+        """
+        groups = {}
+        for rank, doc in enumerate(docs):
+            metadata = doc.metadata
+            if "chunk_start" in metadata and "chunk_end" in metadata and "file_id" in metadata:
+                groups.setdefault(metadata["file_id"], []).append((rank, doc))
+
+        merged = {}
+        absorbed = set()
+        for group in groups.values():
+            group.sort(key=lambda item: item[1].metadata["chunk_start"])
+            rank, doc = group[0]
+            for next_rank, next_doc in group[1:]:
+                start, end = next_doc.metadata["chunk_start"], next_doc.metadata["chunk_end"]
+                if start > doc.metadata["chunk_end"] + MERGE_GAP_CHARS:
+                    merged[rank] = doc
+                    rank, doc = next_rank, next_doc
+                    continue
+                if end > doc.metadata["chunk_end"]:
+                    text = join_overlap(doc.page_content, next_doc.page_content, doc.metadata["chunk_end"] - start)
+                else:
+                    # Contenido por completo en el chunk anterior
+                    text = doc.page_content
+                metadata = dict(doc.metadata)
+                metadata["chunk_end"] = max(end, doc.metadata["chunk_end"])
+                metadata["ids"] = metadata.get("ids", [metadata.get("id")]) + [next_doc.metadata.get("id")]
+                doc = Document(page_content=text, metadata=metadata)
+                absorbed.add(max(rank, next_rank))
+                rank = min(rank, next_rank)
+            merged[rank] = doc
+
+        packed = [merged.get(rank, doc) for rank, doc in enumerate(docs) if rank not in absorbed]
+        return packed, len(absorbed)
+
+    def dedupe(self, docs, similarity=DEDUP_SIMILARITY):
+        """
+        Drops the chunks whose shingles are at least `similarity` contained
+        in the shingles of the chunks kept before them.
+
+        Returns:
+            (list, int): The documents kept and how many were dropped.
+        """
+        kept, seen = [], set()
+        for doc in docs:
+            doc_shingles = shingles(doc.page_content)
+            if doc_shingles and len(doc_shingles & seen) / len(doc_shingles) >= similarity:
+                continue
+            kept.append(doc)
+            seen |= doc_shingles
+        return kept, len(docs) - len(kept)
+
+    def pack(self, docs, max_tokens=CONTEXT_MAX_TOKENS):
+        """
+        Merges, dedupes and cuts the retrieved documents to max_tokens.
+
+        Args:
+            docs (list): Retrieved documents, best first.
+            max_tokens (int): Token budget of the context (see get_context_budget).
+
+        Returns:
+            (list, dict): The packed documents and the counters of this pack
+                          (docs and tokens in/out, merged, duplicates,
+                          truncated or dropped by the budget, tokens_saved).
+        """
+        tokens_in = sum(count_tokens(doc.page_content) for doc in docs)
+        packed, merged     = self.merge(docs)
+        packed, duplicates = self.dedupe(packed)
+
+        result, tokens_out, truncated = [], 0, 0
+        for doc in packed:
+            tokens = count_tokens(doc.page_content)
+            if tokens_out + tokens > max_tokens:
+                truncated = len(packed) - len(result)
+                remaining = max_tokens - tokens_out
+                # Un chunk que no cabe entra recortado si queda sitio para algo útil
+                if remaining >= min(tokens, 32):
+                    result.append(Document(page_content=truncate_tokens(doc.page_content, remaining), metadata=doc.metadata))
+                    tokens_out += remaining
+                break
+            result.append(doc)
+            tokens_out += tokens
+
+        stats = {
+            "docs_in": len(docs),
+            "docs_out": len(result),
+            "merged": merged,
+            "duplicates": duplicates,
+            "truncated": truncated,
+            "tokens_in": tokens_in,
+            "tokens_out": tokens_out
+        }
+        with self._stats_lock:
+            self._stats["packs"] += 1
+            for name, value in stats.items():
+                self._stats[name] += value
+        stats["tokens_saved"] = tokens_in - tokens_out
+        return result, stats
+
+    def get_stats(self):
+        """
+        Returns:
+            dict: Packs, documents and tokens in and out, merged, duplicate
+                  and truncated chunks, tokens saved and their share.
+        """
+        with self._stats_lock:
+            stats = dict(self._stats)
+        stats["tokens_saved"] = stats["tokens_in"] - stats["tokens_out"]
+        stats["saved_rate"]   = stats["tokens_saved"] / stats["tokens_in"] if stats["tokens_in"] else 0.0
+        return stats
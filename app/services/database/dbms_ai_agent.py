@@ -10,10 +10,9 @@ class DBMSAIAgentService:
 
 	def __init__(self):
 		"""
-		Initializes the service with a shared database connection.
+		Initializes the service with the shared connection manager.
 		"""
 		self.conn_instance = Connection()
-		self.conn = self.conn_instance.get_connection()
 
 	def _to_json_str(self, attributes):
 		"""
@@ -29,45 +28,50 @@ class DBMSAIAgentService:
 		"""
 		Drop/Create/Enable a TOOL via ORA26AI.SP_AI_TOOL.
 		"""
-		attrs = self._to_json_str(p_attributes)
-		with self.conn.cursor() as cur:
-			cur.callproc("ORA26AI.SP_AI_TOOL", [p_tool_name, attrs])
-		self.conn.commit()
+		with self.conn_instance.acquire() as conn:
+			attrs = self._to_json_str(p_attributes)
+			with conn.cursor() as cur:
+				cur.callproc("ORA26AI.SP_AI_TOOL", [p_tool_name, attrs])
+			conn.commit()
 
 	def create_task(self, p_task_name, p_attributes):
 		"""
 		Drop/Create/Enable a TASK via ORA26AI.SP_AI_TASK.
 		"""
-		attrs = self._to_json_str(p_attributes)
-		with self.conn.cursor() as cur:
-			cur.callproc("ORA26AI.SP_AI_TASK", [p_task_name, attrs])
-		self.conn.commit()
+		with self.conn_instance.acquire() as conn:
+			attrs = self._to_json_str(p_attributes)
+			with conn.cursor() as cur:
+				cur.callproc("ORA26AI.SP_AI_TASK", [p_task_name, attrs])
+			conn.commit()
 
 	def create_agent(self, p_agent_name, p_attributes):
 		"""
 		Drop/Create/Enable an AGENT via ORA26AI.SP_AI_AGENT.
 		"""
-		attrs = self._to_json_str(p_attributes)
-		with self.conn.cursor() as cur:
-			cur.callproc("ORA26AI.SP_AI_AGENT", [p_agent_name, attrs])
-		self.conn.commit()
+		with self.conn_instance.acquire() as conn:
+			attrs = self._to_json_str(p_attributes)
+			with conn.cursor() as cur:
+				cur.callproc("ORA26AI.SP_AI_AGENT", [p_agent_name, attrs])
+			conn.commit()
 
 	def create_team(self, p_team_name, p_attributes):
 		"""
 		Drop/Create a TEAM via ORA26AI.SP_AI_TEAM.
 		"""
-		attrs = self._to_json_str(p_attributes)
-		with self.conn.cursor() as cur:
-			cur.callproc("ORA26AI.SP_AI_TEAM", [p_team_name, attrs])
-		self.conn.commit()
+		with self.conn_instance.acquire() as conn:
+			attrs = self._to_json_str(p_attributes)
+			with conn.cursor() as cur:
+				cur.callproc("ORA26AI.SP_AI_TEAM", [p_team_name, attrs])
+			conn.commit()
 
 	def validate_name(self, p_object_type: str, p_object_name: str):
 		"""
 		Validates uniqueness of an AI object name by type. Raises if name exists.
 		"""
-		with self.conn.cursor() as cur:
-			cur.callproc("ORA26AI.SP_AI_NAME_VALIDATE", [p_object_type, p_object_name])
-		self.conn.commit()
+		with self.conn_instance.acquire() as conn:
+			with conn.cursor() as cur:
+				cur.callproc("ORA26AI.SP_AI_NAME_VALIDATE", [p_object_type, p_object_name])
+			conn.commit()
 
 	def list_functions_and_procedures(self, owner: str):
 		"""
@@ -84,4 +88,4 @@ class DBMSAIAgentService:
 			WHERE ao.owner = UPPER(:p_owner)
 			  AND ao.object_type IN ('FUNCTION','PROCEDURE')
 		"""
-		return pd.read_sql(query, con=self.conn, params={"p_owner": owner})
\ No newline at end of file
+		return self.conn_instance.read_df(query, params={"p_owner": owner})
\ No newline at end of file
@@ -1,8 +1,13 @@
 import os
 from services.database.connection import Connection
+from services.database.vector_ingest import VectorIngest
+from services.database.vector_store_registry import VectorStoreRegistry
+from services.database.retrieval_cache import RetrievalCache, RewriteCache
+from services.database.docs_retriever import DocsRetriever
+from services.database.context_packer import ContextPacker
 
-from langchain_community.embeddings.oci_generative_ai import OCIGenAIEmbeddings
-from langchain_community.vectorstores import OracleVS
+# "database": SP_VECTOR_STORE; "python": VectorIngest (batched embeddings from the app)
+VECTOR_STORE_ENGINE = os.getenv('CON_VECTOR_STORE_ENGINE', 'database').lower()
 
 class DocService:
     """
@@ -11,54 +16,93 @@ class DocService:
 
     def __init__(self):
         """
-        Keep only the singleton instance; fetch a live connection on-demand
-        to avoid using expired database connections.
+        Keep only the singleton instance; each operation takes a live session
+        on-demand through acquire() to avoid using expired database connections.
         """
         self.conn_instance = Connection()
 
-    @property
-    def conn(self):
-        """Always returns a live connection (auto-reconnect)."""
-        return self.conn_instance.get_connection()
-    
-    def vector_store(self, file_id):
+    def vector_store(self, file_id, progress=None):
         """
-        Executes a stored procedure to add a document to the vector store.
+        Adds a document to the vector store with the CON_VECTOR_STORE_ENGINE
+        engine: the SP_VECTOR_STORE procedure or the Python VectorIngest.
 
         Args:
             file_id (str): The identifier of the file to be stored in the vector store.
+            progress (callable): (chunks_done, chunks_total) callback, Python engine only.
 
         Returns:
             str: Confirmation message indicating the document was stored successfully.
         """
-        
-        query = f"""
-                BEGIN
-                    SP_VECTOR_STORE('{file_id}');
-                END;
-            """
-        conn = self.conn
-        with conn.cursor() as cur:
-            cur.execute(query)
-        conn.commit()
+        if VECTOR_STORE_ENGINE == "python":
+            VectorIngest().vector_store(file_id, progress)
+        else:
+            self.vector_store_procedure(file_id)
+        # Los resultados en caché de este archivo ya no son válidos
+        RetrievalCache().invalidate_file(file_id)
         return f"The file was created to the vector store successfully."
+
+    def vector_store_procedure(self, file_id):
+        """
+        Executes the SP_VECTOR_STORE stored procedure (chunks and embeddings
+        in the database).
+
+        Args:
+            file_id (str): The identifier of the file to be stored in the vector store.
+        """
+        with self.conn_instance.acquire() as conn:
+            with conn.cursor() as cur:
+                cur.callproc("SP_VECTOR_STORE", [int(file_id)])
+            conn.commit()
     
-    def get_vector_store(self):
+    def get_vector_store(self, conn):
         """
-        Creates and returns an Oracle Vector Store instance using OCI Generative AI embeddings.
+        Returns the Oracle Vector Store of DOCS with OCI Generative AI
+        embeddings. The embedding client and the OracleVS wrapper are built
+        once per process (VectorStoreRegistry) and bound to conn.
+
+        Args:
+            conn (oracledb.Connection): Session the vector store queries with, taken
+                with acquire() for the duration of the search (and released by it).
 
         Returns:
             OracleVS: The vector store instance.
         """
-        embeddings = OCIGenAIEmbeddings(
-            model_id         = os.getenv('CON_GEN_AI_EMB_MODEL_ID'),
-            service_endpoint = os.getenv('CON_GEN_AI_SERVICE_ENDPOINT'),
-            compartment_id   = os.getenv('CON_COMPARTMENT_ID')
+        return VectorStoreRegistry().get(conn, table_name='docs')
+
+    def get_retriever(self, conn, file_ids, k=10, fetch_k=200, search_type="mmr"):
+        """
+        Returns a retriever over the DOCS of some files, with the query
+        embedding and retrieval result caches.
+
+        Args:
+            conn (oracledb.Connection): Session the searches run on.
+            file_ids (list): Files the search is limited to.
+            k (int): Chunks returned.
+            fetch_k (int): Candidates MMR chooses from.
+            search_type (str): "mmr" or "similarity".
+
+        Returns:
+            DocsRetriever: The retriever.
+        """
+        return DocsRetriever(
+            vector_store = self.get_vector_store(conn),
+            file_ids     = [int(file_id) for file_id in file_ids],
+            k            = k,
+            fetch_k      = fetch_k,
+            search_type  = search_type
         )
-        
-        conn = self.conn
-        return OracleVS(
-            client             = conn,
-            embedding_function = embeddings,
-            table_name         = 'docs'
-        )
\ No newline at end of file
+
+    def get_retrieval_stats(self):
+        """
+        Returns:
+            dict: Hit rates of the query embedding cache ("query_embedding"),
+                  of the retrieval result cache ("retrieval") and of the
+                  question rewrite cache ("rewrite"), and the tokens the
+                  context packer saved ("context").
+        """
+        return {
+            "query_embedding" : VectorStoreRegistry().get_query_cache_stats(),
+            "retrieval"       : RetrievalCache().get_stats(),
+            "rewrite"         : RewriteCache().get_stats(),
+            "context"         : ContextPacker().get_stats()
+        }
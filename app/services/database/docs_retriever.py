@@ -0,0 +1,215 @@
+import os
+import json
+import time
+import array
+import numpy as np
+from typing import Any, List
+
+from langchain_core.documents import Document
+from langchain_core.retrievers import BaseRetriever
+
+from services.database.retrieval_cache import RetrievalCache
+from services.database.vector_store_registry import VectorStoreRegistry
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Up to this many chunks in the selected files the search is exact (FILE_ID
+# index + distance of every chunk); above it, the approximate vector index
+EXACT_SEARCH_MAX_CHUNKS = int(os.getenv('CON_RAG_EXACT_SEARCH_MAX_CHUNKS', 20000))
+APPROX_TARGET_ACCURACY  = int(os.getenv('CON_RAG_APPROX_TARGET_ACCURACY', 95))
+
+GET_DOCS_FILES_QUERY = """
+    SELECT FILE_ID, FILE_DOCS_VERSION, FILE_DOCS_CHUNKS
+    FROM FILES
+    WHERE FILE_ID IN ({file_binds})
+    ORDER BY FILE_ID
+"""
+
+# The searches return ids and stored embeddings only: MMR picks k of the
+# fetch_k candidates and just those k are loaded (get_by_ids)
+
+# Small candidate set: exact top-k over the rows of the files only
+SEARCH_DOCS_EXACT_QUERY = """
+    SELECT /*+ INDEX(DOCS DOCS_FILE_ID_IDX) */ ID, EMBEDDING
+    FROM DOCS
+    WHERE FILE_ID IN ({file_binds})
+    ORDER BY VECTOR_DISTANCE(EMBEDDING, :embedding, COSINE)
+    FETCH EXACT FIRST :fetch_k ROWS ONLY
+"""
+
+# Large candidate set: vector index, FILE_ID as a relational filter
+SEARCH_DOCS_APPROX_QUERY = """
+    SELECT ID, EMBEDDING
+    FROM DOCS
+    WHERE FILE_ID IN ({file_binds})
+    ORDER BY VECTOR_DISTANCE(EMBEDDING, :embedding, COSINE)
+    FETCH APPROX FIRST :fetch_k ROWS ONLY WITH TARGET ACCURACY {target_accuracy}
+"""
+
+GET_DOCS_BY_ID_QUERY = """
+    SELECT ID, TEXT, METADATA
+    FROM DOCS
+    WHERE ID IN ({id_binds})
+"""
+
+def get_binds(prefix, values):
+    """
+    Returns the bind names and values of an IN list: (":f0, :f1", {"f0": ..., "f1": ...}).
+    """
+    params = {f"{prefix}{i}": int(value) for i, value in enumerate(values)}
+    return ", ".join(f":{name}" for name in params), params
+
+def maximal_marginal_relevance(query, candidates, k=10, lambda_mult=0.5):
+    """
+    Maximal marginal relevance over a candidate matrix, vectorized: each of
+    the k steps is one matrix-vector product over the candidates instead of
+    a Python loop over them. Picks the same candidates as LangChain's
+    maximal_marginal_relevance (most similar first, then the best
+    lambda_mult * relevance - (1 - lambda_mult) * redundancy).
+
+    Args:
+        query (np.ndarray): Query vector (D).
+        candidates (np.ndarray): Candidate vectors (N x D), float32.
+        k (int): Candidates to pick.
+        lambda_mult (float): 1 = relevance only, 0 = diversity only.
+
+    Returns:
+        list: Indexes of the picked candidates, in order.
+    """
+    n = len(candidates)
+    k = min(k, n)
+    if k <= 0:
+        return []
+
+    # Coseno: filas y consulta normalizadas una sola vez
+    norms      = np.linalg.norm(candidates, axis=1)
+    norms[norms == 0] = 1.0
+    candidates = candidates / norms[:, None]
+    query      = query / (np.linalg.norm(query) or 1.0)
+    relevance  = candidates @ query
+
+    selected   = [int(np.argmax(relevance))]
+    redundancy = candidates @ candidates[selected[0]]
+    available  = np.ones(n, dtype=bool)
+    available[selected[0]] = False
+    while len(selected) < k:
+        scores = lambda_mult * relevance - (1 - lambda_mult) * redundancy
+        scores[~available] = -np.inf
+        best = int(np.argmax(scores))
+        selected.append(best)
+        available[best] = False
+        # Máxima similitud de cada candidato con los ya elegidos
+        np.maximum(redundancy, candidates @ candidates[best], out=redundancy)
+    return selected
+
+def to_matrix(vectors):
+    """
+    Stacks the fetched VECTOR values (array.array of float32) into one
+    float32 matrix without converting element by element.
+    """
+    return np.vstack([np.frombuffer(vector, dtype=np.float32) for vector in vectors])
+
+def to_document(doc_id, text, metadata):
+    metadata = json.loads(metadata) if metadata else {}
+    metadata["id"] = int(doc_id)
+    return Document(page_content=text or "", metadata=metadata)
+
+class DocsRetriever(BaseRetriever):
+    """
+    Retriever over DOCS for the RAG chat, limited to some files.
+
+    The question is embedded through the vector store embeddings (query
+    embedding cache) and the DOCS ids a search returns are kept in the
+    RetrievalCache, keyed by the query vector bucket, the files and their
+    FILE_DOCS_VERSION: a repeated or rephrased question over unchanged
+    files reloads the chunks by id instead of searching again.
+
+    The files are filtered on the relational DOCS.FILE_ID column, not on
+    the JSON metadata after the search. From the chunk counts of the files
+    (FILES.FILE_DOCS_CHUNKS) it searches exactly when they are few, and
+    through the vector index when they are many.
+    """
+    vector_store: Any
+    file_ids: List[int]
+    search_type: str = "mmr"
+    k: int = 10
+    fetch_k: int = 200
+    lambda_mult: float = 0.5
+
+    def get_docs_files(self, cur):
+        """
+        Returns the FILE_DOCS_VERSION of the files, sorted by FILE_ID, and
+        the number of chunks they have in DOCS.
+        """
+        binds, params = get_binds("f", self.file_ids)
+        cur.execute(GET_DOCS_FILES_QUERY.format(file_binds=binds), params)
+        rows = cur.fetchall()
+        return [int(version) for _, version, _ in rows], sum(int(chunks or 0) for _, _, chunks in rows)
+
+    def search(self, cur, vector, chunks):
+        """
+        Runs the vector search (similarity or MMR) and returns the documents.
+
+        The fetch_k candidates come back with their stored embeddings in one
+        round trip; MMR runs on them as a float32 matrix and only the k
+        picked chunks are loaded.
+
+        Args:
+            cur (oracledb.Cursor): Cursor of the session.
+            vector (list): Query embedding.
+            chunks (int): Chunks of the selected files; picks exact or approximate search.
+        """
+        binds, params = get_binds("f", self.file_ids)
+        params["embedding"] = array.array("f", vector)
+        params["fetch_k"]   = max(self.fetch_k, self.k) if self.search_type == "mmr" else self.k
+        if chunks <= EXACT_SEARCH_MAX_CHUNKS:
+            query = SEARCH_DOCS_EXACT_QUERY.format(file_binds=binds)
+            VectorStoreRegistry().count("exact_searches")
+        else:
+            query = SEARCH_DOCS_APPROX_QUERY.format(file_binds=binds, target_accuracy=APPROX_TARGET_ACCURACY)
+            VectorStoreRegistry().count("approx_searches")
+        cur.arraysize    = params["fetch_k"]
+        cur.prefetchrows = params["fetch_k"] + 1
+        cur.execute(query, params)
+        rows = cur.fetchall()
+        if not rows:
+            return []
+        ids = [int(doc_id) for doc_id, _ in rows]
+        if self.search_type == "mmr":
+            selected = maximal_marginal_relevance(
+                np.asarray(vector, dtype=np.float32),
+                to_matrix([embedding for _, embedding in rows]),
+                k           = self.k,
+                lambda_mult = self.lambda_mult
+            )
+            ids = [ids[i] for i in selected]
+        return self.get_by_ids(cur, ids[:self.k])
+
+    def get_by_ids(self, cur, ids):
+        """
+        Loads cached search results by DOCS id, keeping their order.
+        """
+        binds, params = get_binds("d", ids)
+        cur.execute(GET_DOCS_BY_ID_QUERY.format(id_binds=binds), params)
+        docs = {int(doc_id): to_document(doc_id, text, metadata) for doc_id, text, metadata in cur.fetchall()}
+        return [docs[doc_id] for doc_id in ids if doc_id in docs]
+
+    def _get_relevant_documents(self, query, *, run_manager=None):
+        if not self.file_ids:
+            return []
+        start  = time.perf_counter()
+        cache  = RetrievalCache()
+        vector = self.vector_store.embedding_function.embed_query(query)
+        search = (self.search_type, self.k, self.fetch_k, self.lambda_mult)
+
+        with self.vector_store.client.cursor() as cur:
+            versions, chunks = self.get_docs_files(cur)
+            ids  = cache.get(vector, self.file_ids, versions, search)
+            docs = self.get_by_ids(cur, ids) if ids else None
+            if not docs:
+                docs = self.search(cur, vector, chunks)
+                cache.set(vector, self.file_ids, versions, search, [doc.metadata["id"] for doc in docs])
+
+        VectorStoreRegistry().record("query", time.perf_counter() - start)
+        return docs
@@ -0,0 +1,99 @@
+import os
+import re
+import time
+import hashlib
+import numpy as np
+from dotenv import load_dotenv
+
+from langchain_community.embeddings.oci_generative_ai import OCIGenAIEmbeddings
+from oci.exceptions import TransientServiceError, ServiceError
+
+load_dotenv()
+
+class OCIEmbeddingBackend:
+    """
+    Embeddings from OCI Generative AI (CON_GEN_AI_EMB_MODEL_ID), the same
+    model SP_VECTOR_STORE calls from the database.
+    """
+    def __init__(self, model_id=None, retries=3):
+        self.model_id = model_id or os.getenv('CON_GEN_AI_EMB_MODEL_ID')
+        self.retries  = retries
+        self.client   = OCIGenAIEmbeddings(
+            model_id         = self.model_id,
+            service_endpoint = os.getenv('CON_GEN_AI_SERVICE_ENDPOINT'),
+            compartment_id   = os.getenv('CON_COMPARTMENT_ID')
+        )
+
+    def embed_documents(self, texts):
+        """
+        Embeds a batch of texts in one request, retrying throttled calls.
+
+        Args:
+            texts (list): Texts to embed.
+
+        Returns:
+            list: One vector (list of floats) per text.
+        """
+        for attempt in range(self.retries):
+            try:
+                return self.client.embed_documents(texts)
+            except (TransientServiceError, ServiceError) as e:
+                # 429/5xx: reintentar con espera exponencial
+                status = getattr(e, "status", 500)
+                if attempt == self.retries - 1 or (status != 429 and status < 500):
+                    raise
+                time.sleep(2 ** attempt)
+
+class LocalEmbeddingBackend:
+    """
+    Deterministic local embeddings (feature hashing of the words), with no
+    network calls. Same text, same vector: a stand-in for the provider in
+    tests and benchmarks, not a semantic model.
+    """
+    def __init__(self, dimensions=None, latency=None):
+        self.dimensions = int(dimensions or os.getenv('CON_GEN_AI_EMB_LOCAL_DIMENSIONS', 1024))
+        # Segundos por llamada para simular la latencia del proveedor en benchmarks
+        self.latency    = float(latency if latency is not None else os.getenv('CON_GEN_AI_EMB_LOCAL_LATENCY', 0))
+        self.model_id   = f"local-hash-{self.dimensions}"
+
+    def embed_text(self, text):
+        vector = np.zeros(self.dimensions, dtype=np.float32)
+        for word in re.findall(r"\w+", text.lower()):
+            digest = int.from_bytes(hashlib.blake2b(word.encode("utf-8"), digest_size=8).digest(), "little")
+            vector[digest % self.dimensions] += 1.0 if digest & (1 << 63) else -1.0
+        norm = np.linalg.norm(vector)
+        return (vector / norm if norm else vector).tolist()
+
+    def embed_documents(self, texts):
+        """
+        Embeds a batch of texts.
+
+        Args:
+            texts (list): Texts to embed.
+
+        Returns:
+            list: One vector (list of floats) per text.
+        """
+        if self.latency:
+            time.sleep(self.latency)
+        return [self.embed_text(text) for text in texts]
+
+# Backends by name (CON_GEN_AI_EMB_BACKEND)
+EMBEDDING_BACKENDS = {
+    "oci"   : OCIEmbeddingBackend,
+    "local" : LocalEmbeddingBackend
+}
+
+def get_embedding_backend(name=None, **kwargs):
+    """
+    Returns an embedding backend: any object with a model_id attribute and
+    an embed_documents(texts) method.
+
+    Args:
+        name (str): Key of EMBEDDING_BACKENDS (default CON_GEN_AI_EMB_BACKEND or "oci").
+        kwargs: Arguments for the backend.
+    """
+    name = (name or os.getenv('CON_GEN_AI_EMB_BACKEND', 'oci')).lower()
+    if name not in EMBEDDING_BACKENDS:
+        raise ValueError(f"Unknown embedding backend '{name}'. Options: {', '.join(EMBEDDING_BACKENDS)}")
+    return EMBEDDING_BACKENDS[name](**kwargs)
@@ -0,0 +1,107 @@
+import os
+import array
+import oracledb
+from dotenv import load_dotenv
+
+from services.database.connection import Connection
+
+load_dotenv()
+
+# Embeddings kept in EMB_CACHE; beyond it the least recently used are evicted
+EMB_CACHE_MAX_ROWS = int(os.getenv('CON_EMB_CACHE_MAX_ROWS', 1000000))
+
+GET_EMB_CACHE_STATS_QUERY = """
+    SELECT
+        S.MODEL_ID,
+        S.HITS,
+        S.MISSES,
+        ROUND(S.HITS / NULLIF(S.HITS + S.MISSES, 0) * 100, 2) AS HIT_RATE,
+        S.EVICTIONS,
+        NVL(C.ENTRIES, 0) AS ENTRIES,
+        S.UPDATED_AT
+    FROM EMB_CACHE_STATS S
+    LEFT JOIN (
+        SELECT MODEL_ID, COUNT(1) AS ENTRIES
+        FROM EMB_CACHE
+        GROUP BY MODEL_ID
+    ) C
+    ON S.MODEL_ID = C.MODEL_ID
+    ORDER BY S.MODEL_ID
+"""
+
+class EmbeddingCache:
+    """
+    Persistent embedding cache shared by every file: EMB_CACHE keyed by
+    (embedding model id, chunk hash), the same table SP_VECTOR_STORE reads.
+    A chunk already embedded for any file, user or module is copied from
+    it instead of calling the embedding provider again.
+
+    The methods take a cursor in autocommit: every statement is its own
+    short transaction, outside the DOCS transaction of the ingest, so the
+    shared EMB_CACHE rows are never locked while a file is embedded.
+    """
+    def __init__(self, max_rows=None):
+        """
+        Args:
+            max_rows (int): Entries kept after evict() (CON_EMB_CACHE_MAX_ROWS).
+        """
+        self.conn_instance = Connection()
+        self.max_rows      = max_rows or EMB_CACHE_MAX_ROWS
+
+    @staticmethod
+    def lookup(cur, model_id, hashes):
+        """
+        Marks the cached hashes as used, so eviction keeps them until the
+        ingest copies them to DOCS.
+
+        Args:
+            cur (oracledb.Cursor): Cursor of a connection in autocommit.
+            model_id (str): Embedding model id.
+            hashes (list): Chunk hashes to look up.
+
+        Returns:
+            set: The hashes found in the cache (hits).
+        """
+        if not hashes:
+            return set()
+        cur.executemany("""
+            UPDATE EMB_CACHE SET
+                HITS         = HITS + 1,
+                LAST_USED_AT = SYSTIMESTAMP
+            WHERE MODEL_ID = :model_id
+            AND CHUNK_HASH = :chunk_hash
+        """, [{"model_id": model_id, "chunk_hash": h} for h in hashes], arraydmlrowcounts=True)
+        return {h for h, count in zip(hashes, cur.getarraydmlrowcounts()) if count}
+
+    @staticmethod
+    def store(cur, model_id, hashes, vectors):
+        """
+        Adds freshly embedded chunks to the cache; a hash another session
+        stored meanwhile is skipped.
+        """
+        if not hashes:
+            return
+        cur.setinputsizes(embedding=oracledb.DB_TYPE_VECTOR)
+        cur.executemany("""
+            INSERT /*+ IGNORE_ROW_ON_DUPKEY_INDEX(EMB_CACHE, PK_EMB_CACHE) */
+            INTO EMB_CACHE (MODEL_ID, CHUNK_HASH, EMBEDDING)
+            VALUES (:model_id, :chunk_hash, :embedding)
+        """, [
+            {"model_id": model_id, "chunk_hash": h, "embedding": array.array("f", vector)}
+            for h, vector in zip(hashes, vectors)
+        ])
+
+    def record(self, cur, model_id, hits, misses):
+        """
+        Adds the hits and misses of an ingest to EMB_CACHE_STATS and evicts
+        the least recently used entries beyond max_rows (after the DOCS commit).
+        """
+        cur.callproc("SP_EMB_CACHE_STATS", [model_id, hits, misses])
+        cur.callproc("SP_EMB_CACHE_EVICT", [self.max_rows])
+
+    def get_stats(self):
+        """
+        Returns:
+            pd.DataFrame: Hits, misses, hit rate (%), evictions and entries per model.
+        """
+        return self.conn_instance.read_df(GET_EMB_CACHE_STATS_QUERY)
@@ -1,6 +1,137 @@
-import streamlit as st
+import codecs
+import oracledb
 import pandas as pd
-from services.database.connection import Connection
+from services.database.connection import Connection, fetch_df
+from services.database.connection_async import AsyncConnection
+from services.database.cache import QueryCache, cached
+
+# Characters per LOB write (one round trip each) when streaming an extraction
+EXTRACTION_WRITE_SIZE = 1024 * 1024
+
+# Characters per page when reading an extraction (get_extraction)
+EXTRACTION_PAGE_SIZE = 100000
+
+# Rows per page in the file list (get_files_page)
+FILES_PAGE_SIZE = 50
+
+FILES_BASE_QUERY = """
+    SELECT 
+        A.FILE_ID,
+        A.MODULE_ID,
+        B.MODULE_NAME,
+        B.MODULE_VECTOR_STORE,
+        A.FILE_SRC_FILE_NAME,
+        A.FILE_SRC_SIZE,
+        A.FILE_SRC_STRATEGY,
+        CASE 
+            WHEN B.MODULE_VECTOR_STORE = 0 THEN NULL 
+            ELSE A.FILE_TRG_OBJ_NAME 
+        END AS FILE_TRG_OBJ_NAME,
+        A.FILE_TRG_TOT_PAGES,
+        A.FILE_TRG_TOT_CHARACTERS,
+        A.FILE_TRG_TOT_TIME,
+        A.FILE_TRG_LANGUAGE,
+        A.FILE_TRG_PII,
+        A.FILE_DESCRIPTION,
+        A.FILE_VERSION,
+        A.FILE_DATE,
+        A.FILE_STATE,
+        FU1.USER_ID,
+        U1.USER_GROUP_ID,
+        FU2.OWNER,
+        FU2.USER_ID AS USER_ID_OWNER,
+        U2.USER_USERNAME,
+        U2.USER_EMAIL
+    FROM
+        FILES A
+    LEFT JOIN
+        MODULES B
+        ON B.MODULE_ID = A.MODULE_ID
+    JOIN
+        FILE_USER FU1
+        ON FU1.FILE_ID = A.FILE_ID
+        AND FU1.USER_ID = :user_id
+    JOIN
+        USERS U1
+        ON U1.USER_ID = FU1.USER_ID
+    JOIN
+        FILE_USER FU2
+        ON FU2.FILE_ID = A.FILE_ID
+        AND FU2.OWNER = 1
+    JOIN
+        USERS U2
+        ON U2.USER_ID = FU2.USER_ID
+    WHERE
+        A.FILE_STATE <> 0
+"""
+
+# Share count of the listed rows: one grouped join over the rows of the
+# list (FILE_ID IN ...) instead of a correlated COUNT per row
+FILES_SHARES_QUERY = """
+    SELECT P.*, NVL(SC.FILE_USERS, 0) AS FILE_USERS
+    FROM ITEMS P
+    LEFT JOIN (
+        SELECT X.FILE_ID, COUNT(1) AS FILE_USERS
+        FROM FILE_USER X
+        WHERE X.OWNER <> 1
+        AND X.FILE_ID IN (SELECT FILE_ID FROM ITEMS)
+        GROUP BY X.FILE_ID
+    ) SC
+        ON SC.FILE_ID = P.FILE_ID
+    ORDER BY P.FILE_ID DESC
+"""
+
+GET_ALL_FILES_QUERY = f"""
+    WITH ITEMS AS (
+{FILES_BASE_QUERY}
+    )
+{FILES_SHARES_QUERY}
+"""
+
+# Keyset pagination: rows after :after_id (newest first) with optional
+# filters; :page_rows is the page size + 1 to know if there is a next page
+GET_FILES_PAGE_QUERY = f"""
+    WITH ITEMS AS (
+{FILES_BASE_QUERY}
+        AND (:after_id IS NULL OR A.FILE_ID < :after_id)
+        AND (:module_id IS NULL OR A.MODULE_ID = :module_id)
+        AND (:file_state IS NULL OR A.FILE_STATE = :file_state)
+        AND (:file_name IS NULL OR INSTR(UPPER(A.FILE_SRC_FILE_NAME), UPPER(:file_name)) > 0)
+        ORDER BY A.FILE_ID DESC
+        FETCH FIRST :page_rows ROWS ONLY
+    )
+{FILES_SHARES_QUERY}
+"""
+
+GET_ALL_FILE_USER_QUERY = """
+    SELECT 
+        FU.FILE_USER_ID,
+        FU.FILE_ID,
+        F.FILE_SRC_FILE_NAME,
+        F.FILE_DESCRIPTION,
+        FU.USER_ID,
+        U.USER_USERNAME,
+        U.USER_NAME || ', ' || U.USER_LAST_NAME AS USER_FULL_NAME,
+        UG.USER_GROUP_ID,
+        UG.USER_GROUP_NAME,
+        FU.OWNER,
+        FU.FILE_USER_STATE,
+        FU.FILE_USER_DATE
+    FROM
+        FILE_USER FU
+    JOIN FILES F 
+        ON FU.FILE_ID = F.FILE_ID
+    JOIN USERS U
+        ON FU.USER_ID = U.USER_ID
+    JOIN USER_GROUP UG
+        ON U.USER_GROUP_ID = UG.USER_GROUP_ID
+    WHERE
+        FU.USER_ID <> :user_id
+        AND FU.OWNER <> 1
+        AND F.FILE_STATE <> 0
+    ORDER BY
+        FU.FILE_USER_ID
+"""
 
 class FileService:
     """
@@ -8,12 +139,13 @@ class FileService:
     """
     def __init__(self):
         """
-        Initializes the FileService with a shared database connection instance.
+        Initializes the FileService with the shared connection manager; each
+        operation takes its own session through acquire().
         """
         self.conn_instance = Connection()
-        self.conn = self.conn_instance.get_connection()
+        self.cache         = QueryCache()
 
-    @st.cache_data
+    @cached("files")
     def get_all_files(_self, user_id):
         """
         Retrieves all files associated with a user, including OWNER status, username, email, and user count.
@@ -24,78 +156,94 @@ class FileService:
         Returns:
             pd.DataFrame: A DataFrame containing file information.
         """
-        query = """
-            SELECT 
-                A.FILE_ID,
-                A.MODULE_ID,
-                B.MODULE_NAME,
-                B.MODULE_VECTOR_STORE,
-                A.FILE_SRC_FILE_NAME,
-                A.FILE_SRC_SIZE,
-                A.FILE_SRC_STRATEGY,
-                CASE 
-                    WHEN B.MODULE_VECTOR_STORE = 0 THEN NULL 
-                    ELSE A.FILE_TRG_OBJ_NAME 
-                END AS FILE_TRG_OBJ_NAME,
-                A.FILE_TRG_EXTRACTION,
-                A.FILE_TRG_TOT_PAGES,
-                A.FILE_TRG_TOT_CHARACTERS,
-                A.FILE_TRG_TOT_TIME,
-                A.FILE_TRG_LANGUAGE,
-                A.FILE_TRG_PII,
-                A.FILE_DESCRIPTION,
-                A.FILE_VERSION,
-                A.FILE_DATE,
-                A.FILE_STATE,
-                FU1.USER_ID,
-                U1.USER_GROUP_ID,
-                FU2.OWNER,
-                FU2.USER_ID AS USER_ID_OWNER,
-                U2.USER_USERNAME,
-                U2.USER_EMAIL,
-                (
-                    SELECT COUNT(1)
-                    FROM FILE_USER FU3
-                    WHERE FU3.FILE_ID = A.FILE_ID
-                    AND FU3.OWNER <> 1
-                ) AS FILE_USERS
-            FROM
-                FILES A
-            LEFT JOIN
-                MODULES B
-                ON B.MODULE_ID = A.MODULE_ID
-            JOIN
-                FILE_USER FU1
-                ON FU1.FILE_ID = A.FILE_ID
-                AND FU1.USER_ID = :user_id
-            JOIN
-                USERS U1
-                ON U1.USER_ID = FU1.USER_ID
-            JOIN
-                FILE_USER FU2
-                ON FU2.FILE_ID = A.FILE_ID
-                AND FU2.OWNER = 1
-            JOIN
-                USERS U2
-                ON U2.USER_ID = FU2.USER_ID
-            WHERE
-                A.FILE_STATE <> 0
-            ORDER BY
-                A.FILE_ID DESC
+        return _self.conn_instance.read_df(GET_ALL_FILES_QUERY, params={"user_id": user_id})
+
+    @cached("files")
+    def get_files_page(
+            _self,
+            user_id,
+            after_id=None,
+            page_size=FILES_PAGE_SIZE,
+            module_id=None,
+            file_state=None,
+            file_name=None
+        ):
+        """
+        Retrieves one page of the files of a user, newest first. Pages are
+        read by keyset (FILE_ID < after_id), so every page costs the same.
+
+        Args:
+            user_id (int): The ID of the user.
+            after_id (int): Last FILE_ID of the previous page (None for the first page).
+            page_size (int): Rows per page.
+            module_id (int): Only files of this module.
+            file_state (int): Only files in this state.
+            file_name (str): Only files whose source name contains this text.
+
+        Returns:
+            tuple: (pd.DataFrame, next_after_id); next_after_id is None on the last page.
+        """
+        df = _self.conn_instance.read_df(GET_FILES_PAGE_QUERY, params={
+            "user_id": user_id,
+            "after_id": after_id,
+            "module_id": module_id,
+            "file_state": file_state,
+            "file_name": file_name or None,
+            "page_rows": page_size + 1
+        })
+        if len(df) > page_size:
+            df = df.head(page_size)
+            return df, int(df["FILE_ID"].iloc[-1])
+        return df, None
+
+    @cached("files", per_user=False)
+    def get_extraction(_self, file_id, offset=0, length=EXTRACTION_PAGE_SIZE):
+        """
+        Reads one page of the file extraction (FILE_TRG_EXTRACTION). The file
+        list does not carry the CLOB; the text is read on demand, one page at a
+        time, so large extractions are never loaded whole.
+
+        Args:
+            file_id (int): The ID of the file.
+            offset (int): First character to read (0-based).
+            length (int): Maximum number of characters to read.
+
+        Returns:
+            tuple: (text, total_length). text is "" when there is no extraction.
         """
-        return pd.read_sql(query, con=_self.conn, params={"user_id": user_id})
+        with _self.conn_instance.acquire() as conn, conn.cursor() as cur:
+            # SUBSTR sobre un CLOB devuelve un CLOB: solo viaja la página pedida
+            cur.execute("""
+                SELECT
+                    SUBSTR(FILE_TRG_EXTRACTION, :offset, :length),
+                    NVL(DBMS_LOB.GETLENGTH(FILE_TRG_EXTRACTION), 0)
+                FROM FILES
+                WHERE FILE_ID = :file_id
+            """, {
+                "offset": int(offset) + 1,
+                "length": int(length),
+                "file_id": int(file_id)
+            })
+            row = cur.fetchone()
+
+        if row is None:
+            return "", 0
+        return row[0] or "", int(row[1])
 
     def delete_file_user_by_user(self, file_id, user_id, file_name):
         delete_query = """
             DELETE FROM FILE_USER
             WHERE FILE_ID = :file_id AND USER_ID = :user_id
         """
-        with self.conn.cursor() as cur:
+        with self.conn_instance.acquire() as conn, conn.cursor() as cur:
             cur.execute(delete_query, {
                 "file_id": file_id,
                 "user_id": user_id
             })
 
+        # El dueño ve el número de usuarios del archivo
+        self.cache.invalidate("files")
+        self.cache.invalidate("file_user")
         return f"You have been removed from access to file **{file_name}**."
     
     def insert_file(
@@ -112,107 +260,111 @@ class FileService:
             file_description
         ):
         """
-        Inserts or updates a file record and its user association.
-        """
-
-        # Verificar si el FILE ya existe (por file name, module y pii)
-        check_query = """
-            SELECT FILE_ID, FILE_VERSION
-            FROM FILES
-            WHERE FILE_SRC_FILE_NAME = :file_src_file_name
-            AND MODULE_ID = :module_id
-            AND FILE_TRG_PII = :file_trg_pii
-        """
-        df = pd.read_sql(check_query, con=self.conn, params={
-            "file_src_file_name": file_src_file_name,
-            "module_id": module_id,
-            "file_trg_pii": file_trg_pii
-        })
-
-        if not df.empty:
-            file_id = df['FILE_ID'].iloc[0]
-            file_version = df['FILE_VERSION'].iloc[0]
-
-            # Verificar si ya existe la relación con el usuario
-            user_file_query = """
-                SELECT 1 FROM FILE_USER
-                WHERE FILE_ID = :file_id AND USER_ID = :user_id
-            """
-            df_user_file = pd.read_sql(user_file_query, con=self.conn, params={
-                "file_id": file_id,
-                "user_id": user_id
-            })
+        Inserts or updates a file record and its user association in a single
+        round trip and a single transaction:
 
-            if not df_user_file.empty:
-                # El archivo existe y ya está asociado al usuario → actualizar versión
-                with self.conn.cursor() as cur:
-                    cur.execute("""
-                        UPDATE FILES SET
-                            FILE_SRC_SIZE      = :file_src_size,
-                            FILE_SRC_STRATEGY  = :file_src_strategy,
-                            FILE_TRG_LANGUAGE  = :file_trg_language,
-                            FILE_VERSION       = :file_version + 1,
-                            FILE_DESCRIPTION   = :file_description,
-                            FILE_STATE         = 1,
-                            FILE_DATE          = SYSDATE
-                        WHERE FILE_ID = :file_id
-                    """, {
-                        "file_src_size": file_src_size,
-                        "file_src_strategy": file_src_strategy,
-                        "file_trg_language": file_trg_language,
-                        "file_version": int(file_version),
-                        "file_description": file_description,
-                        "file_id": int(file_id)
-                    })
-                self.conn.commit()
+          - The file exists and is linked to the user → new version (FILE_VERSION + 1).
+            Its DOCS are kept: the vector store update only re-embeds the
+            chunks that changed (chunk hashes).
+          - The file exists but is not linked → linked to the user in FILE_USER.
+          - The file does not exist → new FILES row and FILE_USER link.
 
-                # Borrar documentos asociados anteriores
-                with self.conn.cursor() as cur:
-                    cur.execute("DELETE FROM DOCS WHERE FILE_ID = :file_id", {"file_id": int(file_id)})
-                self.conn.commit()
+        The existing row is locked (FOR UPDATE) so concurrent uploads of the same
+        file are serialized; with the FILES_SRC_UK unique index a concurrent
+        create is retried as an update instead of duplicating the file.
 
-                return f"File '{file_name}' already existed and added new version.", int(file_id)
-
-            else:
-                # El archivo existe pero no está asociado al usuario → asociar en FILE_USER
-                with self.conn.cursor() as cur:
-                    cur.execute("""
-                        INSERT INTO FILE_USER (FILE_ID, USER_ID)
-                        VALUES (:file_id, :user_id)
-                    """, {
-                        "file_id": int(file_id),
-                        "user_id": int(user_id)
-                    })
-                self.conn.commit()
-
-                return f"File '{file_name}' existed but was linked to user.", int(file_id)
-
-        else:
-            # El archivo no existe → crear nuevo FILE y FILE_USER
-            with self.conn.cursor() as cur:
+        Returns:
+            tuple: (message, file_id)
+        """
+        with self.conn_instance.acquire() as conn:
+            with conn.cursor() as cur:
                 file_id_var = cur.var(int)
+                outcome_var = cur.var(int)
                 cur.execute("""
-                    INSERT INTO FILES (
-                        MODULE_ID,
-                        FILE_SRC_FILE_NAME,
-                        FILE_SRC_SIZE,
-                        FILE_SRC_STRATEGY,
-                        FILE_TRG_OBJ_NAME,
-                        FILE_TRG_LANGUAGE,
-                        FILE_TRG_PII,
-                        FILE_DESCRIPTION
-                    ) VALUES (
-                        :module_id,
-                        :file_src_file_name,
-                        :file_src_size,
-                        :file_src_strategy,
-                        :file_trg_obj_name,
-                        :file_trg_language,
-                        :file_trg_pii,
-                        :file_description
-                    ) RETURNING FILE_ID INTO :file_id
+                    DECLARE
+                        v_file_id  FILES.FILE_ID%TYPE;
+                        v_linked   NUMBER;
+                        v_attempt  NUMBER := 0;
+                    BEGIN
+                        LOOP
+                            v_attempt := v_attempt + 1;
+                            BEGIN
+                                SELECT FILE_ID INTO v_file_id
+                                FROM FILES
+                                WHERE FILE_SRC_FILE_NAME = :file_src_file_name
+                                AND MODULE_ID = :module_id
+                                AND FILE_TRG_PII = :file_trg_pii
+                                AND ROWNUM = 1
+                                FOR UPDATE;
+                            EXCEPTION
+                                WHEN NO_DATA_FOUND THEN
+                                    v_file_id := NULL;
+                            END;
+
+                            IF v_file_id IS NULL THEN
+                                BEGIN
+                                    INSERT INTO FILES (
+                                        MODULE_ID,
+                                        FILE_SRC_FILE_NAME,
+                                        FILE_SRC_SIZE,
+                                        FILE_SRC_STRATEGY,
+                                        FILE_TRG_OBJ_NAME,
+                                        FILE_TRG_LANGUAGE,
+                                        FILE_TRG_PII,
+                                        FILE_DESCRIPTION
+                                    ) VALUES (
+                                        :module_id,
+                                        :file_src_file_name,
+                                        :file_src_size,
+                                        :file_src_strategy,
+                                        :file_trg_obj_name,
+                                        :file_trg_language,
+                                        :file_trg_pii,
+                                        :file_description
+                                    ) RETURNING FILE_ID INTO v_file_id;
+
+                                    INSERT INTO FILE_USER (FILE_ID, USER_ID)
+                                    VALUES (v_file_id, :user_id);
+
+                                    :outcome := 3;
+                                    EXIT;
+                                EXCEPTION
+                                    WHEN DUP_VAL_ON_INDEX THEN
+                                        IF v_attempt > 1 THEN
+                                            RAISE;
+                                        END IF;
+                                END;
+                            ELSE
+                                SELECT COUNT(1) INTO v_linked
+                                FROM FILE_USER
+                                WHERE FILE_ID = v_file_id AND USER_ID = :user_id;
+
+                                IF v_linked > 0 THEN
+                                    UPDATE FILES SET
+                                        FILE_SRC_SIZE      = :file_src_size,
+                                        FILE_SRC_STRATEGY  = :file_src_strategy,
+                                        FILE_TRG_LANGUAGE  = :file_trg_language,
+                                        FILE_VERSION       = FILE_VERSION + 1,
+                                        FILE_DESCRIPTION   = :file_description,
+                                        FILE_STATE         = 1,
+                                        FILE_DATE          = SYSDATE
+                                    WHERE FILE_ID = v_file_id;
+
+                                    :outcome := 1;
+                                ELSE
+                                    INSERT INTO FILE_USER (FILE_ID, USER_ID)
+                                    VALUES (v_file_id, :user_id);
+                                    :outcome := 2;
+                                END IF;
+                                EXIT;
+                            END IF;
+                        END LOOP;
+
+                        :file_id := v_file_id;
+                    END;
                 """, {
                     "module_id": module_id,
+                    "user_id": int(user_id),
                     "file_src_file_name": file_src_file_name,
                     "file_src_size": file_src_size,
                     "file_src_strategy": file_src_strategy,
@@ -220,62 +372,120 @@ class FileService:
                     "file_trg_language": file_trg_language,
                     "file_trg_pii": file_trg_pii,
                     "file_description": file_description,
-                    "file_id": file_id_var
+                    "file_id": file_id_var,
+                    "outcome": outcome_var
                 })
-            self.conn.commit()
+            conn.commit()
 
-            file_id_new = file_id_var.getvalue()[0]
+            file_id = int(file_id_var.getvalue())
+            outcome = outcome_var.getvalue()
 
-            # Asociar el nuevo FILE con el USER
-            with self.conn.cursor() as cur:
-                cur.execute("""
-                    INSERT INTO FILE_USER (FILE_ID, USER_ID)
-                    VALUES (:file_id, :user_id)
-                """, {
-                    "file_id": int(file_id_new),
-                    "user_id": int(user_id)
-                })
-            self.conn.commit()
+            # Una nueva versión cambia el archivo para todos sus usuarios
+            self.cache.invalidate("files", None if outcome == 1 else [user_id])
 
-            return f"File '{file_name}' has been created successfully.", file_id_new
+            if outcome == 1:
+                return f"File '{file_name}' already existed and added new version.", file_id
+            if outcome == 2:
+                return f"File '{file_name}' existed but was linked to user.", file_id
+            return f"File '{file_name}' has been created successfully.", file_id
 
-    
     def update_extraction(
             self,
             file_id,
             file_trg_extraction
         ):
         """
-        Updates the file extraction information in the database using CLOB for large text.
+        Writes the file extraction text to the FILE_TRG_EXTRACTION CLOB,
+        replacing the previous one, in a single transaction.
+
+        A str is sent as one CLOB bind (one round trip). A file-like object
+        (text or UTF-8 bytes) or an iterator of str chunks is streamed into
+        the LOB locator in EXTRACTION_WRITE_SIZE pieces, so the whole text
+        never has to be held in memory.
 
         Args:
-            file_id (int)             : ID of the file to update.
-            file_trg_extraction (str) : Extraction content to update.
+            file_id (int)                             : ID of the file to update.
+            file_trg_extraction (str | IO | Iterable) : Extraction content to write.
 
         Returns:
             str: Success message or error message.
         """
-        # Define chunk size for splitting the content
-        chunk_size     = 4000  # Oracle supports up to 4000 characters per chunk
-        tot_characters = len(file_trg_extraction)
-        for i in range(0, tot_characters, chunk_size):
-            chunk = file_trg_extraction[i:i + chunk_size]
-
-            with self.conn.cursor() as cur:
-                # Append the current chunk to the CLOB column
-                # Using parameter binding for chunk
-                cur.execute("""
-                    UPDATE FILES SET
-                        FILE_TRG_EXTRACTION = CONCAT(FILE_TRG_EXTRACTION, :chunk)
-                    WHERE FILE_ID = :file_id
-                """, {
-                    "chunk": chunk,
-                    "file_id": file_id
-                })
-            self.conn.commit()
-
+        with self.conn_instance.acquire() as conn:
+            if isinstance(file_trg_extraction, str):
+                with conn.cursor() as cur:
+                    cur.setinputsizes(extraction=oracledb.DB_TYPE_CLOB)
+                    cur.execute("""
+                        UPDATE FILES SET
+                            FILE_TRG_EXTRACTION = :extraction
+                        WHERE FILE_ID = :file_id
+                    """, {
+                        "extraction": file_trg_extraction,
+                        "file_id": file_id
+                    })
+                conn.commit()
+                self.cache.invalidate("files")
+                return f"File extraction has been updated successfully."
+
+        # The locator is only writable inside the transaction that returned it:
+        # a session of its own, so the shared connection stays in autocommit
+        with self.conn_instance.transaction() as conn, conn.cursor() as cur:
+            lob_var = cur.var(oracledb.DB_TYPE_CLOB)
+            cur.execute("""
+                UPDATE FILES SET
+                    FILE_TRG_EXTRACTION = EMPTY_CLOB()
+                WHERE FILE_ID = :file_id
+                RETURNING FILE_TRG_EXTRACTION INTO :lob
+            """, {
+                "file_id": file_id,
+                "lob": lob_var
+            })
+            lobs = lob_var.getvalue()
+            if lobs:
+                lob    = lobs[0]
+                offset = 1
+                for chunk in self._iter_extraction_chunks(file_trg_extraction):
+                    lob.write(chunk, offset)
+                    # Los offsets de un CLOB cuentan unidades UTF-16, no caracteres
+                    offset += len(chunk.encode("utf-16-le")) // 2
+
+        self.cache.invalidate("files")
         return f"File extraction has been updated successfully."
 
+    @staticmethod
+    def _iter_extraction_chunks(source, chunk_size=None):
+        """
+        Yields the extraction as str pieces of about chunk_size characters from
+        a file-like object (text or UTF-8 bytes) or an iterator of str chunks.
+        """
+        chunk_size = chunk_size or EXTRACTION_WRITE_SIZE
+        if hasattr(source, "read"):
+            decoder = codecs.getincrementaldecoder("utf-8")()
+            while True:
+                chunk = source.read(chunk_size)
+                if not chunk:
+                    break
+                if isinstance(chunk, bytes):
+                    chunk = decoder.decode(chunk)
+                if chunk:
+                    yield chunk
+            tail = decoder.decode(b"", final=True)
+            if tail:
+                yield tail
+            return
+
+        # Join small pieces (e.g. one per page) to keep round trips low
+        buffer, size = [], 0
+        for chunk in source:
+            if not chunk:
+                continue
+            buffer.append(chunk)
+            size += len(chunk)
+            if size >= chunk_size:
+                yield "".join(buffer)
+                buffer, size = [], 0
+        if buffer:
+            yield "".join(buffer)
+
     def update_file(
             self,
             file_id,
@@ -300,26 +510,28 @@ class FileService:
         Returns:
             str: Success message or error message.
         """
-        # Update the existing file record
-        with self.conn.cursor() as cur:
-            cur.execute("""
-                UPDATE FILES SET
-                    FILE_TRG_OBJ_NAME       = :file_trg_obj_name,
-                    FILE_TRG_TOT_PAGES      = :file_trg_tot_pages,
-                    FILE_TRG_TOT_CHARACTERS = :file_trg_tot_characters,
-                    FILE_TRG_TOT_TIME       = :file_trg_tot_time,
-                    FILE_TRG_LANGUAGE       = :file_trg_language
-                WHERE FILE_ID = :file_id
-            """, {
-                "file_trg_obj_name": file_trg_obj_name,
-                "file_trg_tot_pages": file_trg_tot_pages,
-                "file_trg_tot_characters": file_trg_tot_characters,
-                "file_trg_tot_time": file_trg_tot_time,
-                "file_trg_language": file_trg_language,
-                "file_id": file_id
-            })
-        self.conn.commit()
-        return f"The file was updated successfully."
+        with self.conn_instance.acquire() as conn:
+            # Update the existing file record
+            with conn.cursor() as cur:
+                cur.execute("""
+                    UPDATE FILES SET
+                        FILE_TRG_OBJ_NAME       = :file_trg_obj_name,
+                        FILE_TRG_TOT_PAGES      = :file_trg_tot_pages,
+                        FILE_TRG_TOT_CHARACTERS = :file_trg_tot_characters,
+                        FILE_TRG_TOT_TIME       = :file_trg_tot_time,
+                        FILE_TRG_LANGUAGE       = :file_trg_language
+                    WHERE FILE_ID = :file_id
+                """, {
+                    "file_trg_obj_name": file_trg_obj_name,
+                    "file_trg_tot_pages": file_trg_tot_pages,
+                    "file_trg_tot_characters": file_trg_tot_characters,
+                    "file_trg_tot_time": file_trg_tot_time,
+                    "file_trg_language": file_trg_language,
+                    "file_id": file_id
+                })
+            conn.commit()
+            self.cache.invalidate("files")
+            return f"The file was updated successfully."
 
 
     def delete_file(self, file_name, file_id):
@@ -333,91 +545,185 @@ class FileService:
         Returns:
             str: Success or error message.
         """
-        # Verificar que el archivo exista y esté activo
-        query_check = """
-            SELECT FILE_ID FROM FILES
-            WHERE FILE_ID = :file_id AND FILE_STATE <> 0
-        """
-        df = pd.read_sql(query_check, con=self.conn, params={"file_id": file_id})
+        with self.conn_instance.acquire() as conn:
+            # Verificar que el archivo exista y esté activo
+            query_check = """
+                SELECT FILE_ID FROM FILES
+                WHERE FILE_ID = :file_id AND FILE_STATE <> 0
+            """
+            df = fetch_df(conn, query_check, params={"file_id": file_id})
 
-        if df.empty:
-            return f"File '{file_name}' does not exist or is already deleted."
+            if df.empty:
+                return f"File '{file_name}' does not exist or is already deleted."
 
-        try:
-            with self.conn.cursor() as cur:
-                # Eliminar de DOCS
-                cur.execute("""
-                    DELETE FROM DOCS WHERE FILE_ID = :file_id
-                """, {"file_id": file_id})
+            try:
+                with conn.cursor() as cur:
+                    # Eliminar de DOCS
+                    cur.execute("""
+                        DELETE FROM DOCS WHERE FILE_ID = :file_id
+                    """, {"file_id": file_id})
 
-                # Eliminar de FILE_USER
-                cur.execute("""
-                    DELETE FROM FILE_USER WHERE FILE_ID = :file_id
-                """, {"file_id": file_id})
+                    # Eliminar de FILE_USER
+                    cur.execute("""
+                        DELETE FROM FILE_USER WHERE FILE_ID = :file_id
+                    """, {"file_id": file_id})
 
-                # Eliminar de FILES
-                cur.execute("""
-                    DELETE FROM FILES WHERE FILE_ID = :file_id
-                """, {"file_id": file_id})
+                    # Eliminar de FILES
+                    cur.execute("""
+                        DELETE FROM FILES WHERE FILE_ID = :file_id
+                    """, {"file_id": file_id})
 
-            self.conn.commit()
-            return f"File '{file_name}' and all related records have been deleted successfully."
+                conn.commit()
+                self.cache.invalidate("files")
+                self.cache.invalidate("file_user")
+                return f"File '{file_name}' and all related records have been deleted successfully."
 
-        except Exception as e:
-            self.conn.rollback()
-            return f"[Error] Failed to delete file '{file_name}': {str(e)}"
+            except Exception as e:
+                conn.rollback()
+                return f"[Error] Failed to delete file '{file_name}': {str(e)}"
 
         
-    def update_file_user(self, file_id, user_ids):
+    def update_file_user(self, file_id, user_ids=None, user_group_id=None):
         """
-        Updates the FILE_USER table for a given FILE_ID by replacing the existing non-owner users.
+        Sets the users a file is shared with (non-owner FILE_USER rows) to the
+        given user list, or to all active users of a group.
+
+        Only the difference with the current share list is applied: removed
+        users are deleted and new users inserted set-based (NOT EXISTS), so
+        unchanged rows are kept. A group share is applied with INSERT ... SELECT,
+        without bringing the users to Python.
+
+        The change runs in one PL/SQL block, so it is applied whole or not at
+        all, and the FILES row is locked (FOR UPDATE) so two concurrent edits
+        of the list are applied one after the other instead of duplicating rows.
 
         Args:
             file_id (int): The file ID to update.
-            user_ids (list): List of user IDs to assign to this file (shared users).
+            user_ids (list): User IDs to share this file with.
+            user_group_id (int): Share with every active user of this group instead.
 
         Returns:
             str: Success message.
         """
-        # Eliminar solo las asociaciones de usuarios que no son owner
-        delete_query = """
-            DELETE FROM FILE_USER
-            WHERE FILE_ID = :file_id AND OWNER = 0
-        """
-        with self.conn.cursor() as cur:
-            cur.execute(delete_query, {"file_id": file_id})
-        
-        # Insertar los nuevos usuarios (si hay)
-        insert_query = """
-            INSERT INTO FILE_USER (FILE_USER_ID, FILE_ID, USER_ID, OWNER)
-            VALUES (FILE_USER_ID_SEQ.NEXTVAL, :file_id, :user_id, 0)
-        """
-        with self.conn.cursor() as cur:
-            for user_id in user_ids:
-                cur.execute(insert_query, {"file_id": file_id, "user_id": user_id})
-        
-        self.conn.commit()
-        return f"File User relations for File ID [{file_id}] updated successfully."
-
+        with self.conn_instance.acquire() as conn:
+            if user_group_id is not None:
+                with conn.cursor() as cur:
+                    cur.execute("""
+                        DECLARE
+                            v_file_id FILES.FILE_ID%TYPE;
+                        BEGIN
+                            SELECT FILE_ID INTO v_file_id
+                            FROM FILES
+                            WHERE FILE_ID = :file_id
+                            FOR UPDATE;
+
+                            DELETE FROM FILE_USER
+                            WHERE FILE_ID = :file_id
+                            AND OWNER = 0
+                            AND USER_ID NOT IN (
+                                SELECT USER_ID FROM USERS
+                                WHERE USER_GROUP_ID = :user_group_id AND USER_STATE <> 0
+                            );
+
+                            INSERT INTO FILE_USER (FILE_USER_ID, FILE_ID, USER_ID, OWNER)
+                            SELECT FILE_USER_ID_SEQ.NEXTVAL, :file_id, U.USER_ID, 0
+                            FROM USERS U
+                            WHERE U.USER_GROUP_ID = :user_group_id
+                            AND U.USER_STATE <> 0
+                            AND NOT EXISTS (
+                                SELECT 1 FROM FILE_USER X
+                                WHERE X.FILE_ID = :file_id AND X.USER_ID = U.USER_ID
+                            );
+                        END;
+                    """, {"file_id": file_id, "user_group_id": user_group_id})
+                conn.commit()
+                self.cache.invalidate("files")
+                self.cache.invalidate("file_user")
+                return f"File User relations for File ID [{file_id}] updated successfully."
+
+            user_list = conn.gettype("SYS.ODCINUMBERLIST")
+            with conn.cursor() as cur:
+                linked_var  = cur.var(user_list)
+                added_var   = cur.var(user_list)
+                changed_var = cur.var(int)
+                cur.execute("""
+                    DECLARE
+                        v_file_id  FILES.FILE_ID%TYPE;
+                        v_users    SYS.ODCINUMBERLIST := :user_ids;
+                        v_linked   SYS.ODCINUMBERLIST;
+                        v_added    SYS.ODCINUMBERLIST;
+                        v_changed  NUMBER;
+                    BEGIN
+                        SELECT FILE_ID INTO v_file_id
+                        FROM FILES
+                        WHERE FILE_ID = :file_id
+                        FOR UPDATE;
+
+                        -- Lista actual: usuarios compartidos (OWNER = 0) y dueños
+                        SELECT USER_ID BULK COLLECT INTO v_linked
+                        FROM FILE_USER
+                        WHERE FILE_ID = v_file_id;
+
+                        DELETE FROM FILE_USER
+                        WHERE FILE_ID = v_file_id
+                        AND OWNER = 0
+                        AND USER_ID NOT IN (SELECT COLUMN_VALUE FROM TABLE(v_users));
+                        v_changed := SQL%ROWCOUNT;
+
+                        SELECT U.COLUMN_VALUE BULK COLLECT INTO v_added
+                        FROM TABLE(v_users) U
+                        WHERE NOT EXISTS (
+                            SELECT 1 FROM FILE_USER X
+                            WHERE X.FILE_ID = v_file_id AND X.USER_ID = U.COLUMN_VALUE
+                        );
+
+                        FORALL i IN 1 .. v_added.COUNT
+                            INSERT INTO FILE_USER (FILE_USER_ID, FILE_ID, USER_ID, OWNER)
+                            VALUES (FILE_USER_ID_SEQ.NEXTVAL, v_file_id, v_added(i), 0);
+
+                        :changed := v_changed + v_added.COUNT;
+                        :linked  := v_linked;
+                        :added   := v_added;
+                    END;
+                """, {
+                    "file_id": file_id,
+                    "user_ids": user_list.newobject(sorted({int(user_id) for user_id in user_ids or []})),
+                    "linked": linked_var,
+                    "added": added_var,
+                    "changed": changed_var
+                })
+            conn.commit()
+
+            # Solo cambia la lista de los usuarios vinculados (dueños y compartidos) y de los nuevos
+            if changed_var.getvalue():
+                linked_users = {int(user_id) for user_id in linked_var.getvalue().aslist()}
+                added_users  = {int(user_id) for user_id in added_var.getvalue().aslist()}
+                self.cache.invalidate("files", linked_users | added_users)
+                # La lista de compartidos de cualquier otro usuario puede incluir este registro
+                self.cache.invalidate("file_user")
+            return f"File User relations for File ID [{file_id}] updated successfully."
     
     def delete_file_user(self, file_user_id):
         """
         Deletes a record from FILE_USER.
         """
-        query = """
-            DELETE FROM FILE_USER WHERE FILE_USER_ID = :file_user_id
-        """
-        with self.conn.cursor() as cur:
-            cur.execute(query, {"file_user_id": file_user_id})
-        self.conn.commit()
-        return f"Shared FileUser ID {file_user_id} deleted successfully."
+        with self.conn_instance.acquire() as conn:
+            query = """
+                DELETE FROM FILE_USER WHERE FILE_USER_ID = :file_user_id
+            """
+            with conn.cursor() as cur:
+                cur.execute(query, {"file_user_id": file_user_id})
+            conn.commit()
+            self.cache.invalidate("files")
+            self.cache.invalidate("file_user")
+            return f"Shared FileUser ID {file_user_id} deleted successfully."
 
     def get_all_file_user_cache(self, user_id, force_update=False):
         if force_update:
-            self.get_all_file_user.clear()
+            self.get_all_file_user.clear(user_id)
         return self.get_all_file_user(user_id)
 
-    @st.cache_data
+    @cached("file_user", "files")
     def get_all_file_user(_self, user_id):
         """
         Retrieves FILE_USER records for files shared with other users (excluding current user_id).
@@ -428,33 +734,43 @@ class FileService:
         Returns:
             pd.DataFrame: Shared FILE_USER records (excluding files belonging to user_id).
         """
-        query = """
-            SELECT 
-                FU.FILE_USER_ID,
-                FU.FILE_ID,
-                F.FILE_SRC_FILE_NAME,
-                F.FILE_DESCRIPTION,
-                FU.USER_ID,
-                U.USER_USERNAME,
-                U.USER_NAME || ', ' || U.USER_LAST_NAME AS USER_FULL_NAME,
-                UG.USER_GROUP_ID,
-                UG.USER_GROUP_NAME,
-                FU.OWNER,
-                FU.FILE_USER_STATE,
-                FU.FILE_USER_DATE
-            FROM
-                FILE_USER FU
-            JOIN FILES F 
-                ON FU.FILE_ID = F.FILE_ID
-            JOIN USERS U
-                ON FU.USER_ID = U.USER_ID
-            JOIN USER_GROUP UG
-                ON U.USER_GROUP_ID = UG.USER_GROUP_ID
-            WHERE
-                FU.USER_ID <> :user_id
-                AND FU.OWNER <> 1
-                AND F.FILE_STATE <> 0
-            ORDER BY
-                FU.FILE_USER_ID
+        return _self.conn_instance.read_df(GET_ALL_FILE_USER_QUERY, params={"user_id": user_id})
+
+
+class FileServiceAsync:
+    """
+    Asyncio variant of FileService for the read queries a page loads at once.
+    Run them concurrently with services.database.gather(); results are
+    shared with the sync service through the QueryCache.
+    """
+    def __init__(self):
+        """
+        Initializes the FileServiceAsync with the shared async connection manager.
+        """
+        self.conn_instance = AsyncConnection()
+
+    @cached("files", name="FileService.get_all_files")
+    async def get_all_files(self, user_id):
+        """
+        Retrieves all files associated with a user, including OWNER status, username, email, and user count.
+
+        Args:
+            user_id (int): The ID of the user.
+
+        Returns:
+            pd.DataFrame: A DataFrame containing file information.
+        """
+        return await self.conn_instance.read_df(GET_ALL_FILES_QUERY, params={"user_id": user_id})
+
+    @cached("file_user", "files", name="FileService.get_all_file_user")
+    async def get_all_file_user(self, user_id):
+        """
+        Retrieves FILE_USER records for files shared with other users (excluding current user_id).
+
+        Args:
+            user_id (int): The ID of the current user.
+
+        Returns:
+            pd.DataFrame: Shared FILE_USER records (excluding files belonging to user_id).
         """
-        return pd.read_sql(query, con=_self.conn, params={"user_id": user_id})
+        return await self.conn_instance.read_df(GET_ALL_FILE_USER_QUERY, params={"user_id": user_id})
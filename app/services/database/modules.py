@@ -1,6 +1,65 @@
-import streamlit as st
 import pandas as pd
 from services.database.connection import Connection
+from services.database.connection_async import AsyncConnection
+from services.database.cache import QueryCache, cached
+
+GET_ALL_MODULES_QUERY = """
+    SELECT 
+        M.MODULE_ID,
+        M.MODULE_NAME,
+        M.MODULE_FOLDER,
+        M.MODULE_SRC_TYPE,
+        M.MODULE_TRG_TYPE
+    FROM
+        MODULES M
+    WHERE
+        M.MODULE_STATE = 1
+    ORDER BY M.MODULE_ID ASC
+"""
+
+GET_MODULES_QUERY = """
+    SELECT 
+        M.MODULE_ID,
+        M.MODULE_NAME,
+        M.MODULE_FOLDER,
+        M.MODULE_SRC_TYPE,
+        M.MODULE_TRG_TYPE
+    FROM USER_MODULE UM
+    JOIN MODULES M
+    ON UM.MODULE_ID = M.MODULE_ID
+    WHERE UM.USER_ID = :user_id
+    AND M.MODULE_STATE = 1
+    AND M.MODULE_ID > 0
+    ORDER BY M.MODULE_ID
+"""
+
+GET_MODULES_FILES_QUERY = """
+    SELECT DISTINCT
+        M.MODULE_ID,
+        M.MODULE_NAME,
+        F.FILE_ID,
+        REPLACE(
+            REGEXP_SUBSTR(
+                REGEXP_SUBSTR(
+                    F.FILE_TRG_OBJ_NAME,
+                    '[^/]+$'
+                ),
+                '^[^\\.]+' 
+            ),
+        '_trg','') AS OBJECT_NAME
+    FROM
+        MODULES M
+    JOIN
+        FILES F
+        ON M.MODULE_ID = F.MODULE_ID
+    JOIN
+        FILE_USER FU
+        ON F.FILE_ID = FU.FILE_ID
+    WHERE
+        M.MODULE_VECTOR_STORE = 1
+        AND F.FILE_STATE = 1
+        AND FU.USER_ID = :user_id
+"""
 
 class ModuleService:
     """
@@ -9,12 +68,13 @@ class ModuleService:
 
     def __init__(self):
         """
-        Initializes the ModuleService with a shared database connection instance.
+        Initializes the ModuleService with the shared connection manager; each
+        operation takes its own session through acquire().
         """
         self.conn_instance = Connection()
-        self.conn = self.conn_instance.get_connection()
+        self.cache         = QueryCache()
 
-    @st.cache_data
+    @cached("modules", per_user=False)
     def get_all_modules(_self):
         """
         Retrieves all active modules from the database.
@@ -22,27 +82,14 @@ class ModuleService:
         Returns:
             pd.DataFrame: A DataFrame containing module information.
         """
-        query = """
-            SELECT 
-                M.MODULE_ID,
-                M.MODULE_NAME,
-                M.MODULE_FOLDER,
-                M.MODULE_SRC_TYPE,
-                M.MODULE_TRG_TYPE
-            FROM
-                MODULES M
-            WHERE
-                M.MODULE_STATE = 1
-            ORDER BY M.MODULE_ID ASC
-        """
-        return pd.read_sql(query, con=_self.conn)
+        return _self.conn_instance.read_df(GET_ALL_MODULES_QUERY)
 
     def get_modules_cache(self, user_id, force_update=False):
         if force_update:
-            self.get_modules.clear()
+            self.get_modules.clear(user_id)
         return self.get_modules(user_id)
 
-    @st.cache_data
+    @cached("modules", "users")
     def get_modules(_self, user_id):
         """
         Retrieves active modules assigned to the specific user.
@@ -53,38 +100,16 @@ class ModuleService:
         Returns:
             pd.DataFrame: A DataFrame containing MODULE_ID and MODULE_NAME.
         """
-        query = """
-            SELECT 
-                M.MODULE_ID,
-                M.MODULE_NAME,
-                M.MODULE_FOLDER,
-                M.MODULE_SRC_TYPE,
-                M.MODULE_TRG_TYPE
-            FROM USERS U
-            JOIN JSON_TABLE(
-                TO_CHAR(U.USER_MODULES),
-                '$[*]' COLUMNS (
-                    MODULE_ID NUMBER PATH '$'
-                )
-            ) JT
-            ON 1=1
-            JOIN MODULES M
-            ON JT.MODULE_ID = M.MODULE_ID
-            WHERE U.USER_ID = :user_id
-            AND M.MODULE_STATE = 1
-            AND M.MODULE_ID > 0
-            ORDER BY M.MODULE_ID
-        """
-        return pd.read_sql(query, con=_self.conn, params={"user_id": user_id})
+        return _self.conn_instance.read_df(GET_MODULES_QUERY, params={"user_id": user_id})
 
     
     def get_modules_files_cache(self, user_id, force_update=False):
         if force_update:
             # Borra la caché de la función
-            self.get_modules_files.clear()
+            self.get_modules_files.clear(user_id)
         return self.get_modules_files(user_id)
 
-    @st.cache_data
+    @cached("modules", "users", "files")
     def get_modules_files(_self, user_id):
         """
         Retrieves all active modules with files assigned to a specific user.
@@ -95,34 +120,7 @@ class ModuleService:
         Returns:
             pd.DataFrame: A DataFrame containing module information.
         """
-        query = """
-            SELECT DISTINCT
-                M.MODULE_ID,
-                M.MODULE_NAME,
-                F.FILE_ID,
-                REPLACE(
-                    REGEXP_SUBSTR(
-                        REGEXP_SUBSTR(
-                            F.FILE_TRG_OBJ_NAME,
-                            '[^/]+$'
-                        ),
-                        '^[^\\.]+' 
-                    ),
-                '_trg','') AS OBJECT_NAME
-            FROM
-                MODULES M
-            JOIN
-                FILES F
-                ON M.MODULE_ID = F.MODULE_ID
-            JOIN
-                FILE_USER FU
-                ON F.FILE_ID = FU.FILE_ID
-            WHERE
-                M.MODULE_VECTOR_STORE = 1
-                AND F.FILE_STATE = 1
-                AND FU.USER_ID = :user_id
-        """
-        return pd.read_sql(query, con=_self.conn, params={"user_id": user_id})
+        return _self.conn_instance.read_df(GET_MODULES_FILES_QUERY, params={"user_id": user_id})
 
     def update_agent(
             self,
@@ -159,37 +157,39 @@ class ModuleService:
         Returns:
             str: A message indicating success.
         """
-        query = """
-            UPDATE AGENTS SET 
-                MODEL_ID                = :model_id,
-                AGENT_MAX_OUT_TOKENS    = :agent_max_out_tokens,
-                AGENT_TEMPERATURE       = :agent_temperature,
-                AGENT_TOP_P             = :agent_top_p,
-                AGENT_TOP_K             = :agent_top_k,
-                AGENT_FREQUENCY_PENALTY = :agent_frequency_penalty,
-                AGENT_PRESENCE_PENALTY  = :agent_presence_penalty,
-                AGENT_PROMPT_SYSTEM     = :agent_prompt_system,
-                AGENT_PROMPT_MESSAGE    = :agent_prompt_message
-            WHERE
-                AGENT_ID         = :agent_id
-                AND USER_ID      = :user_id
-        """
-        with self.conn.cursor() as cur:
-            cur.execute(query, {
-                "model_id": model_id,
-                "agent_max_out_tokens": agent_max_out_tokens,
-                "agent_temperature": agent_temperature,
-                "agent_top_p": agent_top_p,
-                "agent_top_k": agent_top_k,
-                "agent_frequency_penalty": agent_frequency_penalty,
-                "agent_presence_penalty": agent_presence_penalty,
-                "agent_prompt_system": agent_prompt_system,
-                "agent_prompt_message": agent_prompt_message,
-                "agent_id": agent_id,
-                "user_id": user_id
-            })
-        self.conn.commit()
-        return f"Agent '{agent_name}' has been updated successfully."
+        with self.conn_instance.acquire() as conn:
+            query = """
+                UPDATE AGENTS SET 
+                    MODEL_ID                = :model_id,
+                    AGENT_MAX_OUT_TOKENS    = :agent_max_out_tokens,
+                    AGENT_TEMPERATURE       = :agent_temperature,
+                    AGENT_TOP_P             = :agent_top_p,
+                    AGENT_TOP_K             = :agent_top_k,
+                    AGENT_FREQUENCY_PENALTY = :agent_frequency_penalty,
+                    AGENT_PRESENCE_PENALTY  = :agent_presence_penalty,
+                    AGENT_PROMPT_SYSTEM     = :agent_prompt_system,
+                    AGENT_PROMPT_MESSAGE    = :agent_prompt_message
+                WHERE
+                    AGENT_ID         = :agent_id
+                    AND USER_ID      = :user_id
+            """
+            with conn.cursor() as cur:
+                cur.execute(query, {
+                    "model_id": model_id,
+                    "agent_max_out_tokens": agent_max_out_tokens,
+                    "agent_temperature": agent_temperature,
+                    "agent_top_p": agent_top_p,
+                    "agent_top_k": agent_top_k,
+                    "agent_frequency_penalty": agent_frequency_penalty,
+                    "agent_presence_penalty": agent_presence_penalty,
+                    "agent_prompt_system": agent_prompt_system,
+                    "agent_prompt_message": agent_prompt_message,
+                    "agent_id": agent_id,
+                    "user_id": user_id
+                })
+            conn.commit()
+            self.cache.invalidate("agents")
+            return f"Agent '{agent_name}' has been updated successfully."
     
 
     def delete_agent(self, user_id, module_id):
@@ -197,16 +197,67 @@ class ModuleService:
         Returns:
             str: A message indicating success.
         """
-        query = """
-            DELETE FROM AGENTS WHERE USER_ID = :user_id AND MODULE_ID = :module_id
-            RETURNING AGENT_NAME INTO :agent_name
-        """
-        with self.conn.cursor() as cur:
-            agent_name_var = cur.var(str)
-            cur.execute(query, {
-                "user_id": user_id,
-                "module_id": module_id,
-                "agent_name": agent_name_var
-            })
-        self.conn.commit()
-        return f"Agent: :red[{agent_name_var.getvalue()[0]}] has been deleted successfully."
+        with self.conn_instance.acquire() as conn:
+            query = """
+                DELETE FROM AGENTS WHERE USER_ID = :user_id AND MODULE_ID = :module_id
+                RETURNING AGENT_NAME INTO :agent_name
+            """
+            with conn.cursor() as cur:
+                agent_name_var = cur.var(str)
+                cur.execute(query, {
+                    "user_id": user_id,
+                    "module_id": module_id,
+                    "agent_name": agent_name_var
+                })
+            conn.commit()
+            self.cache.invalidate("agents")
+            return f"Agent: :red[{agent_name_var.getvalue()[0]}] has been deleted successfully."
+
+
+class ModuleServiceAsync:
+    """
+    Asyncio variant of ModuleService for the read queries a page loads at once.
+    Run them concurrently with services.database.gather(); results are
+    shared with the sync service through the QueryCache.
+    """
+    def __init__(self):
+        """
+        Initializes the ModuleServiceAsync with the shared async connection manager.
+        """
+        self.conn_instance = AsyncConnection()
+
+    @cached("modules", per_user=False, name="ModuleService.get_all_modules")
+    async def get_all_modules(self):
+        """
+        Retrieves all active modules from the database.
+
+        Returns:
+            pd.DataFrame: A DataFrame containing module information.
+        """
+        return await self.conn_instance.read_df(GET_ALL_MODULES_QUERY)
+
+    @cached("modules", "users", name="ModuleService.get_modules")
+    async def get_modules(self, user_id):
+        """
+        Retrieves active modules assigned to the specific user.
+
+        Args:
+            user_id (int): The user_id of the user.
+
+        Returns:
+            pd.DataFrame: A DataFrame containing MODULE_ID and MODULE_NAME.
+        """
+        return await self.conn_instance.read_df(GET_MODULES_QUERY, params={"user_id": user_id})
+
+    @cached("modules", "users", "files", name="ModuleService.get_modules_files")
+    async def get_modules_files(self, user_id):
+        """
+        Retrieves all active modules with files assigned to a specific user.
+
+        Args:
+            user_id (int): The ID of the user.
+        
+        Returns:
+            pd.DataFrame: A DataFrame containing module information.
+        """
+        return await self.conn_instance.read_df(GET_MODULES_FILES_QUERY, params={"user_id": user_id})
@@ -0,0 +1,266 @@
+import os
+import re
+import time
+import hashlib
+import threading
+import numpy as np
+from collections import OrderedDict
+from dotenv import load_dotenv
+
+from langchain_core.embeddings import Embeddings
+
+load_dotenv()
+
+# Level 1: query text -> embedding
+QUERY_EMB_CACHE_MAX_ENTRIES = int(os.getenv('CON_RAG_QUERY_CACHE_MAX_ENTRIES', 2000))
+QUERY_EMB_CACHE_TTL         = float(os.getenv('CON_RAG_QUERY_CACHE_TTL', 3600))
+
+# Level 2: (query vector bucket, files, DOCS versions) -> chunk ids
+RETRIEVAL_CACHE_MAX_ENTRIES = int(os.getenv('CON_RAG_RETRIEVAL_CACHE_MAX_ENTRIES', 2000))
+RETRIEVAL_CACHE_TTL         = float(os.getenv('CON_RAG_RETRIEVAL_CACHE_TTL', 3600))
+RETRIEVAL_CACHE_LSH_BITS    = int(os.getenv('CON_RAG_RETRIEVAL_CACHE_LSH_BITS', 16))
+RETRIEVAL_CACHE_SIMILARITY  = float(os.getenv('CON_RAG_RETRIEVAL_CACHE_SIMILARITY', 0.97))
+
+# History-aware rewrites: (model, history digest, question) -> standalone question
+REWRITE_CACHE_MAX_ENTRIES   = int(os.getenv('CON_RAG_REWRITE_CACHE_MAX_ENTRIES', 2000))
+REWRITE_CACHE_TTL           = float(os.getenv('CON_RAG_REWRITE_CACHE_TTL', 3600))
+
+def normalize_query(text):
+    """
+    Normalizes a question for the cache key: lower case, single spaces,
+    no trailing punctuation.
+    """
+    return re.sub(r"\s+", " ", (text or "").lower()).strip().rstrip("?!. ")
+
+class TTLCache:
+    """
+    Thread-safe LRU dict whose entries expire after ttl seconds (0 = never),
+    with hit/miss counters.
+    """
+    def __init__(self, max_entries, ttl):
+        self._entries     = OrderedDict()
+        self._lock        = threading.Lock()
+        self._max_entries = max_entries
+        self._ttl         = ttl
+        self._stats       = {"hits": 0, "misses": 0}
+
+    def get(self, key, count=True):
+        """
+        Returns the value of a fresh entry, or None. With count=False the
+        caller decides whether it was a hit (see count()).
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                created, value = entry
+                if self._ttl <= 0 or time.monotonic() - created <= self._ttl:
+                    self._entries.move_to_end(key)
+                    if count:
+                        self._stats["hits"] += 1
+                    return value
+                del self._entries[key]
+            if count:
+                self._stats["misses"] += 1
+            return None
+
+    def count(self, hit):
+        """Records one hit or miss."""
+        with self._lock:
+            self._stats["hits" if hit else "misses"] += 1
+
+    def peek(self, key):
+        """Returns the value of an entry without counting a hit or miss."""
+        with self._lock:
+            entry = self._entries.get(key)
+            return None if entry is None else entry[1]
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries[key] = (time.monotonic(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+
+    def discard(self, match):
+        """Removes the entries whose key satisfies match(key)."""
+        with self._lock:
+            for key in [k for k in self._entries if match(k)]:
+                del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def get_stats(self):
+        """
+        Returns:
+            dict: hits, misses, hit_rate and entries.
+        """
+        with self._lock:
+            stats = dict(self._stats)
+            stats["entries"] = len(self._entries)
+        total = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = stats["hits"] / total if total else 0.0
+        return stats
+
+class CachedEmbeddings(Embeddings):
+    """
+    Embeddings client that keeps the vectors of the questions (embed_query)
+    in an LRU with TTL keyed by the normalized text; a repeated question
+    skips the remote embedding call. Documents go straight to the client.
+    """
+    def __init__(self, embeddings, max_entries=None, ttl=None):
+        self.embeddings = embeddings
+        self.cache      = TTLCache(
+            max_entries or QUERY_EMB_CACHE_MAX_ENTRIES,
+            QUERY_EMB_CACHE_TTL if ttl is None else ttl
+        )
+
+    def embed_documents(self, texts):
+        return self.embeddings.embed_documents(texts)
+
+    def embed_query(self, text):
+        key    = normalize_query(text)
+        vector = self.cache.get(key)
+        if vector is None:
+            vector = self.embeddings.embed_query(text)
+            self.cache.set(key, vector)
+        return list(vector)
+
+class RetrievalCache:
+    """
+    Singleton cache of retrieval results: the DOCS ids a search returned.
+
+    Keyed by a random-hyperplane (LSH) bucket of the query vector, the
+    sorted file ids, the DOCS version of those files and the search
+    parameters. Inside a bucket an entry is only served if its query
+    vector is close enough (RETRIEVAL_CACHE_SIMILARITY), so rephrasings
+    of a question reuse the result and different questions do not.
+    Re-vectorizing a file bumps its FILE_DOCS_VERSION, which changes the
+    key; invalidate_file() also drops its entries right away.
+    """
+    _instance = None
+    _lock = threading.Lock()
+
+    def __new__(cls):
+        if cls._instance is None:
+            with cls._lock:
+                if cls._instance is None:
+                    instance = super(RetrievalCache, cls).__new__(cls)
+                    instance._cache = TTLCache(RETRIEVAL_CACHE_MAX_ENTRIES, RETRIEVAL_CACHE_TTL)
+                    instance._planes = {}
+                    cls._instance = instance
+        return cls._instance
+
+    def get_bucket(self, vector):
+        """
+        Returns the LSH bucket of a vector: one bit per hyperplane side.
+        """
+        vector = np.asarray(vector, dtype=np.float32)
+        planes = self._planes.get(vector.shape[0])
+        if planes is None:
+            # Misma semilla: los buckets no cambian entre reinicios ni procesos
+            planes = np.random.default_rng(0).standard_normal((RETRIEVAL_CACHE_LSH_BITS, vector.shape[0])).astype(np.float32)
+            planes = self._planes.setdefault(vector.shape[0], planes)
+        return np.packbits(planes @ vector > 0).tobytes()
+
+    @staticmethod
+    def get_key(bucket, file_ids, versions, search):
+        return (bucket, tuple(sorted(int(file_id) for file_id in file_ids)), tuple(versions), tuple(search))
+
+    def get(self, vector, file_ids, versions, search):
+        """
+        Returns the DOCS ids cached for a similar query, or None.
+
+        Args:
+            vector (list): Query embedding.
+            file_ids (list): Files the search is limited to.
+            versions (list): FILE_DOCS_VERSION of those files, sorted by file id.
+            search (tuple): Search parameters (type, k, fetch_k, ...).
+        """
+        key     = self.get_key(self.get_bucket(vector), file_ids, versions, search)
+        entries = self._cache.get(key, count=False) or []
+        query   = np.asarray(vector, dtype=np.float32)
+        query   = query / (np.linalg.norm(query) or 1.0)
+        for cached_vector, ids in entries:
+            if float(query @ cached_vector) >= RETRIEVAL_CACHE_SIMILARITY:
+                self._cache.count(True)
+                return list(ids)
+        self._cache.count(False)
+        return None
+
+    def set(self, vector, file_ids, versions, search, ids):
+        """
+        Stores the DOCS ids a search returned for a query vector.
+        """
+        key    = self.get_key(self.get_bucket(vector), file_ids, versions, search)
+        query  = np.asarray(vector, dtype=np.float32)
+        query  = query / (np.linalg.norm(query) or 1.0)
+        # Pocas consultas por bucket; las más recientes primero
+        entries = [(query, tuple(ids))] + list(self._cache.peek(key) or [])[:7]
+        self._cache.set(key, entries)
+
+    def invalidate_file(self, file_id):
+        """
+        Drops the cached results of every search that included a file.
+        """
+        file_id = int(file_id)
+        self._cache.discard(lambda key: file_id in key[1])
+
+    def clear(self):
+        self._cache.clear()
+
+    def get_stats(self):
+        """
+        Returns:
+            dict: hits, misses, hit_rate and entries.
+        """
+        return self._cache.get_stats()
+
+def history_digest(history):
+    """
+    SHA-256 of a chat history (list of messages): type and content of each.
+    """
+    digest = hashlib.sha256()
+    for message in history or []:
+        digest.update(f"{getattr(message, 'type', '')}\x1f{getattr(message, 'content', message)}\x1e".encode("utf-8"))
+    return digest.hexdigest()
+
+class RewriteCache:
+    """
+    Singleton cache of the history-aware question rewrites, keyed by the
+    model, a digest of the history and the normalized question: the same
+    question re-asked on the same conversation skips the LLM round trip.
+    """
+    _instance = None
+    _lock = threading.Lock()
+
+    def __new__(cls):
+        if cls._instance is None:
+            with cls._lock:
+                if cls._instance is None:
+                    instance = super(RewriteCache, cls).__new__(cls)
+                    instance._cache = TTLCache(REWRITE_CACHE_MAX_ENTRIES, REWRITE_CACHE_TTL)
+                    cls._instance = instance
+        return cls._instance
+
+    @staticmethod
+    def get_key(model_id, history, question):
+        return (str(model_id), history_digest(history), normalize_query(question))
+
+    def get(self, model_id, history, question):
+        """Returns the cached rewrite of a question, or None."""
+        return self._cache.get(self.get_key(model_id, history, question))
+
+    def set(self, model_id, history, question, rewrite):
+        self._cache.set(self.get_key(model_id, history, question), rewrite)
+
+    def clear(self):
+        self._cache.clear()
+
+    def get_stats(self):
+        """
+        Returns:
+            dict: hits, misses, hit_rate and entries.
+        """
+        return self._cache.get_stats()
@@ -1,6 +1,6 @@
-import streamlit as st
 import pandas as pd
-from services.database.connection import Connection
+from services.database.cache import QueryCache, cached
+from services.database.connection import Connection, FETCH_ARRAYSIZE_LARGE, fetch_df
 
 class SelectAIService:
     """
@@ -9,10 +9,10 @@ class SelectAIService:
 
     def __init__(self):
         """
-        Initializes the SelectAIService with a shared database connection.
+        Initializes the SelectAIService with the shared connection manager.
         """
         self.conn_instance = Connection()
-        self.conn = self.conn_instance.get_connection()
+        self.cache         = QueryCache()
 
     def create_user(self, user_id, password):
         """
@@ -25,29 +25,30 @@ class SelectAIService:
         Returns:
             str: A message indicating success.
         """
-        # CREATE USER statements cannot be parameterized with bind variables for identifiers
-        # We must carefully validate/sanitize input or accept that DDL requires string concatenation.
-        # Here user_id is an integer so it is safe. Password should be handled carefully.
-        # Assuming user_id is safe (int).
+        with self.conn_instance.acquire() as conn:
+            # CREATE USER statements cannot be parameterized with bind variables for identifiers
+            # We must carefully validate/sanitize input or accept that DDL requires string concatenation.
+            # Here user_id is an integer so it is safe. Password should be handled carefully.
+            # Assuming user_id is safe (int).
 
-        # NOTE: Parameterized queries (binding) are generally not supported for DDL statements (like CREATE USER).
-        # We continue to use f-strings here but ensure inputs are safe.
-        query = f"""
-                CREATE USER SEL_AI_USER_ID_{str(user_id)}
-                IDENTIFIED BY "{password}"
-                DEFAULT TABLESPACE tablespace
-                QUOTA UNLIMITED ON tablespace
-            """
-        with self.conn.cursor() as cur:
-            cur.execute(query)
-        self.conn.commit()
+            # NOTE: Parameterized queries (binding) are generally not supported for DDL statements (like CREATE USER).
+            # We continue to use f-strings here but ensure inputs are safe.
+            query = f"""
+                    CREATE USER SEL_AI_USER_ID_{str(user_id)}
+                    IDENTIFIED BY "{password}"
+                    DEFAULT TABLESPACE tablespace
+                    QUOTA UNLIMITED ON tablespace
+                """
+            with conn.cursor() as cur:
+                cur.execute(query)
+            conn.commit()
 
-        with self.conn.cursor() as cur:
-            cur.execute(f"""
-                GRANT DWROLE TO SEL_AI_USER_ID_{str(user_id)}
-            """)
-        self.conn.commit()
-        return f"[Select AI]: New User :red[SEL_AI_USER_ID_{str(user_id)}] created successfully for the database."
+            with conn.cursor() as cur:
+                cur.execute(f"""
+                    GRANT DWROLE TO SEL_AI_USER_ID_{str(user_id)}
+                """)
+            conn.commit()
+            return f"[Select AI]: New User :red[SEL_AI_USER_ID_{str(user_id)}] created successfully for the database."
     
     def drop_user(self, user_id):
         """
@@ -59,19 +60,20 @@ class SelectAIService:
         Returns:
             str: A message indicating success.
         """
-        # DDL cannot be parameterized for identifiers.
-        try:
-            query = f"""
-                DROP USER SEL_AI_USER_ID_{str(user_id)} CASCADE
-            """
-            with self.conn.cursor() as cur:
-                cur.execute(query)
-            self.conn.commit()
-            return f"[Select AI]: The username :red[SEL_AI_USER_ID_{str(user_id)}] of the database user to delete successfully."
-        except Exception as e:
-            # The username does not exist.
-            if 'ORA-01918' in str(e):
-                return f"[Select AI]: The username :red[SEL_AI_USER_ID_{str(user_id)}] of the database does not exist."""
+        with self.conn_instance.acquire() as conn:
+            # DDL cannot be parameterized for identifiers.
+            try:
+                query = f"""
+                    DROP USER SEL_AI_USER_ID_{str(user_id)} CASCADE
+                """
+                with conn.cursor() as cur:
+                    cur.execute(query)
+                conn.commit()
+                return f"[Select AI]: The username :red[SEL_AI_USER_ID_{str(user_id)}] of the database user to delete successfully."
+            except Exception as e:
+                # The username does not exist.
+                if 'ORA-01918' in str(e):
+                    return f"[Select AI]: The username :red[SEL_AI_USER_ID_{str(user_id)}] of the database does not exist."""
 
     def update_user_password(self, user_id, new_password):
         """
@@ -84,13 +86,14 @@ class SelectAIService:
         Returns:
             str: A message indicating the success of the operation.
         """
-        # ALTER USER cannot be parameterized for identifiers/passwords in standard way.
-        with self.conn.cursor() as cur:
-            cur.execute(f"""
-                ALTER USER SEL_AI_USER_ID_{str(user_id)} IDENTIFIED BY "{new_password}"
-            """)
-        self.conn.commit()
-        return f"[Select AI] The password for user was updated successfully."
+        with self.conn_instance.acquire() as conn:
+            # ALTER USER cannot be parameterized for identifiers/passwords in standard way.
+            with conn.cursor() as cur:
+                cur.execute(f"""
+                    ALTER USER SEL_AI_USER_ID_{str(user_id)} IDENTIFIED BY "{new_password}"
+                """)
+            conn.commit()
+            return f"[Select AI] The password for user was updated successfully."
     
 
     def update_comment(
@@ -107,15 +110,17 @@ class SelectAIService:
             column_name (str): The name of the column.
             comment (str): The comment to set for the column.
         """
-        # COMMENT ON is DDL, table/column names cannot be bound. Comment text IS a string literal,
-        # but in 'COMMENT ON ... IS ''literal''' syntax, it's also part of DDL.
-        # It's better to escape single quotes manually if binding isn't supported for DDL.
-        safe_comment = comment.replace("'", "''")
-        with self.conn.cursor() as cur:
-            cur.execute(f"""
-                COMMENT ON COLUMN {table_name}.{column_name} IS '{safe_comment}'
-            """)
-        self.conn.commit()
+        with self.conn_instance.acquire() as conn:
+            # COMMENT ON is DDL, table/column names cannot be bound. Comment text IS a string literal,
+            # but in 'COMMENT ON ... IS ''literal''' syntax, it's also part of DDL.
+            # It's better to escape single quotes manually if binding isn't supported for DDL.
+            safe_comment = comment.replace("'", "''")
+            with conn.cursor() as cur:
+                cur.execute(f"""
+                    COMMENT ON COLUMN {table_name}.{column_name} IS '{safe_comment}'
+                """)
+            conn.commit()
+            self.cache.invalidate("tables")
     
     def create_table_from_csv(
             self,
@@ -129,20 +134,22 @@ class SelectAIService:
             object_uri (str): The URI of the CSV file.
             table_name (str): The name of the table to create.
         """
-        # Uses a stored procedure, so we can use binding or just formatting.
-        # Since it is a PL/SQL block calling a stored proc, we can use bind variables?
-        # The procedure SP_SEL_AI_TBL_CSV probably takes varchar2 arguments.
-        with self.conn.cursor() as cur:
-            query = """
-                BEGIN
-                    SP_SEL_AI_TBL_CSV(:object_uri, :table_name);
-                END;
-            """
-            cur.execute(query, {
-                "object_uri": object_uri,
-                "table_name": table_name
-            })
-        self.conn.commit()
+        with self.conn_instance.acquire() as conn:
+            # Uses a stored procedure, so we can use binding or just formatting.
+            # Since it is a PL/SQL block calling a stored proc, we can use bind variables?
+            # The procedure SP_SEL_AI_TBL_CSV probably takes varchar2 arguments.
+            with conn.cursor() as cur:
+                query = """
+                    BEGIN
+                        SP_SEL_AI_TBL_CSV(:object_uri, :table_name);
+                    END;
+                """
+                cur.execute(query, {
+                    "object_uri": object_uri,
+                    "table_name": table_name
+                })
+            conn.commit()
+            self.cache.invalidate("tables")
 
     def create_profile(
             self,
@@ -156,18 +163,19 @@ class SelectAIService:
             profile_name (str): The name of the profile to create.
             user_id (str): The ID of the user creating the profile.
         """
-        # Stored procedure call.
-        with self.conn.cursor() as cur:
-            query = """
-                BEGIN
-                    SP_SEL_AI_PROFILE(:profile_name, :user_id);
-                END;
-            """
-            cur.execute(query, {
-                "profile_name": profile_name,
-                "user_id": int(user_id)
-            })
-        self.conn.commit()
+        with self.conn_instance.acquire() as conn:
+            # Stored procedure call.
+            with conn.cursor() as cur:
+                query = """
+                    BEGIN
+                        SP_SEL_AI_PROFILE(:profile_name, :user_id);
+                    END;
+                """
+                cur.execute(query, {
+                    "profile_name": profile_name,
+                    "user_id": int(user_id)
+                })
+            conn.commit()
     
     def get_chat(
             self,
@@ -209,20 +217,25 @@ class SelectAIService:
             FROM DUAL
         """
 
-        # Execute the query and return the chat response
-        return pd.read_sql(query, con=self.conn, params={
+        params = {
             "full_prompt": full_prompt,
             "profile_name": profile_name,
             "action": action
-        })["CHAT"].iloc[0].read()
+        }
+
+        # GENERATE llama al LLM (y puede ejecutar la consulta generada): no se reintenta
+        return self.conn_instance.run(
+            lambda conn: fetch_df(conn, query, params),
+            idempotent=False
+        )["CHAT"].iloc[0]
     
     def get_tables_cache(self, user_id, force_update=False):
         if force_update:
             # Borra la caché de la función
-            self.get_tables.clear()
+            self.get_tables.clear(user_id)
         return self.get_tables(user_id)
     
-    @st.cache_data
+    @cached("files", "tables")
     def get_tables(_self, user_id):        
         """
         Retrieves metadata for tables associated with the Select AI module.
@@ -262,7 +275,7 @@ class SelectAIService:
             ORDER BY 
                 t.owner, t.table_name, c.column_id
         """
-        return pd.read_sql(query, con=_self.conn, params={"user_id": user_id})
+        return _self.conn_instance.read_df(query, params={"user_id": user_id})
 
     def get_data(self, sql):
         """
@@ -271,7 +284,8 @@ class SelectAIService:
         # This executes arbitrary SQL returned by the LLM.
         # It is inherently risky but it is the purpose of the tool (Select AI).
         # We cannot parameterize this as it's a full SQL string.
+        # Result sets can be large: bigger arraysize for fewer round trips.
         try:
-            return pd.read_sql(sql, con=self.conn)
+            return self.conn_instance.read_df(sql, arraysize=FETCH_ARRAYSIZE_LARGE)
         except Exception:
             return pd.DataFrame()
@@ -9,10 +9,9 @@ class SelectAIRAGService:
 
     def __init__(self):
         """
-        Initializes the SelectAIRAGService with a shared database connection.
+        Initializes the SelectAIRAGService with the shared connection manager.
         """
         self.conn_instance = Connection()
-        self.conn = self.conn_instance.get_connection()
 
     def create_profile(
             self,
@@ -28,17 +27,18 @@ class SelectAIRAGService:
             index_name (str)   : The name of the index associated with the profile.
             location (str)     : The location for the profile.
         """
-        with self.conn.cursor() as cur:
-            cur.execute("""
-                BEGIN
-                    SP_SEL_AI_RAG_PROFILE(:profile_name, :index_name, :location);
-                END;
-            """, {
-                "profile_name": profile_name,
-                "index_name": index_name,
-                "location": location
-            })
-        self.conn.commit()
+        with self.conn_instance.acquire() as conn:
+            with conn.cursor() as cur:
+                cur.execute("""
+                    BEGIN
+                        SP_SEL_AI_RAG_PROFILE(:profile_name, :index_name, :location);
+                    END;
+                """, {
+                    "profile_name": profile_name,
+                    "index_name": index_name,
+                    "location": location
+                })
+            conn.commit()
     
     def get_chat(
             self,
@@ -69,11 +69,11 @@ class SelectAIRAGService:
                 action       => :action) AS CHAT
             FROM DUAL
         """
-        return pd.read_sql(query, con=self.conn, params={
+        return self.conn_instance.read_df(query, params={
             "full_prompt": full_prompt,
             "profile_name": profile_name,
             "action": action
-        })["CHAT"].iloc[0].read()
+        })["CHAT"].iloc[0]
     
     def get_files( self, index_name):
         """
@@ -103,7 +103,7 @@ class SelectAIRAGService:
                 FROM 
                     {index_name}$VECTAB
             """
-            return pd.read_sql(query, con=self.conn)
+            return self.conn_instance.read_df(query)
         except Exception as e:
             # Table or view '{index_name}$VECTAB' does not exist.
             if 'ORA-00942' in str(e):
@@ -1,6 +1,103 @@
-import streamlit as st
+import json
 import pandas as pd
-from services.database.connection import Connection
+from services.database.connection import Connection, fetch_df
+from services.database.connection_async import AsyncConnection
+from services.database.cache import QueryCache, cached
+
+# DOCS rows deleted (and committed) per batch when purging a user
+PURGE_BATCH_SIZE = 10000
+
+# USER_MODULE mirrors the USERS.USER_MODULES JSON array; the JSON is only
+# parsed here, on write, so the read queries are plain indexed joins
+SET_USER_MODULES_QUERY = """
+            DELETE FROM USER_MODULE WHERE USER_ID = v_user_id;
+
+            INSERT INTO USER_MODULE (USER_ID, MODULE_ID)
+            SELECT DISTINCT v_user_id, M.MODULE_ID
+            FROM JSON_TABLE(
+                NVL(:modules, '[]'),
+                '$[*]' COLUMNS (
+                    MODULE_ID NUMBER PATH '$'
+                )
+            ) JT
+            JOIN MODULES M
+            ON JT.MODULE_ID = M.MODULE_ID;
+"""
+
+def user_modules_block(users_query):
+    """
+    Wraps a USERS write and the rewrite of the user's USER_MODULE rows in one
+    anonymous PL/SQL block. It is a single call, so with autocommit both are
+    committed together or not at all, and no session sees the user without
+    modules in between.
+
+    Args:
+        users_query (str): PL/SQL statements on USERS; v_user_id starts as
+                           :user_id and is the user the modules are written for.
+    """
+    return f"""
+        DECLARE
+            v_user_id USERS.USER_ID%TYPE := :user_id;
+        BEGIN
+{users_query}
+{SET_USER_MODULES_QUERY}
+        END;
+    """
+
+GET_ALL_USERS_QUERY = """
+    SELECT
+        A.USER_ID,
+        A.USER_GROUP_ID,
+        B.USER_GROUP_NAME,
+        A.USER_USERNAME,
+        A.USER_PASSWORD,
+        A.USER_SEL_AI_PASSWORD,
+        A.USER_NAME,
+        A.USER_LAST_NAME,
+        A.USER_EMAIL,
+        A.USER_MODULES,
+        (
+            SELECT JSON_ARRAYAGG(M.MODULE_NAME ORDER BY M.MODULE_ID)
+            FROM USER_MODULE UM
+            JOIN MODULES M
+            ON UM.MODULE_ID = M.MODULE_ID
+            WHERE UM.USER_ID = A.USER_ID
+        ) AS MODULE_NAMES,
+        A.USER_STATE,
+        A.USER_DATE
+    FROM
+        USERS A
+    JOIN USER_GROUP B
+        ON A.USER_GROUP_ID = B.USER_GROUP_ID
+    WHERE
+        A.USER_STATE <> 0
+        AND A.USER_ID > 0
+    ORDER BY
+        A.USER_ID DESC
+"""
+
+GET_ALL_USER_GROUP_SHARED_QUERY = """
+    SELECT
+        A.USER_ID,
+        A.USER_GROUP_ID,
+        B.USER_GROUP_NAME,
+        A.USER_USERNAME,
+        A.USER_NAME || ' ' || A.USER_LAST_NAME AS USER_FULL_NAME,
+        A.USER_EMAIL,
+        A.USER_STATE,
+        A.USER_DATE
+    FROM
+        USERS A
+    JOIN USER_GROUP B
+        ON A.USER_GROUP_ID = B.USER_GROUP_ID
+    WHERE
+        A.USER_STATE <> 0
+        AND A.USER_ID <> :user_id
+        AND A.USER_GROUP_ID = (
+            SELECT USER_GROUP_ID FROM USERS WHERE USER_ID = :user_id_sub
+        )
+    ORDER BY A.USER_ID DESC
+"""
 
 class UserService:
     """
@@ -9,15 +106,12 @@ class UserService:
 
     def __init__(self):
         """
-        Initializes the UserService with a shared database connection.
+        Initializes the UserService with the shared connection manager; each
+        operation takes its own session through acquire().
         """
         self.conn_instance = Connection()
+        self.cache         = QueryCache()
 
-    @property
-    def conn(self):
-        """Always returns a live connection (auto-reconnect if needed)."""
-        return self.conn_instance.get_connection()
-    
     def get_access(
             _self,
             username,
@@ -48,26 +142,18 @@ class UserService:
                     FROM (
                         SELECT M.MODULE_NAME,
                                M.MODULE_ID AS SORT_COL
-                        FROM JSON_TABLE(
-                               TO_CHAR(A.USER_MODULES),
-                               '$[*]' COLUMNS (
-                                   MODULE_ID NUMBER PATH '$'
-                               )
-                        ) JT
-                        JOIN MODULES M ON JT.MODULE_ID = M.MODULE_ID
+                        FROM USER_MODULE UM
+                        JOIN MODULES M ON UM.MODULE_ID = M.MODULE_ID
+                        WHERE UM.USER_ID = A.USER_ID
                         UNION
                         SELECT 'Vector Database' AS MODULE_NAME, 999999 AS SORT_COL
                         FROM DUAL
                         WHERE EXISTS (
                             SELECT 1
-                            FROM JSON_TABLE(
-                                   TO_CHAR(A.USER_MODULES),
-                                   '$[*]' COLUMNS (
-                                       MODULE_ID NUMBER PATH '$'
-                                   )
-                            ) JT2
-                            JOIN MODULES M2 ON JT2.MODULE_ID = M2.MODULE_ID
-                            WHERE M2.MODULE_VECTOR_STORE = 1
+                            FROM USER_MODULE UM2
+                            JOIN MODULES M2 ON UM2.MODULE_ID = M2.MODULE_ID
+                            WHERE UM2.USER_ID = A.USER_ID
+                            AND M2.MODULE_VECTOR_STORE = 1
                         )
                     ) T
                 ) AS MODULE_NAMES,
@@ -77,14 +163,14 @@ class UserService:
             WHERE A.USER_USERNAME = :username
               AND A.USER_PASSWORD = :password
         """
-        return pd.read_sql(query, con=_self.conn, params={"username": username, "password": password})
+        return _self.conn_instance.read_df(query, params={"username": username, "password": password})
     
     def get_all_users_cache(self, force_update=False):
         if force_update:
             self.get_all_users.clear()
         return self.get_all_users()
 
-    @st.cache_data
+    @cached("users", "user_group", per_user=False)
     def get_all_users(_self):
         """
         Retrieves all active users from the database.
@@ -92,44 +178,9 @@ class UserService:
         Returns:
             pd.DataFrame: A DataFrame containing user information.
         """
-        query = """
-            SELECT
-                A.USER_ID,
-                A.USER_GROUP_ID,
-                B.USER_GROUP_NAME,
-                A.USER_USERNAME,
-                A.USER_PASSWORD,
-                A.USER_SEL_AI_PASSWORD,
-                A.USER_NAME,
-                A.USER_LAST_NAME,
-                A.USER_EMAIL,
-                A.USER_MODULES,
-                (
-                    SELECT JSON_ARRAYAGG(M.MODULE_NAME ORDER BY M.MODULE_ID)
-                    FROM JSON_TABLE(
-                        TO_CHAR(A.USER_MODULES),
-                        '$[*]' COLUMNS (
-                            MODULE_ID NUMBER PATH '$'
-                        )
-                    ) JT
-                    JOIN MODULES M
-                    ON JT.MODULE_ID = M.MODULE_ID
-                ) AS MODULE_NAMES,
-                A.USER_STATE,
-                A.USER_DATE
-            FROM
-                USERS A
-            JOIN USER_GROUP B
-                ON A.USER_GROUP_ID = B.USER_GROUP_ID
-            WHERE
-                A.USER_STATE <> 0
-                AND A.USER_ID > 0
-            ORDER BY
-                A.USER_ID DESC
-        """
-        return pd.read_sql(query, con=_self.conn)
+        return _self.conn_instance.read_df(GET_ALL_USERS_QUERY)
     
-    @st.cache_data
+    @cached("users")
     def get_user(_self, user_id):
         """
         Retrieves a specific user's information by user ID.
@@ -154,7 +205,7 @@ class UserService:
             FROM USERS A
             WHERE A.USER_ID = :user_id
         """
-        return pd.read_sql(query, con=_self.conn, params={"user_id": user_id})
+        return _self.conn_instance.read_df(query, params={"user_id": user_id})
 
     def insert_user(
             self,
@@ -182,66 +233,71 @@ class UserService:
         Returns:
             str: A message indicating the result of the operation.
         """
-        query = """
-            SELECT USER_ID, USER_STATE
-            FROM USERS
-            WHERE USER_USERNAME = :username
-        """
-        df = pd.read_sql(query, con=self.conn, params={"username": username})
-
-        if not df.empty:
-            user_id       = df['USER_ID'].iloc[0]
-            current_state = df['USER_STATE'].iloc[0]
-
-            if current_state != 1:
-                with self.conn.cursor() as cur:
-                    cur.execute("""
-                        UPDATE USERS 
-                        SET USER_MODULES = :modules,
-                            USER_STATE   = 1,                            
-                            USER_DATE    = SYSDATE
-                        WHERE USER_ID    = :user_id
-                    """, {"modules": modules, "user_id": int(user_id)})
-                self.conn.commit()
-                return f"User '{username}' already existed and has been reactivated.", user_id
+        with self.conn_instance.acquire() as conn:
+            query = """
+                SELECT USER_ID, USER_STATE
+                FROM USERS
+                WHERE USER_USERNAME = :username
+            """
+            df = fetch_df(conn, query, params={"username": username})
+
+            if not df.empty:
+                user_id       = df['USER_ID'].iloc[0]
+                current_state = df['USER_STATE'].iloc[0]
+
+                if current_state != 1:
+                    with conn.cursor() as cur:
+                        cur.execute(user_modules_block("""
+                            UPDATE USERS 
+                            SET USER_MODULES = :modules,
+                                USER_STATE   = 1,                            
+                                USER_DATE    = SYSDATE
+                            WHERE USER_ID    = v_user_id;
+                        """), {"modules": modules, "user_id": int(user_id)})
+                    conn.commit()
+                    self.cache.invalidate("users")
+                    return f"User '{username}' already existed and has been reactivated.", user_id
+                else:
+                    return f"User '{username}' already exists and is active.", int(user_id)
             else:
-                return f"User '{username}' already exists and is active.", int(user_id)
-        else:
-            with self.conn.cursor() as cur:
-                user_id_var = cur.var(int)  # Define the output variable
-                cur.execute("""
-                    INSERT INTO USERS (                        
-                        USER_GROUP_ID,
-                        USER_USERNAME,
-                        USER_PASSWORD,
-                        USER_SEL_AI_PASSWORD,
-                        USER_NAME,
-                        USER_LAST_NAME,
-                        USER_EMAIL,
-                        USER_MODULES
-                    ) VALUES (
-                        :user_group_id,
-                        :username,
-                        :password,
-                        :sel_ai_password,
-                        :name,
-                        :last_name,
-                        :email,
-                        :modules
-                    ) RETURNING USER_ID INTO :user_id
-                """, {
-                    "user_group_id": user_group_id,
-                    "username": username,
-                    "password": password,
-                    "sel_ai_password": sel_ai_password,
-                    "name": name,
-                    "last_name": last_name,
-                    "email": email,
-                    "modules": modules,
-                    "user_id": user_id_var
-                })
-            self.conn.commit()
-            return f"User '{username}' has been created successfully.", user_id_var.getvalue()[0]
+                with conn.cursor() as cur:
+                    user_id_var = cur.var(int)  # Define the output variable
+                    cur.execute(user_modules_block("""
+                        INSERT INTO USERS (                        
+                            USER_GROUP_ID,
+                            USER_USERNAME,
+                            USER_PASSWORD,
+                            USER_SEL_AI_PASSWORD,
+                            USER_NAME,
+                            USER_LAST_NAME,
+                            USER_EMAIL,
+                            USER_MODULES
+                        ) VALUES (
+                            :user_group_id,
+                            :username,
+                            :password,
+                            :sel_ai_password,
+                            :name,
+                            :last_name,
+                            :email,
+                            :modules
+                        ) RETURNING USER_ID INTO v_user_id;
+                        :new_user_id := v_user_id;
+                    """), {
+                        "user_group_id": user_group_id,
+                        "username": username,
+                        "password": password,
+                        "sel_ai_password": sel_ai_password,
+                        "name": name,
+                        "last_name": last_name,
+                        "email": email,
+                        "modules": modules,
+                        "user_id": None,
+                        "new_user_id": user_id_var
+                    })
+                conn.commit()
+                self.cache.invalidate("users")
+                return f"User '{username}' has been created successfully.", user_id_var.getvalue()
         
     def update_user(
             self,
@@ -269,29 +325,31 @@ class UserService:
         Returns:
             str: A message indicating success.
         """
-        with self.conn.cursor() as cur:
-            cur.execute("""
-                UPDATE USERS SET 
-                    USER_GROUP_ID  = :user_group_id,
-                    USER_USERNAME  = :username,
-                    USER_NAME      = :name,
-                    USER_LAST_NAME = :last_name,
-                    USER_EMAIL     = :email,
-                    USER_STATE     = :state,
-                    USER_MODULES   = :modules
-                WHERE USER_ID      = :user_id
-            """, {
-                "user_group_id": user_group_id,
-                "username": username,
-                "name": name,
-                "last_name": last_name,
-                "email": email,
-                "state": state,
-                "modules": modules,
-                "user_id": user_id
-            })
-        self.conn.commit()
-        return f"User '{username}' has been updated successfully."
+        with self.conn_instance.acquire() as conn:
+            with conn.cursor() as cur:
+                cur.execute(user_modules_block("""
+                    UPDATE USERS SET 
+                        USER_GROUP_ID  = :user_group_id,
+                        USER_USERNAME  = :username,
+                        USER_NAME      = :name,
+                        USER_LAST_NAME = :last_name,
+                        USER_EMAIL     = :email,
+                        USER_STATE     = :state,
+                        USER_MODULES   = :modules
+                    WHERE USER_ID      = v_user_id;
+                """), {
+                    "user_group_id": user_group_id,
+                    "username": username,
+                    "name": name,
+                    "last_name": last_name,
+                    "email": email,
+                    "state": state,
+                    "modules": modules,
+                    "user_id": int(user_id)
+                })
+            conn.commit()
+            self.cache.invalidate("users")
+            return f"User '{username}' has been updated successfully."
         
     def update_profile(self, user_id, username, password, name, last_name, email, state):
         """
@@ -309,25 +367,27 @@ class UserService:
         Returns:
             str: A message indicating success.
         """
-        with self.conn.cursor() as cur:
-            cur.execute("""
-                UPDATE USERS SET 
-                    USER_NAME      = :name,
-                    USER_PASSWORD  = :password,
-                    USER_LAST_NAME = :last_name,
-                    USER_EMAIL     = :email,
-                    USER_STATE     = :state
-                WHERE USER_ID      = :user_id
-            """, {
-                "name": name,
-                "password": password,
-                "last_name": last_name,
-                "email": email,
-                "state": state,
-                "user_id": user_id
-            })
-        self.conn.commit()
-        return f"User '{username}' has been updated successfully."
+        with self.conn_instance.acquire() as conn:
+            with conn.cursor() as cur:
+                cur.execute("""
+                    UPDATE USERS SET 
+                        USER_NAME      = :name,
+                        USER_PASSWORD  = :password,
+                        USER_LAST_NAME = :last_name,
+                        USER_EMAIL     = :email,
+                        USER_STATE     = :state
+                    WHERE USER_ID      = :user_id
+                """, {
+                    "name": name,
+                    "password": password,
+                    "last_name": last_name,
+                    "email": email,
+                    "state": state,
+                    "user_id": user_id
+                })
+            conn.commit()
+            self.cache.invalidate("users")
+            return f"User '{username}' has been updated successfully."
         
     def update_modules(self, user_id, modules):
         """
@@ -340,95 +400,147 @@ class UserService:
         Returns:
             str: A message indicating success.
         """
-        with self.conn.cursor() as cur:
-            cur.execute("""
-                UPDATE USERS SET 
-                    USER_MODULES = :modules
-                WHERE USER_ID    = :user_id
-            """, {"modules": modules, "user_id": user_id})
-        self.conn.commit()
-        return f"User has been updated successfully."
+        with self.conn_instance.acquire() as conn:
+            with conn.cursor() as cur:
+                cur.execute(user_modules_block("""
+                    UPDATE USERS SET 
+                        USER_MODULES = :modules
+                    WHERE USER_ID    = v_user_id;
+                """), {"modules": modules, "user_id": int(user_id)})
+            conn.commit()
+            self.cache.invalidate("users")
+            return f"User has been updated successfully."
 
-    def delete_user(self, user_id, username):
+    def delete_user(self, user_id, username, batch_size=PURGE_BATCH_SIZE):
         """
-        Deletes user and all related records in the correct order to avoid FK constraint violations.
+        Deletes the user and everything only they own (files, DOCS, agents and
+        their share rows) with the SP_PURGE_USER procedure.
+
+        The cascade runs in the database with batched DOCS deletes on FILE_ID,
+        committing and reporting progress in USER_PURGE after every batch.
+        Bucket objects and the Select AI schema are cleaned up afterwards by
+        UserPurgeService.
+
+        Args:
+            user_id (int): The ID of the user to delete.
+            username (str): The username, for the message.
+            batch_size (int): DOCS rows deleted per batch.
+
+        Returns:
+            str: Success message.
         """
-        with self.conn.cursor() as cur:
+        with self.conn_instance.acquire() as conn:
+            with conn.cursor() as cur:
+                cur.callproc("SP_PURGE_USER", [int(user_id), int(batch_size)])
+            conn.commit()
 
-            # 1. Obtener agent_ids relacionados al usuario
-            cur.execute("""
-                SELECT agent_id FROM agent_user WHERE user_id = :user_id
-            """, {"user_id": user_id})
-            agent_ids = [row[0] for row in cur.fetchall()]
+            # La cascada borra archivos y agentes compartidos con otros usuarios
+            for entity in ("users", "files", "file_user", "agents", "agent_user"):
+                self.cache.invalidate(entity)
 
-            # 2. Eliminar relaciones en AGENT_USER (solo las del usuario)
-            cur.execute("""
-                DELETE FROM agent_user WHERE user_id = :user_id
-            """, {"user_id": user_id})
-
-            # 3. Eliminar AGENTS si ya no tienen más relaciones en AGENT_USER
-            if agent_ids:
-                # We can't easily parameterize the IN clause with a list in one go without trickery or iterating.
-                # Since agent_ids comes from the database (integers), it's safe from injection, but for consistency:
-                # Oracle allows bindings in IN clause but it's variable number.
-                # Given we retrieved them as ints, it is safe to format them into the string.
-                agent_ids_str = ','.join(map(str, agent_ids))
-                cur.execute(f"""
-                    DELETE FROM agents
-                    WHERE agent_id IN ({agent_ids_str})
-                    AND NOT EXISTS (
-                        SELECT 1 FROM agent_user WHERE agent_id = agents.agent_id
-                    )
-                """)
-
-            # 4. Obtener file_ids relacionados al usuario
-            cur.execute("""
-                SELECT file_id FROM file_user WHERE user_id = :user_id
-            """, {"user_id": user_id})
-            file_ids = [row[0] for row in cur.fetchall()]
+            return f"User :green[{username}] has been deleted successfully."
 
-            # 5. Eliminar relaciones en FILE_USER (solo las del usuario)
-            cur.execute("""
-                DELETE FROM file_user WHERE user_id = :user_id
-            """, {"user_id": user_id})
-
-            # 6. Eliminar DOCS de archivos si ya no están relacionados a ningún usuario
-            if file_ids:
-                file_ids_str = ','.join(map(str, file_ids))
-                cur.execute(f"""
-                    DELETE FROM docs
-                    WHERE file_id IN ({file_ids_str})
-                    AND NOT EXISTS (
-                        SELECT 1 FROM file_user WHERE file_id = docs.file_id
-                    )
-                """)
-
-                # 7. Eliminar FILES si ya no están asociados a ningún usuario
-                cur.execute(f"""
-                    DELETE FROM files
-                    WHERE file_id IN ({file_ids_str})
-                    AND NOT EXISTS (
-                        SELECT 1 FROM file_user WHERE file_id = files.file_id
-                    )
-                """)
-
-            # 8. Eliminar al usuario
+    def start_purge(self, user_id, username):
+        """
+        Disables the user and registers the purge in USER_PURGE so it shows as
+        in progress before the background purge starts.
+        """
+        with self.conn_instance.acquire() as conn:
+            with conn.cursor() as cur:
+                cur.execute("""
+                    MERGE INTO USER_PURGE p
+                    USING (SELECT :user_id AS USER_ID FROM DUAL) s
+                    ON (p.USER_ID = s.USER_ID)
+                    WHEN MATCHED THEN UPDATE SET
+                        p.PURGE_STAGE   = 'START',
+                        p.PURGE_STATE   = 1,
+                        p.PURGE_MESSAGE = NULL,
+                        p.PURGE_DATE    = SYSDATE
+                    WHEN NOT MATCHED THEN INSERT (USER_ID, USER_USERNAME, PURGE_STATE)
+                        VALUES (s.USER_ID, :username, 1)
+                """, {"user_id": int(user_id), "username": username})
+                cur.execute("""
+                    UPDATE USERS SET USER_STATE = 0 WHERE USER_ID = :user_id
+                """, {"user_id": int(user_id)})
+            conn.commit()
+            self.cache.invalidate("users")
+
+    def update_purge(self, user_id, stage, state, message=None):
+        """
+        Updates the stage/state of a user purge (USER_PURGE).
+
+        Args:
+            user_id (int): The purged user ID.
+            stage (str): Current stage (e.g. BUCKET, SELECT_AI, DONE).
+            state (int): 1 running, 2 database purged, 3 completed, 0 error.
+            message (str): Error message, if any.
+        """
+        with self.conn_instance.acquire() as conn, conn.cursor() as cur:
             cur.execute("""
-                DELETE FROM users WHERE user_id = :user_id
-            """, {"user_id": user_id})
+                UPDATE USER_PURGE SET
+                    PURGE_STAGE   = :stage,
+                    PURGE_STATE   = :state,
+                    PURGE_MESSAGE = SUBSTR(:message, 1, 4000),
+                    PURGE_DATE    = SYSDATE
+                WHERE USER_ID = :user_id
+            """, {
+                "stage": stage,
+                "state": state,
+                "message": message,
+                "user_id": int(user_id)
+            })
+            conn.commit()
 
-        self.conn.commit()
+    def get_purge_objects(self, user_id):
+        """
+        Returns the bucket object URLs of the files removed by the purge.
 
-        return f"User :green[{username}] has been deleted successfully."
+        Returns:
+            list: FILE_SRC_FILE_NAME and bucket FILE_TRG_OBJ_NAME values of the purged files.
+        """
+        df = self.conn_instance.read_df("""
+            SELECT PURGE_OBJECTS FROM USER_PURGE WHERE USER_ID = :user_id
+        """, params={"user_id": int(user_id)})
+        if df.empty or not df["PURGE_OBJECTS"].iloc[0]:
+            return []
+        return json.loads(df["PURGE_OBJECTS"].iloc[0])
+
+    def get_all_user_purge(self):
+        """
+        Retrieves the user purges with their progress.
+
+        Returns:
+            pd.DataFrame: USER_PURGE rows, latest first.
+        """
+        query = """
+            SELECT
+                USER_ID,
+                USER_USERNAME,
+                PURGE_STAGE,
+                PURGE_DOCS,
+                PURGE_FILES,
+                PURGE_AGENTS,
+                PURGE_MESSAGE,
+                PURGE_STATE,
+                PURGE_DATE
+            FROM USER_PURGE
+            ORDER BY PURGE_DATE DESC
+        """
+        try:
+            return self.conn_instance.read_df(query)
+        except Exception as e:
+            # Table or view 'USER_PURGE' does not exist (setup not updated yet).
+            if 'ORA-00942' in str(e):
+                return pd.DataFrame()
+            raise
 
-    
     def get_all_user_group_cache(self, force_update=False):
         if force_update:
             # Borra la caché de la función
             self.get_all_user_group.clear()
         return self.get_all_user_group()
 
-    @st.cache_data
+    @cached("user_group", per_user=False)
     def get_all_user_group(_self):
         """
         Retrieves all active modules from the database for user.
@@ -451,7 +563,7 @@ class UserService:
             WHERE
                 A.USER_GROUP_STATE = 1
         """
-        return pd.read_sql(query, con=_self.conn)
+        return _self.conn_instance.read_df(query)
 
     def get_all_user_group_cache(self, force_update=False):
         """
@@ -461,7 +573,7 @@ class UserService:
             self.get_all_user_group.clear()
         return self.get_all_user_group()
 
-    @st.cache_data
+    @cached("user_group", per_user=False)
     def get_all_user_group(_self):
         """
         Retrieves all user groups with user count.
@@ -481,91 +593,111 @@ class UserService:
             FROM USER_GROUP A
             ORDER BY A.USER_GROUP_ID DESC
         """
-        return pd.read_sql(query, con=_self.conn)
+        return _self.conn_instance.read_df(query)
     
     def insert_user_group(self, user_group_name, user_group_description):
-        query = """
-            INSERT INTO user_group (
-                user_group_name,
-                user_group_description
-            ) VALUES (
-                :name,
-                :description
-            )
-            RETURNING user_group_id INTO :new_id
-        """
-        with self.conn.cursor() as cur:
-            new_id = cur.var(int)
-            cur.execute(query, {
-                "name": user_group_name,
-                "description": user_group_description,
-                "new_id": new_id
-            })
-            self.conn.commit()
-            user_group_id = new_id.getvalue()
+        with self.conn_instance.acquire() as conn:
+            query = """
+                INSERT INTO user_group (
+                    user_group_name,
+                    user_group_description
+                ) VALUES (
+                    :name,
+                    :description
+                )
+                RETURNING user_group_id INTO :new_id
+            """
+            with conn.cursor() as cur:
+                new_id = cur.var(int)
+                cur.execute(query, {
+                    "name": user_group_name,
+                    "description": user_group_description,
+                    "new_id": new_id
+                })
+                conn.commit()
+                self.cache.invalidate("user_group")
+                user_group_id = new_id.getvalue()
 
-            if isinstance(user_group_id, list):
-                user_group_id = user_group_id[0]
+                if isinstance(user_group_id, list):
+                    user_group_id = user_group_id[0]
 
-        return f"User Group '{user_group_name}' created successfully.", int(user_group_id)
+            return f"User Group '{user_group_name}' created successfully.", int(user_group_id)
 
     def update_user_group(self, user_group_id, user_group_name, user_group_description, user_group_state):
-        query = """
-            UPDATE user_group
-            SET 
-                user_group_name = :name,
-                user_group_description = :description,
-                user_group_state = :state
-            WHERE user_group_id = :id
-        """
-        with self.conn.cursor() as cur:
-            cur.execute(query, {
-                "name": user_group_name,
-                "description": user_group_description,
-                "state": user_group_state,
-                "id": user_group_id
-            })
-        self.conn.commit()
-        return f"User Group '{user_group_name}' updated successfully."
+        with self.conn_instance.acquire() as conn:
+            query = """
+                UPDATE user_group
+                SET 
+                    user_group_name = :name,
+                    user_group_description = :description,
+                    user_group_state = :state
+                WHERE user_group_id = :id
+            """
+            with conn.cursor() as cur:
+                cur.execute(query, {
+                    "name": user_group_name,
+                    "description": user_group_description,
+                    "state": user_group_state,
+                    "id": user_group_id
+                })
+            conn.commit()
+            self.cache.invalidate("user_group")
+            return f"User Group '{user_group_name}' updated successfully."
 
     def delete_user_group(self, user_group_id):
-        query = """
-            DELETE FROM USER_GROUP
-            WHERE USER_GROUP_ID = :user_group_id
-        """
-        with self.conn.cursor() as cur:
-            cur.execute(query, {"user_group_id": user_group_id})
-        self.conn.commit()
-        return f"User Group ID '{user_group_id}' has been deleted successfully."
+        with self.conn_instance.acquire() as conn:
+            query = """
+                DELETE FROM USER_GROUP
+                WHERE USER_GROUP_ID = :user_group_id
+            """
+            with conn.cursor() as cur:
+                cur.execute(query, {"user_group_id": user_group_id})
+            conn.commit()
+            self.cache.invalidate("user_group")
+            return f"User Group ID '{user_group_id}' has been deleted successfully."
 
 
     def get_all_user_group_shared_cache(self, user_id, force_update=False):
         if force_update:
-            self.get_all_user_group_shared.clear()
+            self.get_all_user_group_shared.clear(user_id)
         return self.get_all_user_group_shared(user_id)
 
-    @st.cache_data
+    @cached("users", "user_group")
     def get_all_user_group_shared(_self, user_id):
-        query = """
-            SELECT
-                A.USER_ID,
-                A.USER_GROUP_ID,
-                B.USER_GROUP_NAME,
-                A.USER_USERNAME,
-                A.USER_NAME || ' ' || A.USER_LAST_NAME AS USER_FULL_NAME,
-                A.USER_EMAIL,
-                A.USER_STATE,
-                A.USER_DATE
-            FROM
-                USERS A
-            JOIN USER_GROUP B
-                ON A.USER_GROUP_ID = B.USER_GROUP_ID
-            WHERE
-                A.USER_STATE <> 0
-                AND A.USER_ID <> :user_id
-                AND A.USER_GROUP_ID = (
-                    SELECT USER_GROUP_ID FROM USERS WHERE USER_ID = :user_id_sub
-                )
-            ORDER BY A.USER_ID DESC
+        return _self.conn_instance.read_df(GET_ALL_USER_GROUP_SHARED_QUERY, params={"user_id": user_id, "user_id_sub": user_id})
+
+
+class UserServiceAsync:
+    """
+    Asyncio variant of UserService for the read queries a page loads at once.
+    Run them concurrently with services.database.gather(); results are
+    shared with the sync service through the QueryCache.
+    """
+    def __init__(self):
+        """
+        Initializes the UserServiceAsync with the shared async connection manager.
+        """
+        self.conn_instance = AsyncConnection()
+
+    @cached("users", "user_group", per_user=False, name="UserService.get_all_users")
+    async def get_all_users(self):
+        """
+        Retrieves all active users from the database.
+
+        Returns:
+            pd.DataFrame: A DataFrame containing user information.
+        """
+        return await self.conn_instance.read_df(GET_ALL_USERS_QUERY)
+
+    @cached("users", "user_group", name="UserService.get_all_user_group_shared")
+    async def get_all_user_group_shared(self, user_id):
+        """
+        Retrieves the users of the same group as user_id available for sharing.
+
+        Args:
+            user_id (int): The ID of the current user.
+
+        Returns:
+            pd.DataFrame: A DataFrame containing the users of the group.
         """
-        return pd.read_sql(query, con=_self.conn, params={"user_id": user_id, "user_id_sub": user_id})
+        return await self.conn_instance.read_df(GET_ALL_USER_GROUP_SHARED_QUERY, params={"user_id": user_id, "user_id_sub": user_id})
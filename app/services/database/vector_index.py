@@ -0,0 +1,171 @@
+import re
+import time
+from services.database.connection import Connection
+
+# Index created by j.TABLE_DOCS.sql
+DEFAULT_INDEX = {
+    "index_name"      : "DOCS_HNSW_IDX",
+    "index_type"      : "ivf",
+    "distance"        : "COSINE",
+    "target_accuracy" : 95
+}
+
+INDEX_ORGANIZATIONS = {
+    "hnsw" : "INMEMORY NEIGHBOR GRAPH",
+    "ivf"  : "NEIGHBOR PARTITIONS"
+}
+
+DISTANCES = ("COSINE", "DOT", "EUCLIDEAN", "EUCLIDEAN_SQUARED", "MANHATTAN", "HAMMING")
+
+GET_VECTOR_INDEXES_QUERY = """
+    SELECT
+        I.INDEX_NAME,
+        I.TABLE_NAME,
+        C.COLUMN_NAME,
+        I.INDEX_SUBTYPE,
+        I.STATUS,
+        I.LAST_ANALYZED
+    FROM USER_INDEXES I
+    JOIN USER_IND_COLUMNS C
+    ON I.INDEX_NAME = C.INDEX_NAME
+    WHERE I.INDEX_TYPE = 'VECTOR'
+    ORDER BY I.TABLE_NAME, I.INDEX_NAME
+"""
+
+def check_identifier(name):
+    """
+    Validates a table, column or index name: DDL cannot bind identifiers.
+
+    Raises:
+        ValueError: The name is not a plain Oracle identifier.
+    """
+    if not re.fullmatch(r"[A-Za-z][A-Za-z0-9_$#]{0,127}", str(name or "")):
+        raise ValueError(f"Invalid identifier '{name}'.")
+    return str(name).upper()
+
+def get_index_ddl(
+        index_name,
+        index_type,
+        table_name          = "DOCS",
+        column_name         = "EMBEDDING",
+        distance            = "COSINE",
+        target_accuracy     = 95,
+        neighbors           = None,
+        efconstruction      = None,
+        neighbor_partitions = None,
+        parallel            = None
+    ):
+    """
+    Builds the CREATE VECTOR INDEX statement.
+
+    Args:
+        index_name (str)          : Index name.
+        index_type (str)          : "hnsw" (in-memory neighbor graph) or "ivf" (neighbor partitions).
+        table_name (str)          : Vector table.
+        column_name (str)         : VECTOR column.
+        distance (str)            : Distance metric (COSINE, DOT, EUCLIDEAN, ...).
+        target_accuracy (int)     : Default accuracy (%) of the approximate searches.
+        neighbors (int)           : HNSW: neighbors per vector in the graph.
+        efconstruction (int)      : HNSW: candidates considered while building.
+        neighbor_partitions (int) : IVF: number of partitions (centroids).
+        parallel (int)            : Degree of parallelism of the build.
+
+    Returns:
+        str: The DDL statement.
+    """
+    index_type = str(index_type).lower()
+    if index_type not in INDEX_ORGANIZATIONS:
+        raise ValueError(f"Unknown index type '{index_type}'. Options: {', '.join(INDEX_ORGANIZATIONS)}")
+    distance = str(distance).upper()
+    if distance not in DISTANCES:
+        raise ValueError(f"Unknown distance '{distance}'. Options: {', '.join(DISTANCES)}")
+
+    parameters = [f"TYPE {index_type.upper()}"]
+    if index_type == "hnsw":
+        if neighbors:
+            parameters.append(f"NEIGHBORS {int(neighbors)}")
+        if efconstruction:
+            parameters.append(f"EFCONSTRUCTION {int(efconstruction)}")
+    elif neighbor_partitions:
+        parameters.append(f"NEIGHBOR PARTITIONS {int(neighbor_partitions)}")
+
+    ddl = (
+        f"CREATE VECTOR INDEX {check_identifier(index_name)} "
+        f"ON {check_identifier(table_name)} ({check_identifier(column_name)}) "
+        f"ORGANIZATION {INDEX_ORGANIZATIONS[index_type]} "
+        f"DISTANCE {distance} "
+        f"WITH TARGET ACCURACY {int(target_accuracy)} "
+        f"PARAMETERS ({', '.join(parameters)})"
+    )
+    if parallel:
+        ddl += f" PARALLEL {int(parallel)}"
+    return ddl
+
+class VectorIndexService:
+    """
+    Service class to list, create, drop and rebuild the vector indexes
+    (HNSW or IVF) of the vector tables.
+    """
+
+    def __init__(self):
+        """
+        Initializes the VectorIndexService with the shared connection manager.
+        """
+        self.conn_instance = Connection()
+
+    def get_indexes(self):
+        """
+        Returns:
+            pd.DataFrame: The vector indexes of the schema (name, table, column, type, status).
+        """
+        return self.conn_instance.read_df(GET_VECTOR_INDEXES_QUERY)
+
+    def create_index(self, index_name, index_type, **params):
+        """
+        Creates a vector index (see get_index_ddl for the parameters).
+
+        Returns:
+            float: Seconds the build took.
+        """
+        ddl   = get_index_ddl(index_name, index_type, **params)
+        start = time.perf_counter()
+        with self.conn_instance.acquire() as conn, conn.cursor() as cur:
+            cur.execute(ddl)
+        return time.perf_counter() - start
+
+    def drop_index(self, index_name):
+        """
+        Drops a vector index; an index that does not exist is ignored.
+
+        Returns:
+            bool: True if it was dropped.
+        """
+        with self.conn_instance.acquire() as conn, conn.cursor() as cur:
+            try:
+                cur.execute(f"DROP INDEX {check_identifier(index_name)}")
+                return True
+            except Exception as e:
+                # ORA-01418: el índice no existe
+                if "ORA-01418" in str(e):
+                    return False
+                raise
+
+    def rebuild_index(self, index_name, index_type, **params):
+        """
+        Rebuilds a vector index with new parameters (or type): drops it and
+        creates it again. Searches fall back to exact while it builds.
+
+        Returns:
+            float: Seconds the build took.
+        """
+        self.drop_index(index_name)
+        return self.create_index(index_name, index_type, **params)
+
+    def restore_default_index(self):
+        """
+        Rebuilds DOCS_HNSW_IDX as j.TABLE_DOCS.sql creates it.
+
+        Returns:
+            float: Seconds the build took.
+        """
+        return self.rebuild_index(**DEFAULT_INDEX)
@@ -0,0 +1,276 @@
+import os
+import time
+import json
+import hashlib
+import array
+import oracledb
+from concurrent.futures import ThreadPoolExecutor
+from dotenv import load_dotenv
+
+from services.database.connection import Connection
+from services.database.embedding import get_embedding_backend
+from services.database.embedding_cache import EmbeddingCache
+from services.database.chunker import CharacterChunker, get_chunker
+
+load_dotenv()
+
+# Same chunking as SP_VECTOR_STORE (utl_to_chunks by characters, recursively)
+CHUNK_MAX_CHARS     = 512
+CHUNK_OVERLAP_CHARS = 51
+
+# Texts per embedding request and requests in flight at the same time
+EMB_BATCH_SIZE      = int(os.getenv('CON_GEN_AI_EMB_BATCH_SIZE', 96))
+EMB_MAX_CONCURRENCY = int(os.getenv('CON_GEN_AI_EMB_MAX_CONCURRENCY', 4))
+
+# Keys of VW_DOCS_FILES.METADATA that change with every version of the file:
+# not stored per chunk, so a new version does not rewrite the kept DOCS rows
+FILE_VERSION_KEYS = ("file_version", "file_date")
+
+GET_VECTOR_SOURCE_QUERY = """
+    SELECT A.TEXT, A.METADATA, A.LANGUAGE, M.MODULE_CHUNKER
+    FROM VW_DOCS_FILES A
+    JOIN FILES F
+    ON A.FILE_ID = F.FILE_ID
+    JOIN MODULES M
+    ON F.MODULE_ID = M.MODULE_ID
+    WHERE A.FILE_ID = :file_id
+    FETCH FIRST 1 ROWS ONLY
+"""
+
+GET_VECTOR_CHUNKS_QUERY = """
+    SELECT CHUNK_HASH, CHUNK_PARAMS, METADATA
+    FROM DOCS
+    WHERE FILE_ID = :file_id
+"""
+
+def chunk_hash(chunk):
+    """
+    SHA-256 of a chunk in upper-case hex, the same value as
+    RAWTOHEX(STANDARD_HASH(chunk, 'SHA256')) in SP_VECTOR_STORE.
+    """
+    return hashlib.sha256(chunk.encode("utf-8")).hexdigest().upper()
+
+def split_text(text, max_chars=CHUNK_MAX_CHARS, overlap=CHUNK_OVERLAP_CHARS):
+    """
+    Splits a text into chunks of at most max_chars characters (see
+    chunker.CharacterChunker).
+
+    Returns:
+        list: The chunks, in order.
+    """
+    return [chunk.text for chunk in CharacterChunker(max_chars, overlap).split(text)]
+
+class VectorIngest:
+    """
+    Python ingestion engine for the vector store, an alternative to
+    SP_VECTOR_STORE: chunks the extraction in Python, embeds the chunks in
+    batches of EMB_BATCH_SIZE with up to EMB_MAX_CONCURRENCY requests at
+    once, and bulk-inserts DOCS with executemany and VECTOR binds.
+
+    Re-vectorizing a new version is incremental: every DOCS row carries the
+    hash of its chunk and the chunker parameters, so only chunks that are
+    new get embedded, those that vanished are deleted and the rest are
+    kept. New chunks already embedded with the same model for any file are
+    copied from the EMB_CACHE embedding cache; only the misses are sent to
+    the embedding provider. The embeddings are computed first, without
+    holding a database session, and the cache is written in autocommit, so
+    the DOCS changes of the file take a single short transaction
+    (Connection.transaction) that holds no lock on shared EMB_CACHE rows.
+
+    The chunker is the one of the file module (MODULES.MODULE_CHUNKER, see
+    chunker.get_chunker) and the offsets of each chunk in the extraction
+    are added to its METADATA (chunk_start, chunk_end, page, cues...).
+    """
+    def __init__(self, backend=None, batch_size=None, max_concurrency=None, use_cache=True, chunker=None):
+        """
+        Args:
+            backend: Embedding backend (see embedding.get_embedding_backend).
+            batch_size (int): Texts per embedding request.
+            max_concurrency (int): Embedding requests in flight.
+            use_cache (bool): Read and fill the EMB_CACHE embedding cache.
+            chunker (str): Chunker spec for every file, instead of the module one.
+        """
+        self.conn_instance   = Connection()
+        self.backend         = backend or get_embedding_backend()
+        self.batch_size      = batch_size or EMB_BATCH_SIZE
+        self.max_concurrency = max_concurrency or EMB_MAX_CONCURRENCY
+        self.chunker         = chunker
+        self.emb_cache       = EmbeddingCache() if use_cache else None
+
+    def get_source(self, file_id):
+        """
+        Returns (text, metadata, language, chunker) of a file from
+        VW_DOCS_FILES, or None if the file is not active in a vector store module.
+        """
+        with self.conn_instance.acquire() as conn, conn.cursor() as cur:
+            cur.execute(GET_VECTOR_SOURCE_QUERY, {"file_id": int(file_id)})
+            return cur.fetchone()
+
+    def embed_batches(self, chunks):
+        """
+        Embeds the chunks in batches, several requests at a time, yielding
+        (batch, vectors) in order as they complete.
+        """
+        batches = [chunks[i:i + self.batch_size] for i in range(0, len(chunks), self.batch_size)]
+        if not batches:
+            return
+        with ThreadPoolExecutor(max_workers=self.max_concurrency, thread_name_prefix="embedding") as executor:
+            yield from zip(batches, executor.map(self.backend.embed_documents, batches))
+
+    def vector_store(self, file_id, progress=None):
+        """
+        Brings the DOCS rows of a file in line with its current chunks:
+        embeds and inserts the new ones, deletes those that vanished (or were
+        made with other chunker parameters) and keeps the rest.
+
+        Args:
+            file_id (int): The file to vectorize.
+            progress (callable): Called with (chunks_done, chunks_total) after each batch.
+
+        Returns:
+            dict: chunks, new, kept and deleted chunks, embedding cache hits and
+                  misses, embedding calls and seconds spent.
+        """
+        start  = time.perf_counter()
+        stats  = {"chunks": 0, "new": 0, "kept": 0, "deleted": 0, "cache_hits": 0, "cache_misses": 0, "embedding_calls": 0}
+        source = self.get_source(file_id)
+        if source is None:
+            stats["seconds"] = 0.0
+            return stats
+
+        text, metadata, _, module_chunker = source
+        file_id      = int(file_id)
+        chunker      = get_chunker(self.chunker or module_chunker)
+        chunk_params = f"python:{chunker.spec}"
+        metadata     = json.loads(metadata) if metadata else {}
+        for key in FILE_VERSION_KEYS:
+            metadata.pop(key, None)
+
+        # Un chunk repetido se guarda una sola vez (mismo hash, offsets de la primera aparición)
+        chunks = {}
+        for chunk in chunker.split(text):
+            chunks.setdefault(chunk_hash(chunk.text), chunk)
+        chunk_metadata = {
+            h: json.dumps({**metadata, **chunk.get_metadata()}, ensure_ascii=False)
+            for h, chunk in chunks.items()
+        }
+
+        # EMB_CACHE va en autocommit, fuera de la transacción de DOCS: sus filas no quedan bloqueadas
+        with self.conn_instance.acquire() as conn, conn.cursor() as cur:
+            cur.execute(GET_VECTOR_CHUNKS_QUERY, {"file_id": file_id})
+            stored = cur.fetchall()
+
+            stale = {
+                row_hash for row_hash, row_params, _ in stored
+                if row_params != chunk_params or row_hash not in chunks
+            }
+            kept = {row_hash for row_hash, _, _ in stored} - stale
+
+            new_hashes = [h for h in chunks if h not in kept]
+            model_id   = self.backend.model_id
+            hits       = self.emb_cache.lookup(cur, model_id, new_hashes) if self.emb_cache else set()
+
+        # Las llamadas al proveedor de embeddings no retienen ninguna sesión; cada lote se guarda en una breve
+        new_chunks = [chunks[h].text for h in new_hashes if h not in hits]
+        embedded   = []
+        done = len(hits)
+        if progress and hits:
+            progress(done, len(new_hashes))
+        for batch, vectors in self.embed_batches(new_chunks):
+            if self.emb_cache:
+                with self.conn_instance.acquire() as conn, conn.cursor() as cur:
+                    self.emb_cache.store(cur, model_id, [chunk_hash(chunk) for chunk in batch], vectors)
+            embedded.extend(zip(batch, vectors))
+            stats["embedding_calls"] += 1
+            done += len(batch)
+            if progress:
+                progress(done, len(new_hashes))
+
+        # Transacción corta, solo DOCS y FILES, en una sesión propia (la conexión compartida sigue en autocommit)
+        with self.conn_instance.transaction() as conn, conn.cursor() as cur:
+            if any(row_hash is None for row_hash, _, _ in stored):
+                cur.execute("""
+                    DELETE FROM DOCS WHERE FILE_ID = :file_id AND CHUNK_HASH IS NULL
+                """, {"file_id": file_id})
+                stats["deleted"] += cur.rowcount
+            stale.discard(None)
+            if stale:
+                cur.executemany("""
+                    DELETE FROM DOCS WHERE FILE_ID = :file_id AND CHUNK_HASH = :chunk_hash
+                """, [{"file_id": file_id, "chunk_hash": h} for h in stale])
+                stats["deleted"] += cur.rowcount
+
+            # Solo se reescriben los chunks conservados cuya metadata cambió (p. ej. sus offsets)
+            changed = [
+                {"file_id": file_id, "chunk_hash": row_hash, "metadata": chunk_metadata[row_hash]}
+                for row_hash, _, row_metadata in stored
+                if row_hash in kept and row_metadata != chunk_metadata[row_hash]
+            ]
+            if changed:
+                cur.executemany("""
+                    UPDATE DOCS SET METADATA = :metadata
+                    WHERE FILE_ID = :file_id AND CHUNK_HASH = :chunk_hash
+                """, changed)
+
+            if hits:
+                # Embeddings ya calculados para otro archivo: se copian desde EMB_CACHE
+                cur.executemany("""
+                    INSERT INTO DOCS (FILE_ID, TEXT, METADATA, EMBEDDING, CHUNK_HASH, CHUNK_PARAMS)
+                    SELECT :file_id, :text, :metadata, EMBEDDING, CHUNK_HASH, :chunk_params
+                    FROM EMB_CACHE
+                    WHERE MODEL_ID = :model_id
+                    AND CHUNK_HASH = :chunk_hash
+                """, [
+                    {
+                        "file_id": file_id,
+                        "text": chunks[h].text,
+                        "metadata": chunk_metadata[h],
+                        "chunk_params": chunk_params,
+                        "model_id": model_id,
+                        "chunk_hash": h
+                    }
+                    for h in hits
+                ], arraydmlrowcounts=True)
+                # Un hit desalojado de EMB_CACHE después de la búsqueda no llegaría a DOCS
+                evicted = cur.getarraydmlrowcounts().count(0)
+                if evicted:
+                    raise RuntimeError(
+                        f"{evicted} chunks of file {file_id} were evicted from EMB_CACHE before reaching DOCS; run it again."
+                    )
+
+            if embedded:
+                cur.setinputsizes(embedding=oracledb.DB_TYPE_VECTOR)
+                cur.executemany("""
+                    INSERT INTO DOCS (FILE_ID, TEXT, METADATA, EMBEDDING, CHUNK_HASH, CHUNK_PARAMS)
+                    VALUES (:file_id, :text, :metadata, :embedding, :chunk_hash, :chunk_params)
+                """, [
+                    {
+                        "file_id": file_id,
+                        "text": chunk,
+                        "metadata": chunk_metadata[chunk_hash(chunk)],
+                        "embedding": array.array("f", vector),
+                        "chunk_hash": chunk_hash(chunk),
+                        "chunk_params": chunk_params
+                    }
+                    for chunk, vector in embedded
+                ])
+
+            # Nueva versión de DOCS: invalida los resultados en caché y actualiza el número de chunks
+            cur.execute("""
+                UPDATE FILES SET
+                    FILE_DOCS_VERSION = FILE_DOCS_VERSION + 1,
+                    FILE_DOCS_CHUNKS  = (SELECT COUNT(1) FROM DOCS WHERE FILE_ID = :file_id)
+                WHERE FILE_ID = :file_id
+            """, {"file_id": file_id})
+
+        if self.emb_cache and new_hashes:
+            with self.conn_instance.acquire() as conn, conn.cursor() as cur:
+                self.emb_cache.record(cur, model_id, len(hits), len(new_chunks))
+
+        stats["chunks"]       = len(chunks)
+        stats["new"]          = len(new_hashes)
+        stats["kept"]         = len(kept)
+        stats["cache_hits"]   = len(hits)
+        stats["cache_misses"] = len(new_chunks)
+        stats["seconds"]      = time.perf_counter() - start
+        return stats
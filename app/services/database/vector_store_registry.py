@@ -0,0 +1,214 @@
+import os
+import copy
+import time
+import threading
+from dotenv import load_dotenv
+
+from langchain_community.embeddings.oci_generative_ai import OCIGenAIEmbeddings
+from langchain_community.vectorstores import OracleVS
+
+from services.database.connection import Connection
+from services.database.retrieval_cache import CachedEmbeddings
+
+load_dotenv()
+
+# Build the default vector store in the background at startup
+VECTOR_STORE_WARM_UP = os.getenv('CON_VECTOR_STORE_WARM_UP', 'True').strip().lower() in ("1", "true", "yes", "y")
+
+class TimedOracleVS(OracleVS):
+    """
+    OracleVS that adds the time of its searches to the registry metrics.
+    Covers the entry points the retrievers use (similarity, threshold, mmr).
+    """
+    _registry = None
+
+    def _timed(self, search, *args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return search(*args, **kwargs)
+        finally:
+            if self._registry is not None:
+                self._registry.record("query", time.perf_counter() - start)
+
+    def similarity_search(self, *args, **kwargs):
+        return self._timed(super().similarity_search, *args, **kwargs)
+
+    def similarity_search_with_relevance_scores(self, *args, **kwargs):
+        return self._timed(super().similarity_search_with_relevance_scores, *args, **kwargs)
+
+    def max_marginal_relevance_search(self, *args, **kwargs):
+        return self._timed(super().max_marginal_relevance_search, *args, **kwargs)
+
+class VectorStoreRegistry:
+    """
+    Singleton registry of vector stores, one per (table, embedding model),
+    shared by every session of the process.
+
+    The OCIGenAIEmbeddings client (OCI config and signer) and the OracleVS
+    wrapper (table check) are built once. OracleVS queries through the
+    connection it holds, so get() hands out a shallow copy bound to the
+    caller's session: the clients are shared, a pooled session never is.
+    """
+    _instance = None
+    _lock = threading.Lock()
+
+    def __new__(cls):
+        if cls._instance is None:
+            with cls._lock:
+                if cls._instance is None:
+                    instance = super(VectorStoreRegistry, cls).__new__(cls)
+                    instance.conn_instance = Connection()
+                    instance._embeddings = {}
+                    instance._stores = {}
+                    instance._build_lock = threading.Lock()
+                    instance._stats_lock = threading.Lock()
+                    instance._warm_up = None
+                    instance._stats = {
+                        "constructs": 0,
+                        "construct_seconds": 0.0,
+                        "reuses": 0,
+                        "queries": 0,
+                        "query_seconds": 0.0,
+                        "exact_searches": 0,
+                        "approx_searches": 0
+                    }
+                    cls._instance = instance
+        return cls._instance
+
+    def record(self, kind, seconds):
+        """
+        Adds one construction ("construct") or search ("query") to the metrics.
+        """
+        with self._stats_lock:
+            self._stats[f"{kind}s"] += 1
+            self._stats[f"{kind}_seconds"] += seconds
+
+    def count(self, name):
+        """Adds one to a counter of the metrics (e.g. exact_searches)."""
+        with self._stats_lock:
+            self._stats[name] += 1
+
+    def get_embeddings(self, model_id=None):
+        """
+        Returns the shared embedding client of a model (default
+        CON_GEN_AI_EMB_MODEL_ID), with the query embedding cache.
+        """
+        model_id = model_id or os.getenv('CON_GEN_AI_EMB_MODEL_ID')
+        embeddings = self._embeddings.get(model_id)
+        if embeddings is None:
+            with self._build_lock:
+                embeddings = self._embeddings.get(model_id)
+                if embeddings is None:
+                    start = time.perf_counter()
+                    embeddings = CachedEmbeddings(OCIGenAIEmbeddings(
+                        model_id         = model_id,
+                        service_endpoint = os.getenv('CON_GEN_AI_SERVICE_ENDPOINT'),
+                        compartment_id   = os.getenv('CON_COMPARTMENT_ID')
+                    ))
+                    self._embeddings[model_id] = embeddings
+                    self.record("construct", time.perf_counter() - start)
+        return embeddings
+
+    def get_template(self, table_name, model_id):
+        """
+        Returns the shared OracleVS of a table and model, building it on
+        first use with a session of its own.
+        """
+        key   = (table_name.lower(), model_id)
+        store = self._stores.get(key)
+        if store is None:
+            embeddings = self.get_embeddings(model_id)
+            with self._build_lock:
+                store = self._stores.get(key)
+                if store is None:
+                    start = time.perf_counter()
+                    with self.conn_instance.acquire() as conn:
+                        store = TimedOracleVS(
+                            client             = conn,
+                            embedding_function = embeddings,
+                            table_name         = table_name
+                        )
+                    store.client    = None
+                    store._registry = self
+                    self._stores[key] = store
+                    self.record("construct", time.perf_counter() - start)
+        return store
+
+    def get(self, conn, table_name="docs", model_id=None):
+        """
+        Returns the vector store of a table and model bound to a session.
+
+        Args:
+            conn (oracledb.Connection): Session the searches run on, e.g. the
+                one taken with acquire() for the duration of the search.
+            table_name (str): Vector table.
+            model_id (str): Embedding model (default CON_GEN_AI_EMB_MODEL_ID).
+
+        Returns:
+            OracleVS: A copy of the shared vector store using conn.
+        """
+        model_id = model_id or os.getenv('CON_GEN_AI_EMB_MODEL_ID')
+        reused   = (table_name.lower(), model_id) in self._stores
+        store    = copy.copy(self.get_template(table_name, model_id))
+        store.client = conn
+        if reused:
+            with self._stats_lock:
+                self._stats["reuses"] += 1
+        return store
+
+    def warm_up(self, table_name="docs", model_id=None, background=True):
+        """
+        Builds the embedding client and vector store ahead of the first
+        chat message. Runs once; later calls return immediately.
+
+        Args:
+            background (bool): Build in a daemon thread instead of blocking.
+        """
+        with self._lock:
+            if self._warm_up is not None:
+                return
+            self._warm_up = threading.Thread(
+                target = self.get_template,
+                args   = (table_name, model_id or os.getenv('CON_GEN_AI_EMB_MODEL_ID')),
+                name   = "vector-store-warm-up",
+                daemon = True
+            )
+        if background:
+            self._warm_up.start()
+        else:
+            self._warm_up.run()
+
+    def get_stats(self):
+        """
+        Returns:
+            dict: Vector stores and embedding clients held, constructions and
+                  their seconds, reuses, searches and their seconds, and
+                  exact / approximate searches.
+        """
+        with self._stats_lock:
+            stats = dict(self._stats)
+        stats["stores"]     = len(self._stores)
+        stats["embeddings"] = len(self._embeddings)
+        return stats
+
+    def get_query_cache_stats(self):
+        """
+        Returns:
+            dict: Query embedding cache hits, misses, hit_rate and entries,
+                  summed over the embedding models.
+        """
+        stats = {"hits": 0, "misses": 0, "entries": 0}
+        for embeddings in list(self._embeddings.values()):
+            for name, value in embeddings.cache.get_stats().items():
+                if name in stats:
+                    stats[name] += value
+        total = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = stats["hits"] / total if total else 0.0
+        return stats
+
+    def clear(self):
+        """Drops every vector store and embedding client."""
+        with self._build_lock:
+            self._stores.clear()
+            self._embeddings.clear()
+        self._warm_up = None
@@ -7,7 +7,6 @@ from PIL import Image
 import streamlit as st
 import shutil
 
-from langchain_community.chat_models import ChatOCIGenAI
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.runnables import RunnableSerializable
 from langchain_core.output_parsers.string import StrOutputParser
@@ -17,6 +16,7 @@ from dotenv import load_dotenv
 import components as component
 import services as service
 import services.database as database
+from services.oci_generative_ai_pool import LLMPool
 import utils as utils
 
 # Initialize services
@@ -29,7 +29,8 @@ utl_function_service = utils.FunctionService()
 load_dotenv()
 
 # Initialize the service
-db_agent_service = database.AgentService()
+agent_registry = database.AgentRegistry()
+llm_pool       = LLMPool()
 
 class DocumentMultimodalService:
         
@@ -157,31 +158,20 @@ class DocumentMultimodalService:
             
     @staticmethod
     def get_extraction(user_id, agent_id, output_directory):
-        # Filter modules by user and conditions
-        df_agents = df_agents = db_agent_service.get_all_agents_cache(user_id, force_update=True)[lambda df: (df["AGENT_ID"].isin([agent_id]))]
+        # Configuration of the selected agent (registry indexed by AGENT_ID)
+        agent = agent_registry.get(user_id, agent_id)
         
-        # Initialize the LLM model with configuration from the selected agent
-        llm = ChatOCIGenAI(
-            model_id         = str(df_agents["AGENT_MODEL_NAME"].values[0]),
-            service_endpoint = os.getenv("CON_GEN_AI_SERVICE_ENDPOINT"),
-            compartment_id   = os.getenv("CON_COMPARTMENT_ID"),
-            provider         = str(df_agents["AGENT_MODEL_PROVIDER"].values[0]),
-            is_stream        = False,
-            auth_type        = os.getenv("CON_GEN_AI_AUTH_TYPE"),
-            model_kwargs = {
-                "max_tokens"        : int(df_agents["AGENT_MAX_OUT_TOKENS"].values[0]),
-                "temperature"       : float(df_agents["AGENT_TEMPERATURE"].values[0]),
-                "top_p"             : float(df_agents["AGENT_TOP_P"].values[0]),
-                "top_k"             : int(df_agents["AGENT_TOP_K"].values[0]),
-                "frequency_penalty" : float(df_agents["AGENT_FREQUENCY_PENALTY"].values[0]),
-                "presence_penalty"  : float(df_agents["AGENT_PRESENCE_PENALTY"].values[0])
-            }
+        # LLM model with the agent configuration, reused from the pool
+        llm = llm_pool.get_llm(
+            model_id     = agent.model_name,
+            provider     = agent.model_provider,
+            model_kwargs = agent.model_kwargs()
         )
 
         #
         prompt_template = ChatPromptTemplate.from_messages(
             [
-                ("system", str(df_agents["AGENT_PROMPT_SYSTEM"].values[0])),
+                ("system", agent.prompt_system),
                 ("user",
                     [
                         {
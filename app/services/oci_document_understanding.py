@@ -117,8 +117,8 @@ class DocumentUnderstandingService:
                 # Process the PDF and extract data
                 data = DocumentUnderstandingService.process_pdf(object_name_trg)
                 
-                # Process file extraction
-                file_trg_extraction = "\n".join([str(page["content"]) for page in data if "content" in page]) if data else ""
+                # Process file extraction (a page break between pages for the page chunker)
+                file_trg_extraction = f"\n{database.PAGE_SEPARATOR}".join([str(page["content"]) for page in data if "content" in page]) if data else ""
                 msg = file_service.update_extraction(file_id, file_trg_extraction)
                 component.get_toast(msg, ":material/database:")
                 
@@ -1,94 +1,195 @@
 import os
 
-from langchain_community.chat_models import ChatOCIGenAI
 from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
-from langchain.chains import create_history_aware_retriever, create_retrieval_chain
+from langchain.chains import create_retrieval_chain
 
 from langchain.chains.combine_documents import create_stuff_documents_chain
 from langchain_core.prompts import PromptTemplate
 from langchain_core.prompts.chat import ChatPromptTemplate, SystemMessagePromptTemplate
 from langchain_core.messages import SystemMessage, HumanMessage
+from langchain_core.runnables import RunnableLambda
+from langchain_core.output_parsers import StrOutputParser
 
 import components as component
 import services.database as database
+from services.oci_generative_ai_pool import LLMPool
 from dotenv import load_dotenv
 
 import time, random
+from concurrent.futures import ThreadPoolExecutor
 from oci.exceptions import TransientServiceError, ServiceError
 
 # Initialize the environment variables
 load_dotenv()
 
+# Respuesta del chat RAG token a token (stream_chain) en lugar de esperar a la respuesta completa
+RAG_STREAMING = os.getenv('CON_RAG_STREAMING', 'True').strip().lower() in ("1", "true", "yes", "y")
+
+# Reformular la pregunta con la historia antes de buscar (una llamada más al LLM por turno con historia)
+RAG_REFORMULATION = os.getenv('CON_RAG_REFORMULATION', 'False').strip().lower() in ("1", "true", "yes", "y")
+
+# Con reformulación: búsqueda con la pregunta original en paralelo a la llamada al LLM que la reformula
+RAG_PARALLEL_RETRIEVAL = os.getenv('CON_RAG_PARALLEL_RETRIEVAL', 'False').strip().lower() in ("1", "true", "yes", "y")
+
 # Initialize the service
 db_doc_service = database.DocService()
-db_agent_service = database.AgentService()
+agent_registry = database.AgentRegistry()
+llm_pool       = LLMPool()
+context_packer = database.ContextPacker()
+rewrite_cache  = database.RewriteCache()
+
+class ChainStream:
+    """
+    Respuesta en streaming de la cadena RAG. Al iterarla devuelve el texto
+    de la respuesta a medida que llega del modelo; al terminar quedan la
+    respuesta completa (answer), los documentos (context), los tokens de
+    contexto ahorrados (context_stats) y los tiempos (timings): ttft
+    (tiempo hasta el primer token), tokens y tokens_per_second medidos
+    sobre el stream real, además de los de cada etapa.
+    """
+    def __init__(self, chunks, context_stats, timings):
+        self._chunks       = chunks
+        self.answer        = ""
+        self.context       = []
+        self.context_stats = context_stats
+        self.timings       = timings
+
+    def __iter__(self):
+        start  = time.perf_counter()
+        first  = None
+        tokens = 0
+        parts  = []
+        for chunk in self._chunks:
+            if "context" in chunk:
+                self.context = chunk["context"]
+            text = chunk.get("answer")
+            if not text:
+                continue
+            if first is None:
+                first = time.perf_counter()
+                self.timings["ttft"] = first - start
+            # Cada fragmento del stream de OCI Generative AI es un token
+            tokens += 1
+            parts.append(text)
+            yield text
+
+        end = time.perf_counter()
+        self.answer = "".join(parts)
+        self.timings["total"]             = end - start
+        self.timings["answer"]            = self.timings["total"] - self.timings.get("context", 0.0)
+        self.timings["tokens"]            = tokens
+        self.timings["tokens_per_second"] = tokens / (end - first) if first is not None and end > first else 0.0
 
 class GenerativeAIService:
     """
     Servicio para crear una cadena RAG que use:
-      - Un retriever "history-aware" (creado con create_history_aware_retriever)
+      - Un retriever sobre la pregunta; con CON_RAG_REFORMULATION la reformula antes con la historia (con caché de reformulaciones)
+      - Un empaquetado del contexto (ContextPacker): une chunks contiguos, quita duplicados y recorta a un presupuesto de tokens
       - Un chain para combinar documentos (StuffDocumentsChain)
       - Un chain final via create_retrieval_chain
       - Manejo de 'chat_history' en cada invocación
     """
 
     @staticmethod
-    def get_llm(user_id, agent_id):
-        # Configuración del agente
-        df_agents = db_agent_service.get_all_agents_cache(user_id)[lambda df: df["AGENT_ID"] == agent_id]
-
-        # Configuramos el LLM (OCI Generative AI)
-        llm = ChatOCIGenAI(
-            model_id         = str(df_agents["AGENT_MODEL_NAME"].values[0]),
-            service_endpoint = os.getenv("CON_GEN_AI_SERVICE_ENDPOINT"),
-            compartment_id   = os.getenv("CON_COMPARTMENT_ID"),
-            provider         = str(df_agents["AGENT_MODEL_PROVIDER"].values[0]),
-            is_stream        = False,
-            auth_type        = os.getenv("CON_GEN_AI_AUTH_TYPE"),
-            model_kwargs     = {
-                "temperature" : float(df_agents["AGENT_TEMPERATURE"].values[0]),
-            }
-        )
+    def get_llm(user_id, agent_id, is_stream=False):
+        # Configuración del agente (registro indexado por AGENT_ID)
+        agent = agent_registry.get(user_id, agent_id)
 
-        return llm
+        # LLM (OCI Generative AI) reutilizado del pool; is_stream para recibir la respuesta token a token
+        return llm_pool.get_llm(
+            model_id     = agent.model_name,
+            provider     = agent.model_provider,
+            model_kwargs = {
+                "temperature" : agent.temperature,
+            },
+            is_stream    = is_stream
+        )
 
     @staticmethod
-    def get_chain(file_id, user_id, agent_id, history, input, input_imagen):
+    def build_chain(file_id, user_id, agent_id, history, input, input_imagen, is_stream=False):
         """
         Crea una cadena RAG para un agente específico, usando un retriever "history-aware"
+
+        Returns:
+            (Runnable, dict, dict, dict): La cadena, sus entradas, los tokens de contexto
+            ahorrados ("context_stats") y los tiempos por etapa ("timings"), que se completan al ejecutarla.
         """
         # Configuración del agente
-        df_agents = db_agent_service.get_all_agents_cache(user_id)[lambda df: df["AGENT_ID"] == agent_id]
+        agent = agent_registry.get(user_id, agent_id)
 
         # 
-        llm = GenerativeAIService.get_llm(user_id, agent_id)
-
-        # Obtenemos el vector store ya indexado
-        vector_store = db_doc_service.get_vector_store()
+        llm = GenerativeAIService.get_llm(user_id, agent_id, is_stream)
 
-        # Creamos el retriever base (filtro por file_id)
-        context_retriever = vector_store.as_retriever(
-            search_type="mmr",
-            search_kwargs={
-                "k": 10,         # Número de chunks relevantes que se devuelven
-                "fetch_k": 20,   # Número de candidatos iniciales desde los cuales aplicar MMR
-                "filter": {"file_id": file_id} # Limita la búsqueda al archivo específico
-            }
-        )
-
-        # 5) Prompt que reformulará la query usando la historia (opcional)
+        # 5) Prompt que reformulará la query usando la historia (opcional, solo si hay historia)
         reformulation_prompt = ChatPromptTemplate.from_messages([
-            ("system",  str(df_agents["AGENT_PROMPT_SYSTEM"].values[0])),
+            ("system",  agent.prompt_system),
             MessagesPlaceholder(variable_name="history"),
             ("human",   "{input}")
         ])
+        reformulation_chain = reformulation_prompt | llm | StrOutputParser()
 
-        # 6) Creamos un retriever "history-aware" que en cada llamada, usará la query reformulada + chat_history
-        history_aware_retriever = create_history_aware_retriever(
-            llm,
-            context_retriever,
-            reformulation_prompt
-        )
+        # 6) Presupuesto de tokens del contexto: ventana del modelo menos la respuesta (AGENT_MAX_OUT_TOKENS) y el resto del prompt
+        reserved_tokens = database.count_tokens(" ".join(
+            [agent.prompt_message, input] + [message.content for message in history if isinstance(message.content, str)]
+        ))
+        context_budget = database.get_context_budget(agent.max_out_tokens, reserved_tokens)
+        context_stats  = {}
+        timings        = {"reformulate": 0.0, "retrieve": 0.0, "pack": 0.0}
+
+        def retrieve(question):
+            started = time.perf_counter()
+            # Sesión de base de datos (pool) solo durante la búsqueda, no durante las llamadas al LLM
+            with db_doc_service.conn_instance.acquire() as conn:
+                # Retriever sobre DOCS limitado a los archivos (con caché de embeddings y resultados)
+                context_retriever = db_doc_service.get_retriever(
+                    conn,
+                    file_ids    = file_id if isinstance(file_id, (list, tuple)) else [file_id],
+                    k           = 10,    # Número de chunks relevantes que se devuelven
+                    fetch_k     = 200,   # Número de candidatos iniciales desde los cuales aplicar MMR (vectorizado)
+                    search_type = "mmr"
+                )
+                docs = context_retriever.invoke(question)
+            timings["retrieve"] += time.perf_counter() - started
+            return docs
+
+        def reformulate():
+            started  = time.perf_counter()
+            question = reformulation_chain.invoke({"history": history, "input": input}).strip() or input
+            rewrite_cache.set(agent.model_name, history, input, question)
+            timings["reformulate"] = time.perf_counter() - started
+            return question
+
+        def retrieve_context(inputs):
+            started = time.perf_counter()
+            if not RAG_REFORMULATION or not history:
+                # Por defecto (y en el primer turno) se busca con la pregunta tal cual
+                docs = retrieve(input)
+            else:
+                question = rewrite_cache.get(agent.model_name, history, input)
+                if question is not None:
+                    # Reformulación ya calculada: sin llamada al LLM
+                    docs = retrieve(question)
+                elif RAG_PARALLEL_RETRIEVAL:
+                    # La búsqueda con la pregunta original corre mientras el LLM la reformula;
+                    # solo se busca otra vez si la reformulación cambió la pregunta
+                    with ThreadPoolExecutor(max_workers=1, thread_name_prefix="retrieval") as executor:
+                        raw_docs = executor.submit(retrieve, input)
+                        question = reformulate()
+                        docs     = raw_docs.result()
+                    if question.strip().lower() != input.strip().lower():
+                        rewritten_docs = retrieve(question)
+                        rewritten_ids  = {doc.metadata.get("id") for doc in rewritten_docs}
+                        docs = rewritten_docs + [doc for doc in docs if doc.metadata.get("id") not in rewritten_ids]
+                else:
+                    docs = retrieve(reformulate())
+
+            # 7) Empaquetado del contexto: chunks contiguos unidos, duplicados fuera, recorte al presupuesto
+            packed_at = time.perf_counter()
+            packed_docs, stats = context_packer.pack(docs, context_budget)
+            context_stats.update(stats)
+            timings["pack"]    = time.perf_counter() - packed_at
+            timings["context"] = time.perf_counter() - started
+            return packed_docs
         
         question_answer_prompt = None
         if input_imagen:
@@ -96,7 +197,7 @@ class GenerativeAIService:
                 [
                     SystemMessagePromptTemplate(
                         prompt=PromptTemplate(
-                            template=str(df_agents['AGENT_PROMPT_MESSAGE'].values[0]),
+                            template=agent.prompt_message,
                             input_variables=["context"],
                         )
                     ),
@@ -104,7 +205,7 @@ class GenerativeAIService:
                     ("human",
                         [
                             {   "type": "text",
-                                "text": f"{str(df_agents['AGENT_PROMPT_MESSAGE'].values[0])}"
+                                "text": agent.prompt_message
                             }, {
                                 "type": "image_url",
                                 "image_url": {"url": "data:image/jpeg;base64,{input_imagen}"},
@@ -119,7 +220,7 @@ class GenerativeAIService:
         else:
             # Prompt para combinar documentos (StuffDocumentsChain)
             question_answer_prompt = ChatPromptTemplate.from_messages([
-                ("system", str(df_agents["AGENT_PROMPT_MESSAGE"].values[0])),
+                ("system", agent.prompt_message),
                 MessagesPlaceholder(variable_name="history"),
                 ("human", "{input}")
             ])
@@ -128,25 +229,67 @@ class GenerativeAIService:
 
         # 8) Creamos la cadena final (RAG)
         chain = create_retrieval_chain(
-            retriever           = history_aware_retriever,
+            retriever           = RunnableLambda(retrieve_context),
             combine_docs_chain  = combine_docs_chain
         )
 
         if input_imagen:
-            result = chain.invoke({
+            inputs = {
                 "history"      : history,
                 "input"        : input,
                 "input_imagen" : input_imagen
-            })
+            }
         else:
-            result = chain.invoke({
+            inputs = {
                 "input"        : input,
                 "history"      : history
-            })
+            }
+        return chain, inputs, context_stats, timings
+
+    @staticmethod
+    def get_chain(file_id, user_id, agent_id, history, input, input_imagen):
+        """
+        Ejecuta la cadena RAG y devuelve la respuesta completa.
+        """
+        chain, inputs, context_stats, timings = GenerativeAIService.build_chain(
+            file_id, user_id, agent_id, history, input, input_imagen
+        )
 
-        # 9) Devolvemos
+        chain_start = time.perf_counter()
+        result = chain.invoke(inputs)
+
+        timings["total"]  = time.perf_counter() - chain_start
+        timings["answer"] = timings["total"] - timings.get("context", 0.0)
+
+        # 9) Devolvemos (con los tokens de contexto ahorrados en "context_stats" y los tiempos por etapa en "timings")
+        result["context_stats"] = context_stats
+        result["timings"]       = timings
         return result
 
+    @staticmethod
+    def stream_chain(file_id, user_id, agent_id, history, input, input_imagen):
+        """
+        Ejecuta la cadena RAG en streaming: la respuesta llega token a token.
+
+        Returns:
+            ChainStream: Iterable con el texto de la respuesta a medida que se genera (st.write_stream).
+        """
+        context_stats, timings = {}, {}
+
+        def chunks():
+            # La búsqueda toma y libera su propia sesión: el stream no retiene ninguna
+            chain, inputs, stats, stages = GenerativeAIService.build_chain(
+                file_id, user_id, agent_id, history, input, input_imagen, is_stream=True
+            )
+            for chunk in chain.stream(inputs):
+                if "context" in chunk:
+                    # La cadena ya recuperó y empaquetó el contexto
+                    context_stats.update(stats)
+                    timings.update(stages)
+                yield chunk
+
+        return ChainStream(chunks(), context_stats, timings)
+
     @staticmethod
     def get_agent(user_id, agent_id, input):
         """
@@ -154,12 +297,12 @@ class GenerativeAIService:
         Devuelve un diccionario con la clave "answer" para mantener compatibilidad.
         """
         # Configuración del agente
-        df_agents = db_agent_service.get_all_agents_cache(user_id)[lambda df: df["AGENT_ID"] == agent_id]
+        agent = agent_registry.get(user_id, agent_id)
 
         # LLM configurado para el agente
         llm = GenerativeAIService.get_llm(user_id, agent_id)
 
-        system_text = str(df_agents["AGENT_PROMPT_SYSTEM"].values[0])
+        system_text = agent.prompt_system
         system_prompt = PromptTemplate(input_variables=["system_text", "query"], template="{system_text}\n{query}")
         chain = system_prompt | llm
         try:
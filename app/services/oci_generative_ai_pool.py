@@ -0,0 +1,85 @@
+import os
+import json
+import hashlib
+import threading
+from collections import OrderedDict
+
+from langchain_community.chat_models import ChatOCIGenAI
+from dotenv import load_dotenv
+
+# Initialize the environment variables
+load_dotenv()
+
+class LLMPool:
+    """
+    Singleton pool of reusable ChatOCIGenAI clients.
+
+    Clients are keyed by a hash of the model and its parameters, so every
+    agent with the same configuration shares one client (and its OCI
+    signer/session) instead of building a new one per call. The least
+    recently used clients are dropped above CON_GEN_AI_POOL_SIZE.
+    """
+    _instance = None
+    _lock = threading.Lock()
+
+    def __new__(cls):
+        if cls._instance is None:
+            with cls._lock:
+                if cls._instance is None:
+                    instance = super(LLMPool, cls).__new__(cls)
+                    instance._clients = OrderedDict()
+                    instance._clients_lock = threading.Lock()
+                    instance._max_size = int(os.getenv('CON_GEN_AI_POOL_SIZE', 32))
+                    cls._instance = instance
+        return cls._instance
+
+    @staticmethod
+    def get_key(model_id, provider, model_kwargs, is_stream=False):
+        """
+        Returns the pool key: a hash of the model and its parameters.
+        """
+        config = [model_id, provider, bool(is_stream), model_kwargs]
+        return hashlib.sha256(json.dumps(config, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+    def get_llm(self, model_id, provider, model_kwargs, is_stream=False):
+        """
+        Returns a client for the model and parameters, creating it on first use.
+
+        Args:
+            model_id (str): OCI Generative AI model name.
+            provider (str): Model provider (meta, cohere, ...).
+            model_kwargs (dict): Generation parameters (temperature, ...).
+            is_stream (bool): Streaming client.
+
+        Returns:
+            ChatOCIGenAI: The shared client.
+        """
+        key = self.get_key(model_id, provider, model_kwargs, is_stream)
+        with self._clients_lock:
+            llm = self._clients.get(key)
+            if llm is not None:
+                self._clients.move_to_end(key)
+                return llm
+
+        # Se crea fuera del lock: la creación del cliente OCI es lenta
+        llm = ChatOCIGenAI(
+            model_id         = model_id,
+            service_endpoint = os.getenv("CON_GEN_AI_SERVICE_ENDPOINT"),
+            compartment_id   = os.getenv("CON_COMPARTMENT_ID"),
+            provider         = provider,
+            is_stream        = is_stream,
+            auth_type        = os.getenv("CON_GEN_AI_AUTH_TYPE"),
+            model_kwargs     = dict(model_kwargs)
+        )
+
+        with self._clients_lock:
+            llm = self._clients.setdefault(key, llm)
+            self._clients.move_to_end(key)
+            while len(self._clients) > self._max_size:
+                self._clients.popitem(last=False)
+        return llm
+
+    def clear(self):
+        """Drops every client."""
+        with self._clients_lock:
+            self._clients.clear()
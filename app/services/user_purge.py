@@ -0,0 +1,77 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from dotenv import load_dotenv
+import services as service
+import services.database as database
+
+# Initialize the services
+client_service       = service.ClientService()
+db_user_service      = database.UserService()
+db_select_ai_service = database.SelectAIService()
+
+load_dotenv()
+
+# One background worker: purges run one after another, outside the page run
+executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="user-purge")
+
+class UserPurgeService:
+    """
+    Deletes users in the background: the database cascade (SP_PURGE_USER),
+    then the bucket objects (sources and outputs) of the purged files and
+    the SEL_AI_USER_ID_n schema. Progress is kept in USER_PURGE
+    (get_all_user_purge).
+    """
+
+    @staticmethod
+    def purge_user(user_id, username):
+        """
+        Disables the user right away and queues the purge.
+
+        Args:
+            user_id (int): The ID of the user to delete.
+            username (str): The username of the user.
+
+        Returns:
+            str: A message indicating the purge was queued.
+        """
+        db_user_service.start_purge(user_id, username)
+        executor.submit(UserPurgeService.run_purge, int(user_id), username)
+        return f"User :green[{username}] is being deleted in the background."
+
+    @staticmethod
+    def run_purge(user_id, username):
+        """
+        Runs every purge stage for a user; errors are stored in USER_PURGE.
+        Runs on the worker thread, so no Streamlit calls here.
+        """
+        try:
+            db_user_service.delete_user(user_id, username)
+
+            db_user_service.update_purge(user_id, "BUCKET", 2)
+            # Source objects and their outputs (_trg, _trg_pii); older rows may hold table names
+            for object_url in db_user_service.get_purge_objects(user_id):
+                if "/o/" in object_url:
+                    UserPurgeService.delete_object(object_url.split("/o/")[-1])
+
+            db_user_service.update_purge(user_id, "SELECT_AI", 2)
+            db_select_ai_service.drop_user(user_id)
+
+            db_user_service.update_purge(user_id, "DONE", 3)
+        except Exception as e:
+            db_user_service.update_purge(user_id, "ERROR", 0, str(e))
+
+    @staticmethod
+    def delete_object(object_name):
+        """
+        Deletes an object from the bucket; a missing object is not an error.
+        """
+        try:
+            client_service.get_client().delete_object(
+                namespace_name = os.getenv('CON_ADB_BUK_NAMESPACENAME'),
+                bucket_name    = os.getenv('CON_ADB_BUK_NAME'),
+                object_name    = object_name
+            )
+        except Exception as e:
+            if getattr(e, "status", None) != 404:
+                raise
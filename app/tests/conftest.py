@@ -0,0 +1,19 @@
+import sys
+import types
+from pathlib import Path
+
+APP_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(APP_DIR))
+
+# services/__init__ crea los clientes OCI y la conexión a la base de datos al
+# importarse; los paquetes se registran por ruta para cargar solo los módulos
+# que prueba cada test.
+for name, path in (
+    ("services", APP_DIR / "services"),
+    ("services.database", APP_DIR / "services" / "database")
+):
+    if name not in sys.modules:
+        package = types.ModuleType(name)
+        package.__path__ = [str(path)]
+        sys.modules[name] = package
+sys.modules["services"].database = sys.modules["services.database"]
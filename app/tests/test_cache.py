@@ -0,0 +1,109 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip("dotenv")
+
+from services.database.cache import QueryCache, cached
+
+class Service:
+    """Read methods counting the calls that reach the database."""
+    def __init__(self):
+        self.calls = 0
+
+    @cached("files")
+    def get_files(self, user_id, page=1):
+        self.calls += 1
+        return [user_id, page, self.calls]
+
+    @cached("models", per_user=False)
+    def get_models(self):
+        self.calls += 1
+        return [self.calls]
+
+class ServiceAsync:
+    def __init__(self):
+        self.calls = 0
+
+    @cached("files", name="Service.get_files")
+    async def get_files(self, user_id, page=1):
+        self.calls += 1
+        return [user_id, page, -self.calls]
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    QueryCache().clear()
+    yield
+    QueryCache().clear()
+
+def test_hit_until_invalidated():
+    service = Service()
+    assert service.get_files(1) == [1, 1, 1]
+    assert service.get_files(1) == [1, 1, 1]
+    assert service.calls == 1
+
+    QueryCache().invalidate("files")
+    assert service.get_files(1) == [1, 1, 2]
+
+def test_same_key_for_positional_named_and_default_arguments():
+    service = Service()
+    service.get_files(1)
+    service.get_files(user_id=1)
+    service.get_files(1, page=1)
+    assert service.calls == 1
+
+def test_invalidate_only_some_users():
+    service = Service()
+    service.get_files(1)
+    service.get_files(2)
+
+    QueryCache().invalidate("files", [2])
+    service.get_files(1)
+    assert service.calls == 2
+    service.get_files(2)
+    assert service.calls == 3
+
+def test_other_entities_keep_their_entries():
+    service = Service()
+    service.get_models()
+    QueryCache().invalidate("files")
+    service.get_models()
+    assert service.calls == 1
+
+def test_write_during_read_is_not_cached():
+    cache = QueryCache()
+    key = ("test", (1,), 1)
+    version = cache.version("files", user_id=1)
+    cache.invalidate("files", [1])
+    cache.set(key, ("files",), 1, version, "stale")
+    assert cache.get(key, ("files",), 1) == (False, None)
+
+def test_callers_get_a_copy():
+    service = Service()
+    service.get_files(1).append("changed")
+    assert service.get_files(1) == [1, 1, 1]
+
+def test_clear_and_drop_user():
+    service = Service()
+    service.get_files(1)
+    service.get_files(2)
+
+    service.get_files.clear(1)
+    service.get_files(1)
+    service.get_files(2)
+    assert service.calls == 3
+
+    QueryCache().drop_user(2)
+    service.get_files(2)
+    assert service.calls == 4
+
+def test_async_reads_share_the_sync_entries():
+    service, service_async = Service(), ServiceAsync()
+    assert service.get_files(1) == [1, 1, 1]
+    assert asyncio.run(service_async.get_files(1)) == [1, 1, 1]
+    assert service_async.calls == 0
+
+    QueryCache().invalidate("files", [1])
+    assert asyncio.run(service_async.get_files(1)) == [1, 1, -1]
+    assert service.get_files(1) == [1, 1, -1]
+    assert service.calls == 1
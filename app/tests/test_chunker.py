@@ -0,0 +1,99 @@
+import pytest
+
+pytest.importorskip("dotenv")
+
+from services.database.chunker import (
+    PAGE_SEPARATOR,
+    CharacterChunker,
+    PageChunker,
+    SentenceChunker,
+    SrtChunker,
+    TokenChunker,
+    count_tokens,
+    get_chunker,
+    normalize
+)
+
+TEXT = " ".join(
+    f"Sentence number {i} talks about the invoice {i * 7} of the customer."
+    for i in range(60)
+)
+
+SRT = """1
+00:00:01,000 --> 00:00:03,000
+Hello and welcome.
+
+2
+00:00:03,500 --> 00:00:06,000
+Today we review the quarterly results.
+
+3
+00:00:06,500 --> 00:00:09,000
+Sales grew in every region.
+"""
+
+def test_get_chunker_spec():
+    chunker = get_chunker("tokens:64:8")
+    assert isinstance(chunker, TokenChunker)
+    assert (chunker.max_tokens, chunker.overlap_tokens) == (64, 8)
+    assert get_chunker("Page:128").spec == "page:128:1"
+
+def test_get_chunker_unknown():
+    with pytest.raises(ValueError):
+        get_chunker("paragraphs:100")
+
+def test_character_chunks_map_to_offsets():
+    chunks = CharacterChunker(200, 20).split(TEXT)
+    assert len(chunks) > 1
+    assert chunks[0].start == 0
+    assert chunks[-1].end == len(TEXT)
+    for chunk in chunks:
+        assert chunk.end - chunk.start <= 200
+        assert chunk.text == normalize(TEXT[chunk.start:chunk.end])
+
+def test_character_chunks_overlap():
+    chunks = CharacterChunker(200, 20).split(TEXT)
+    for previous, chunk in zip(chunks, chunks[1:]):
+        assert previous.start < chunk.start <= previous.end
+
+def test_token_chunks_respect_limit():
+    chunks = TokenChunker(40, 5).split(TEXT)
+    assert len(chunks) > 1
+    for chunk in chunks:
+        assert chunk.metadata["chunk_tokens"] <= 40
+        assert count_tokens(chunk.text) == chunk.metadata["chunk_tokens"]
+    for previous, chunk in zip(chunks, chunks[1:]):
+        assert chunk.start < previous.end
+
+def test_sentence_chunks_keep_whole_sentences():
+    chunks = SentenceChunker(50, 1).split(TEXT)
+    assert len(chunks) > 1
+    for chunk in chunks:
+        assert chunk.text.startswith("Sentence number")
+        assert chunk.text.endswith(".")
+
+def test_page_chunks_stay_in_their_page():
+    pages = ["First page text. It has two sentences.", "Second page text.", "Third page."]
+    text = PAGE_SEPARATOR.join(pages)
+    chunks = PageChunker(512).split(text)
+    assert [chunk.metadata["page"] for chunk in chunks] == [1, 2, 3]
+    for chunk in chunks:
+        assert PAGE_SEPARATOR not in text[chunk.start:chunk.end]
+
+def test_srt_chunks_drop_cue_numbers_and_times():
+    chunks = SrtChunker(12, 1).split(SRT)
+    assert len(chunks) > 1
+    for chunk in chunks:
+        assert "-->" not in chunk.text
+        assert chunk.metadata["cue_start"] <= chunk.metadata["cue_end"]
+    assert chunks[0].metadata["cue_start"] == 1
+    assert chunks[0].metadata["time_start"] == "00:00:01,000"
+    assert chunks[-1].metadata["cue_end"] == 3
+
+def test_srt_without_cues_falls_back_to_sentences():
+    chunks = SrtChunker(256).split("Plain transcription. No cues here.")
+    assert [chunk.text for chunk in chunks] == ["Plain transcription. No cues here."]
+
+def test_empty_text():
+    for spec in ("characters", "tokens", "sentence", "page", "srt"):
+        assert get_chunker(spec).split("") == []
@@ -0,0 +1,95 @@
+import pytest
+
+pytest.importorskip("dotenv")
+pytest.importorskip("langchain_core")
+
+from langchain_core.documents import Document
+
+from services.database.chunker import CharacterChunker
+from services.database.context_packer import (
+    CONTEXT_MAX_TOKENS,
+    MODEL_CONTEXT_TOKENS,
+    ContextPacker,
+    get_context_budget,
+    join_overlap,
+    truncate_tokens
+)
+
+TEXT = " ".join(
+    f"Clause {i} of the contract sets the payment term {i * 3} for supplier {i}."
+    for i in range(40)
+)
+
+def chunk_docs(file_id, text=TEXT, max_chars=200, overlap=20):
+    return [
+        Document(page_content=chunk.text, metadata={"id": i, "file_id": file_id, **chunk.get_metadata()})
+        for i, chunk in enumerate(CharacterChunker(max_chars, overlap).split(text))
+    ]
+
+def test_join_overlap_writes_the_overlap_once():
+    assert join_overlap("alpha beta gamma", "gamma delta", 5) == "alpha beta gamma delta"
+    assert join_overlap("alpha", "beta", 0) == "alpha beta"
+
+def test_merge_adjacent_chunks_of_a_file():
+    docs = chunk_docs(7)
+    packed, merged = ContextPacker().merge(docs)
+    assert merged == len(docs) - 1
+    assert len(packed) == 1
+    assert packed[0].metadata["chunk_start"] == 0
+    assert packed[0].metadata["chunk_end"] == len(TEXT)
+    assert packed[0].metadata["ids"] == [doc.metadata["id"] for doc in docs]
+    # El solape se escribe una sola vez
+    assert packed[0].page_content.count("Clause 5 of") == 1
+
+def test_merge_keeps_separate_files_and_gaps():
+    first, second = chunk_docs(1), chunk_docs(2)
+    docs = [first[0], second[0], first[3]]
+    packed, merged = ContextPacker().merge(docs)
+    assert merged == 0
+    assert packed == docs
+
+def test_merged_chunk_takes_the_best_rank():
+    docs = chunk_docs(1)[:2]
+    other = Document(page_content="Unrelated text.", metadata={"file_id": 2, "chunk_start": 0, "chunk_end": 15})
+    packed, _ = ContextPacker().merge([docs[1], other, docs[0]])
+    assert packed[1] is other
+    assert packed[0].metadata["chunk_start"] == 0
+
+def test_dedupe_drops_near_duplicates():
+    text = "The supplier must deliver the goods within thirty days of the order date."
+    docs = [
+        Document(page_content=text),
+        Document(page_content=text + " Thanks."),
+        Document(page_content="Invoices are paid at the end of the month following delivery.")
+    ]
+    kept, dropped = ContextPacker().dedupe(docs)
+    assert dropped == 1
+    assert kept == [docs[0], docs[2]]
+
+def test_pack_cuts_to_the_budget():
+    docs = [Document(page_content=text) for text in (
+        "First answer " * 30,
+        "Second answer " * 30,
+        "Third answer " * 30
+    )]
+    packed, stats = ContextPacker().pack(docs, max_tokens=100)
+    assert len(packed) == 2
+    assert packed[1].page_content.endswith(" ...")
+    assert stats["tokens_out"] == 100
+    assert stats["truncated"] == 2
+    assert stats["tokens_saved"] == stats["tokens_in"] - stats["tokens_out"]
+
+def test_pack_skips_a_remainder_too_small_to_help():
+    docs = [Document(page_content="First answer " * 30), Document(page_content="Second answer " * 30)]
+    packed, stats = ContextPacker().pack(docs, max_tokens=70)
+    assert packed == docs[:1]
+    assert stats["tokens_out"] == 60
+
+def test_truncate_tokens():
+    assert truncate_tokens("one two three four", 2) == "one two ..."
+    assert truncate_tokens("one two", 5) == "one two"
+
+def test_context_budget():
+    assert get_context_budget(1000, 500) == min(CONTEXT_MAX_TOKENS, MODEL_CONTEXT_TOKENS - 1500)
+    assert get_context_budget(None) == min(CONTEXT_MAX_TOKENS, MODEL_CONTEXT_TOKENS)
+    assert get_context_budget(MODEL_CONTEXT_TOKENS) == 0
@@ -0,0 +1,107 @@
+import time
+
+import pytest
+
+pytest.importorskip("dotenv")
+pytest.importorskip("langchain_core")
+np = pytest.importorskip("numpy")
+
+from services.database.retrieval_cache import (
+    CachedEmbeddings,
+    RetrievalCache,
+    RewriteCache,
+    TTLCache,
+    normalize_query
+)
+
+SEARCH = ("similarity", 4)
+
+class Embeddings:
+    """Embeddings client counting the remote calls."""
+    def __init__(self):
+        self.calls = 0
+
+    def embed_query(self, text):
+        self.calls += 1
+        return [float(len(text)), 1.0]
+
+    def embed_documents(self, texts):
+        return [self.embed_query(text) for text in texts]
+
+class Message:
+    def __init__(self, type, content):
+        self.type    = type
+        self.content = content
+
+def vector(seed, size=64):
+    return np.random.default_rng(seed).standard_normal(size).tolist()
+
+@pytest.fixture(autouse=True)
+def clear_caches():
+    RetrievalCache().clear()
+    RewriteCache().clear()
+    yield
+
+def test_normalize_query():
+    assert normalize_query("  What is  the TOTAL?? ") == "what is the total"
+    assert normalize_query(None) == ""
+
+def test_ttl_cache_lru_and_expiry(monkeypatch):
+    cache = TTLCache(max_entries=2, ttl=10)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+
+    now = time.monotonic()
+    monkeypatch.setattr("services.database.retrieval_cache.time.monotonic", lambda: now + 11)
+    assert cache.get("a") is None
+    assert cache.get_stats()["hits"] == 2
+
+def test_cached_embeddings_reuse_the_question_vector():
+    client = Embeddings()
+    embeddings = CachedEmbeddings(client, max_entries=10, ttl=0)
+    first = embeddings.embed_query("What is the total?")
+    assert embeddings.embed_query("what is the total") == first
+    assert client.calls == 1
+
+def test_retrieval_cache_hit_for_the_same_vector():
+    cache = RetrievalCache()
+    cache.set(vector(1), [2, 1], [5, 3], SEARCH, [10, 11])
+    assert cache.get(vector(1), [1, 2], [5, 3], SEARCH) == [10, 11]
+
+def test_retrieval_cache_hit_for_a_close_vector():
+    cache = RetrievalCache()
+    query = np.asarray(vector(1))
+    cache.set(query.tolist(), [1], [1], SEARCH, [10])
+    # El mismo bucket LSH y similitud coseno por encima del umbral
+    assert cache.get((query * 1.5).tolist(), [1], [1], SEARCH) == [10]
+
+def test_retrieval_cache_miss_for_another_question():
+    cache = RetrievalCache()
+    cache.set(vector(1), [1], [1], SEARCH, [10])
+    assert cache.get(vector(2), [1], [1], SEARCH) is None
+
+def test_retrieval_cache_key_includes_versions_and_search():
+    cache = RetrievalCache()
+    cache.set(vector(1), [1], [1], SEARCH, [10])
+    assert cache.get(vector(1), [1], [2], SEARCH) is None
+    assert cache.get(vector(1), [1], [1], ("mmr", 4)) is None
+
+def test_retrieval_cache_invalidate_file():
+    cache = RetrievalCache()
+    cache.set(vector(1), [1, 2], [1, 1], SEARCH, [10])
+    cache.set(vector(1), [3], [1], SEARCH, [30])
+    cache.invalidate_file(2)
+    assert cache.get(vector(1), [1, 2], [1, 1], SEARCH) is None
+    assert cache.get(vector(1), [3], [1], SEARCH) == [30]
+
+def test_rewrite_cache_depends_on_the_history():
+    cache = RewriteCache()
+    history = [Message("human", "Tell me about contract 7"), Message("ai", "It is a supply contract.")]
+    cache.set("model-a", history, "And its term?", "What is the term of contract 7?")
+    assert cache.get("model-a", history, "and its term") == "What is the term of contract 7?"
+    assert cache.get("model-b", history, "And its term?") is None
+    assert cache.get("model-a", history[:1], "And its term?") is None
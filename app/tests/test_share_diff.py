@@ -0,0 +1,149 @@
+from contextlib import contextmanager
+
+import pytest
+
+pytest.importorskip("dotenv")
+pytest.importorskip("pandas")
+pytest.importorskip("oracledb")
+pytest.importorskip("ads")
+
+from services.database.agent import AgentService
+from services.database.cache import QueryCache
+from services.database.files import FileService
+
+class Collection(list):
+    """SYS.ODCINUMBERLIST value as returned by the driver."""
+    def aslist(self):
+        return list(self)
+
+class CollectionType:
+    def newobject(self, values):
+        return Collection(values)
+
+class Var:
+    def __init__(self):
+        self.value = None
+
+    def getvalue(self):
+        return self.value
+
+class Cursor:
+    """
+    Runs the share blocks of update_file_user/update_agent_user against
+    the rows of one file or agent: {user_id: owner}.
+    """
+    def __init__(self, db):
+        self.db = db
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        return False
+
+    def var(self, type):
+        return Var()
+
+    def execute(self, statement, params):
+        self.db.statements.append(statement)
+        if "user_ids" not in params:
+            return
+        users   = set(params["user_ids"])
+        linked  = list(self.db.rows)
+        removed = [user_id for user_id, owner in self.db.rows.items() if owner == 0 and user_id not in users]
+        added   = sorted(users - set(self.db.rows))
+        for user_id in removed:
+            del self.db.rows[user_id]
+        for user_id in added:
+            self.db.rows[user_id] = 0
+        params["changed"].value = len(removed) + len(added)
+        params["linked"].value  = Collection(linked)
+        params["added"].value   = Collection(added)
+
+class Database:
+    def __init__(self, rows):
+        self.rows       = dict(rows)
+        self.statements = []
+        self.commits    = 0
+
+    def gettype(self, name):
+        return CollectionType()
+
+    def cursor(self):
+        return Cursor(self)
+
+    def commit(self):
+        self.commits += 1
+
+class Connection:
+    def __init__(self, db):
+        self.db = db
+
+    @contextmanager
+    def acquire(self):
+        yield self.db
+
+SERVICES = [
+    (FileService, "update_file_user", "files", "file_user"),
+    (AgentService, "update_agent_user", "agents", "agent_user")
+]
+
+def get_service(cls, rows):
+    service = cls.__new__(cls)
+    service.conn_instance = Connection(Database(rows))
+    service.cache         = QueryCache()
+    return service
+
+def versions(entity, user_ids):
+    cache = QueryCache()
+    return {user_id: cache.version(entity, user_id=user_id) for user_id in user_ids}
+
+@pytest.mark.parametrize("cls, method, entity, share_entity", SERVICES)
+def test_share_diff_applies_only_the_changes(cls, method, entity, share_entity):
+    # Dueño 1, compartido con 2 y 3
+    service = get_service(cls, {1: 1, 2: 0, 3: 0})
+    getattr(service, method)(7, [3, 4])
+
+    db = service.conn_instance.db
+    assert db.rows == {1: 1, 3: 0, 4: 0}
+    assert len(db.statements) == 1
+    assert db.commits == 1
+
+@pytest.mark.parametrize("cls, method, entity, share_entity", SERVICES)
+def test_share_diff_invalidates_linked_and_added_users(cls, method, entity, share_entity):
+    service = get_service(cls, {1: 1, 2: 0, 3: 0})
+    users = [1, 2, 3, 4, 5]
+    before = versions(entity, users)
+    shares_before = QueryCache().version(share_entity)
+
+    getattr(service, method)(7, [3, 4])
+
+    after = versions(entity, users)
+    changed = {user_id for user_id in users if after[user_id] != before[user_id]}
+    assert changed == {1, 2, 3, 4}
+    assert QueryCache().version(share_entity) != shares_before
+
+@pytest.mark.parametrize("cls, method, entity, share_entity", SERVICES)
+def test_unchanged_share_list_invalidates_nothing(cls, method, entity, share_entity):
+    service = get_service(cls, {1: 1, 2: 0})
+    users = [1, 2]
+    before = versions(entity, users)
+    shares_before = QueryCache().version(share_entity)
+
+    getattr(service, method)(7, [2, "2"])
+
+    assert versions(entity, users) == before
+    assert QueryCache().version(share_entity) == shares_before
+
+@pytest.mark.parametrize("cls, method, entity, share_entity", SERVICES)
+def test_group_share_runs_one_block(cls, method, entity, share_entity):
+    service = get_service(cls, {1: 1})
+    entity_before = QueryCache().version(entity)
+
+    getattr(service, method)(7, user_group_id=3)
+
+    db = service.conn_instance.db
+    assert len(db.statements) == 1
+    assert "FOR UPDATE" in db.statements[0]
+    assert "NOT EXISTS" in db.statements[0]
+    assert QueryCache().version(entity) != entity_before
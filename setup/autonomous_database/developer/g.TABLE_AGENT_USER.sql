@@ -12,6 +12,12 @@
     );
     --
 
+    CREATE INDEX agent_user_user_idx ON agent_user (user_id, agent_id);
+    --
+
+    CREATE INDEX agent_user_agent_idx ON agent_user (agent_id, owner);
+    --
+
     CREATE SEQUENCE agent_user_id_seq START WITH 1 INCREMENT BY 1 NOCACHE;
     --
 
@@ -20,6 +20,9 @@
     );
     --
 
+    CREATE UNIQUE INDEX files_src_uk ON files (file_src_file_name, module_id, file_trg_pii);
+    --
+
     CREATE SEQUENCE file_id_seq START WITH 1 INCREMENT BY 1 NOCACHE;
     --
 
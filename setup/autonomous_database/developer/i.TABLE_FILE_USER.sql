@@ -12,6 +12,12 @@
     );
     --
 
+    CREATE INDEX file_user_user_idx ON file_user (user_id, file_id);
+    --
+
+    CREATE INDEX file_user_file_idx ON file_user (file_id, owner);
+    --
+
     CREATE SEQUENCE file_user_id_seq START WITH 1 INCREMENT BY 1 NOCACHE;
     --
 
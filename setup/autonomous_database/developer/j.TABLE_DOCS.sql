@@ -10,6 +10,9 @@
     );
     --
 
+    CREATE INDEX docs_file_id_idx ON docs(file_id);
+    --
+
     CREATE SEQUENCE doc_id_seq START WITH 1 INCREMENT BY 1 NOCACHE;
     --
 
@@ -1,58 +1,200 @@
     CREATE OR REPLACE PROCEDURE SP_VECTOR_STORE (
        p_file_id IN NUMBER
     ) AS
+        l_chunker VARCHAR2(100);
+        l_name    VARCHAR2(100);
+        l_by      VARCHAR2(20)  := 'characters';
+        l_split   VARCHAR2(20)  := 'recursively';
+        l_max     NUMBER;
+        l_overlap NUMBER;
+        l_params  VARCHAR2(200);
+        l_model   VARCHAR2(200) := 'e_m_b__m_o_d_e_l__i_d';
+        l_hits    NUMBER;
+        l_misses  NUMBER;
+        l_hashes  t_emb_cache_texts;
+        l_chunks  t_emb_cache_texts;
+        l_new     NUMBER;
     BEGIN
-        DELETE FROM DOCS WHERE FILE_ID = p_file_id;
-        COMMIT;
-        
-        INSERT INTO DOCS (FILE_ID, TEXT, METADATA, EMBEDDING)
-        SELECT
-            a.FILE_ID                  AS FILE_ID,
-            TO_CLOB(ct.chunk_data)     AS TEXT,
-            a.METADATA                 AS METADATA,
-            TO_VECTOR(et.embed_vector) AS EMBEDDING
-        FROM VW_DOCS_FILES a
-            CROSS JOIN dbms_vector_chain.utl_to_chunks(
-                a.TEXT,
-                json('{
-                    "by"        : "characters",
-                    "max"       : "512",
-                    "overlap"   : "51",
-                    "split"     : "recursively",
-                    "language"  : "'|| a.LANGUAGE ||'",
-                    "normalize" : "all"
-                }')
-            ) c
-            CROSS JOIN JSON_TABLE(
-                c.column_value, '$[*]'
-                COLUMNS (
-                    chunk_id     NUMBER         PATH '$.chunk_id',
-                    chunk_offset NUMBER         PATH '$.chunk_offset',
-                    chunk_length NUMBER         PATH '$.chunk_length',
-                    chunk_data   VARCHAR2(4000) PATH '$.chunk_data'
-                )
-            ) ct
-            CROSS JOIN dbms_vector_chain.utl_to_embeddings(
+        /* Chunker of the file module (MODULES.MODULE_CHUNKER): name:max:overlap */
+        SELECT NVL(MAX(m.MODULE_CHUNKER), 'characters:512:51')
+        INTO l_chunker
+        FROM FILES f
+        JOIN MODULES m
+            ON f.MODULE_ID = m.MODULE_ID
+        WHERE f.FILE_ID = p_file_id;
+
+        l_name    := LOWER(REGEXP_SUBSTR(l_chunker, '[^:]+', 1, 1));
+        l_max     := NVL(TO_NUMBER(REGEXP_SUBSTR(l_chunker, '[^:]+', 1, 2)), 512);
+        l_overlap := NVL(TO_NUMBER(REGEXP_SUBSTR(l_chunker, '[^:]+', 1, 3)), 0);
+        l_params  := 'database:' || l_chunker;
+
+        /* chunk_data is VARCHAR2(4000) bytes (STANDARD_HASH takes no CLOB): 1000 characters fit even at 4 bytes each */
+        l_max := LEAST(GREATEST(l_max, 50), 1000);
+
+        /* utl_to_chunks has no tokens: words instead; sentences, pages and SRT cues cut at their boundaries without overlap */
+        /* 300 words stay far below 4000 bytes in Spanish text; JSON_TABLE truncates the rare longer chunk instead of nulling it */
+        IF l_name <> 'characters' THEN
+            l_by      := 'words';
+            l_max     := LEAST(GREATEST(l_max, 10), 300);
+            l_split   := CASE l_name WHEN 'tokens' THEN 'recursively' WHEN 'srt' THEN 'blankline' ELSE 'sentence' END;
+            l_overlap := CASE l_name WHEN 'tokens' THEN LEAST(l_overlap, FLOOR(l_max / 5)) ELSE 0 END;
+        END IF;
+
+        /* Current chunks of the file, once per hash, with their offsets */
+        INSERT INTO docs_chunks_tmp (chunk_hash, chunk_data, chunk_offset, chunk_length)
+        SELECT chunk_hash, chunk_data, chunk_offset, chunk_length
+        FROM (
+            SELECT
+                RAWTOHEX(STANDARD_HASH(ct.chunk_data, 'SHA256')) AS chunk_hash,
                 ct.chunk_data,
-                json('{
-                    "provider"        : "ocigenai",
-                    "credential_name" : "c_r_e_d_e_n_t_i_a_l__n_a_m_e",
-                    "url"             : "e_m_b__m_o_d_e_l__u_r_l",
-                    "model"           : "e_m_b__m_o_d_e_l__i_d"
-                }')
-            ) e
-            CROSS JOIN JSON_TABLE(
-                e.column_value, '$[*]'
-                COLUMNS (
-                    embed_id     NUMBER         PATH '$.embed_id',
-                    embed_data   VARCHAR2(4000) PATH '$.embed_data',
-                    embed_vector CLOB           PATH '$.embed_vector'
+                ct.chunk_offset,
+                ct.chunk_length,
+                ROW_NUMBER() OVER (
+                    PARTITION BY STANDARD_HASH(ct.chunk_data, 'SHA256')
+                    ORDER BY ct.chunk_id
+                ) AS chunk_rn
+            FROM (
+                SELECT TEXT, LANGUAGE FROM VW_DOCS_FILES
+                WHERE FILE_ID = p_file_id
+                FETCH FIRST 1 ROWS ONLY
+            ) a
+                CROSS JOIN dbms_vector_chain.utl_to_chunks(
+                    a.TEXT,
+                    json('{
+                        "by"        : "'|| l_by ||'",
+                        "max"       : "'|| l_max ||'",
+                        "overlap"   : "'|| l_overlap ||'",
+                        "split"     : "'|| l_split ||'",
+                        "language"  : "'|| a.LANGUAGE ||'",
+                        "normalize" : "all"
+                    }')
+                ) c
+                CROSS JOIN JSON_TABLE(
+                    c.column_value, '$[*]'
+                    COLUMNS (
+                        chunk_id     NUMBER         PATH '$.chunk_id',
+                        chunk_offset NUMBER         PATH '$.chunk_offset',
+                        chunk_length NUMBER         PATH '$.chunk_length',
+                        chunk_data   VARCHAR2(4000) TRUNCATE PATH '$.chunk_data'
+                    )
+                ) ct
+        )
+        WHERE chunk_rn = 1;
+
+        /* Chunks that vanished, or were made with other chunk parameters */
+        DELETE FROM DOCS d
+        WHERE d.FILE_ID = p_file_id
+        AND (
+            d.CHUNK_PARAMS IS NULL
+            OR d.CHUNK_PARAMS <> l_params
+            OR d.CHUNK_HASH NOT IN (SELECT chunk_hash FROM docs_chunks_tmp)
+        );
+
+        /* Kept chunks whose metadata changed (moved offsets, renamed file...) get the new one; */
+        /* the file version and date are not stored per chunk, so a new version rewrites no other row */
+        MERGE INTO DOCS d
+        USING (
+            SELECT
+                t.chunk_hash,
+                JSON_MERGEPATCH(
+                    a.METADATA,
+                    JSON_OBJECT(
+                        'file_version' VALUE NULL,
+                        'file_date'    VALUE NULL,
+                        'chunk_start'  VALUE t.chunk_offset - 1,
+                        'chunk_end'    VALUE t.chunk_offset - 1 + t.chunk_length
+                        NULL ON NULL
+                    )
+                    RETURNING CLOB
+                ) AS metadata
+            FROM docs_chunks_tmp t
+            CROSS JOIN (
+                SELECT METADATA FROM VW_DOCS_FILES
+                WHERE FILE_ID = p_file_id
+                FETCH FIRST 1 ROWS ONLY
+            ) a
+        ) n
+        ON (d.FILE_ID = p_file_id AND d.CHUNK_HASH = n.chunk_hash)
+        WHEN MATCHED THEN UPDATE SET
+            d.METADATA = n.metadata
+        WHERE d.METADATA IS NULL
+        OR NOT JSON_EQUAL(d.METADATA, n.metadata);
+
+        DELETE FROM docs_chunks_tmp t
+        WHERE EXISTS (
+            SELECT 1 FROM DOCS d
+            WHERE d.FILE_ID = p_file_id
+            AND d.CHUNK_HASH = t.chunk_hash
+        );
+
+        /* New chunks already embedded by any file (embedding cache), touched in a transaction of their own */
+        SELECT t.chunk_hash
+        BULK COLLECT INTO l_hashes
+        FROM docs_chunks_tmp t;
+        l_new := l_hashes.COUNT;
+        SP_EMB_CACHE_TOUCH(l_model, l_hashes, l_hits);
+
+        /* Only the misses go to the embedding provider; EMB_CACHE is filled and committed apart from DOCS */
+        SELECT t.chunk_hash, t.chunk_data
+        BULK COLLECT INTO l_hashes, l_chunks
+        FROM docs_chunks_tmp t
+        WHERE NOT EXISTS (
+            SELECT 1 FROM emb_cache c
+            WHERE c.model_id = l_model
+            AND c.chunk_hash = t.chunk_hash
+        );
+        SP_EMB_CACHE_FILL(l_model, l_hashes, l_chunks, l_misses);
+
+        INSERT INTO DOCS (FILE_ID, TEXT, METADATA, EMBEDDING, CHUNK_HASH, CHUNK_PARAMS)
+        SELECT
+            a.FILE_ID,
+            TO_CLOB(t.chunk_data),
+            JSON_MERGEPATCH(
+                a.METADATA,
+                JSON_OBJECT(
+                    'file_version' VALUE NULL,
+                    'file_date'    VALUE NULL,
+                    'chunk_start'  VALUE t.chunk_offset - 1,
+                    'chunk_end'    VALUE t.chunk_offset - 1 + t.chunk_length
+                    NULL ON NULL
                 )
-            ) et
-        WHERE
-            a.FILE_ID = p_file_id;
+                RETURNING CLOB
+            ),
+            c.embedding,
+            t.chunk_hash,
+            l_params
+        FROM docs_chunks_tmp t
+        JOIN emb_cache c
+            ON c.model_id = l_model
+            AND c.chunk_hash = t.chunk_hash
+        CROSS JOIN (
+            SELECT FILE_ID, METADATA FROM VW_DOCS_FILES
+            WHERE FILE_ID = p_file_id
+            FETCH FIRST 1 ROWS ONLY
+        ) a;
+
+        /* A chunk evicted from EMB_CACHE between the fill and this insert would be missing from DOCS */
+        IF SQL%ROWCOUNT < l_new THEN
+            RAISE_APPLICATION_ERROR(
+                -20001,
+                'SP_VECTOR_STORE: ' || (l_new - SQL%ROWCOUNT) || ' chunks of file ' || p_file_id ||
+                ' were evicted from EMB_CACHE before reaching DOCS; run it again'
+            );
+        END IF;
+
+        /* New DOCS version: cached retrieval results of the file are stale */
+        UPDATE FILES SET
+            FILE_DOCS_VERSION = FILE_DOCS_VERSION + 1,
+            FILE_DOCS_CHUNKS  = (SELECT COUNT(1) FROM DOCS WHERE FILE_ID = p_file_id)
+        WHERE FILE_ID = p_file_id;
+
+        COMMIT;
+
+        /* Stats and eviction after the DOCS commit, in a short transaction */
+        SP_EMB_CACHE_STATS(l_model, l_hits, l_misses);
+        SP_EMB_CACHE_EVICT;
         COMMIT;
         
     END;
     /
-    --
\ No newline at end of file
+    --
@@ -0,0 +1,15 @@
+    CREATE TABLE user_purge (
+        user_id                  NUMBER NOT NULL,
+        user_username            VARCHAR2(250),
+        purge_stage              VARCHAR2(50) DEFAULT 'START' NOT NULL,
+        purge_docs               NUMBER DEFAULT 0 NOT NULL,
+        purge_files              NUMBER DEFAULT 0 NOT NULL,
+        purge_agents             NUMBER DEFAULT 0 NOT NULL,
+        purge_objects            CLOB,
+        purge_message            VARCHAR2(4000),
+        purge_state              NUMBER DEFAULT 1 NOT NULL,
+        purge_date               TIMESTAMP(6) DEFAULT SYSDATE NOT NULL,
+        CONSTRAINT pk_user_purge PRIMARY KEY (user_id)
+        ENABLE
+    );
+    --
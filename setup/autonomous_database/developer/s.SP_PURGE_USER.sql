@@ -0,0 +1,121 @@
+    CREATE OR REPLACE PROCEDURE SP_PURGE_USER (
+        p_user_id    IN NUMBER,
+        p_batch_size IN NUMBER DEFAULT 10000
+    ) AS
+        l_file_ids  SYS.ODCINUMBERLIST;
+        l_agent_ids SYS.ODCINUMBERLIST;
+        l_username  USERS.USER_USERNAME%TYPE;
+        l_objects   CLOB;
+        l_rows      NUMBER;
+        l_docs      NUMBER := 0;
+
+        PROCEDURE set_stage (p_stage IN VARCHAR2) IS
+        BEGIN
+            UPDATE USER_PURGE SET
+                PURGE_STAGE = p_stage,
+                PURGE_DOCS  = l_docs,
+                PURGE_DATE  = SYSDATE
+            WHERE USER_ID = p_user_id;
+            COMMIT;
+        END;
+    BEGIN
+        BEGIN
+            SELECT USER_USERNAME INTO l_username FROM USERS WHERE USER_ID = p_user_id;
+        EXCEPTION
+            WHEN NO_DATA_FOUND THEN
+                l_username := NULL;
+        END;
+
+        MERGE INTO USER_PURGE p
+        USING (SELECT p_user_id AS USER_ID FROM DUAL) s
+        ON (p.USER_ID = s.USER_ID)
+        WHEN MATCHED THEN UPDATE SET
+            p.PURGE_STATE   = 1,
+            p.PURGE_MESSAGE = NULL,
+            p.PURGE_DATE    = SYSDATE
+        WHEN NOT MATCHED THEN INSERT (USER_ID, USER_USERNAME, PURGE_STATE)
+            VALUES (s.USER_ID, l_username, 1);
+
+        UPDATE USERS SET USER_STATE = 0 WHERE USER_ID = p_user_id;
+        set_stage('USER');
+
+        SELECT fu.FILE_ID BULK COLLECT INTO l_file_ids
+        FROM FILE_USER fu
+        WHERE fu.USER_ID = p_user_id
+        AND NOT EXISTS (
+            SELECT 1 FROM FILE_USER x
+            WHERE x.FILE_ID = fu.FILE_ID AND x.USER_ID <> p_user_id
+        );
+
+        SELECT au.AGENT_ID BULK COLLECT INTO l_agent_ids
+        FROM AGENT_USER au
+        WHERE au.USER_ID = p_user_id
+        AND NOT EXISTS (
+            SELECT 1 FROM AGENT_USER x
+            WHERE x.AGENT_ID = au.AGENT_ID AND x.USER_ID <> p_user_id
+        );
+
+        /* Source objects and the bucket outputs (_trg, _trg_pii); table and index targets are not bucket objects */
+        SELECT JSON_ARRAYAGG(o.OBJ_NAME RETURNING CLOB) INTO l_objects
+        FROM (
+            SELECT f.FILE_SRC_FILE_NAME AS OBJ_NAME
+            FROM FILES f
+            WHERE f.FILE_ID IN (SELECT COLUMN_VALUE FROM TABLE(l_file_ids))
+            UNION
+            SELECT f.FILE_TRG_OBJ_NAME
+            FROM FILES f
+            WHERE f.FILE_ID IN (SELECT COLUMN_VALUE FROM TABLE(l_file_ids))
+            AND f.FILE_TRG_OBJ_NAME LIKE '%/o/%'
+        ) o
+        WHERE o.OBJ_NAME IS NOT NULL;
+
+        UPDATE USER_PURGE SET
+            PURGE_FILES   = l_file_ids.COUNT,
+            PURGE_AGENTS  = l_agent_ids.COUNT,
+            PURGE_OBJECTS = l_objects
+        WHERE USER_ID = p_user_id;
+        set_stage('DOCS');
+
+        FOR i IN 1 .. l_file_ids.COUNT LOOP
+            LOOP
+                DELETE FROM DOCS
+                WHERE FILE_ID = l_file_ids(i)
+                AND ROWNUM <= p_batch_size;
+
+                l_rows := SQL%ROWCOUNT;
+                l_docs := l_docs + l_rows;
+                set_stage('DOCS');
+                EXIT WHEN l_rows < p_batch_size;
+            END LOOP;
+        END LOOP;
+
+        DELETE FROM AGENT_USER WHERE USER_ID = p_user_id;
+
+        FORALL i IN 1 .. l_agent_ids.COUNT
+            DELETE FROM AGENTS WHERE AGENT_ID = l_agent_ids(i);
+
+        DELETE FROM FILE_USER WHERE USER_ID = p_user_id;
+
+        FORALL i IN 1 .. l_file_ids.COUNT
+            DELETE FROM FILES WHERE FILE_ID = l_file_ids(i);
+
+        DELETE FROM USERS WHERE USER_ID = p_user_id AND USER_STATE = 0;
+
+        UPDATE USER_PURGE SET
+            PURGE_STATE = 2
+        WHERE USER_ID = p_user_id;
+        set_stage('DATABASE');
+
+    EXCEPTION
+        WHEN OTHERS THEN
+            ROLLBACK;
+            UPDATE USER_PURGE SET
+                PURGE_STATE   = 0,
+                PURGE_MESSAGE = SUBSTR(SQLERRM, 1, 4000),
+                PURGE_DATE    = SYSDATE
+            WHERE USER_ID = p_user_id;
+            COMMIT;
+            RAISE;
+    END;
+    /
+    --
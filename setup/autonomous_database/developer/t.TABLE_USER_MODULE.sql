@@ -0,0 +1,25 @@
+    CREATE TABLE user_module (
+        user_id               NUMBER NOT NULL,
+        module_id             NUMBER NOT NULL,
+        CONSTRAINT pk_user_module        PRIMARY KEY (user_id, module_id),
+        CONSTRAINT fk_user_module_users   FOREIGN KEY (user_id) REFERENCES users(user_id) ON DELETE CASCADE,
+        CONSTRAINT fk_user_module_modules FOREIGN KEY (module_id) REFERENCES modules(module_id)
+        ENABLE
+    ) ORGANIZATION INDEX;
+    --
+
+    CREATE INDEX user_module_module_idx ON user_module (module_id, user_id);
+    --
+
+    INSERT INTO user_module (user_id, module_id)
+    SELECT DISTINCT u.user_id, m.module_id
+    FROM users u
+    CROSS APPLY JSON_TABLE(
+        TO_CHAR(u.user_modules),
+        '$[*]' COLUMNS (
+            module_id NUMBER PATH '$'
+        )
+    ) jt
+    JOIN modules m
+    ON m.module_id = jt.module_id;
+    --
@@ -0,0 +1,11 @@
+    ALTER TABLE docs ADD (
+        chunk_hash   VARCHAR2(64),
+        chunk_params VARCHAR2(200)
+    );
+    --
+
+    CREATE INDEX docs_file_chunk_idx ON docs (file_id, chunk_hash);
+    --
+
+    ALTER PROCEDURE SP_VECTOR_STORE COMPILE;
+    --
@@ -0,0 +1,147 @@
+    CREATE TABLE emb_cache (
+        model_id     VARCHAR2(200),
+        chunk_hash   VARCHAR2(64),
+        embedding    VECTOR NOT NULL,
+        hits         NUMBER    DEFAULT 0,
+        created_at   TIMESTAMP DEFAULT SYSTIMESTAMP,
+        last_used_at TIMESTAMP DEFAULT SYSTIMESTAMP,
+        CONSTRAINT pk_emb_cache PRIMARY KEY (model_id, chunk_hash)
+    );
+    --
+
+    CREATE INDEX emb_cache_used_idx ON emb_cache (last_used_at);
+    --
+
+    CREATE TABLE emb_cache_stats (
+        model_id   VARCHAR2(200),
+        hits       NUMBER DEFAULT 0,
+        misses     NUMBER DEFAULT 0,
+        evictions  NUMBER DEFAULT 0,
+        updated_at TIMESTAMP DEFAULT SYSTIMESTAMP,
+        CONSTRAINT pk_emb_cache_stats PRIMARY KEY (model_id)
+    );
+    --
+
+    CREATE GLOBAL TEMPORARY TABLE docs_chunks_tmp (
+        chunk_hash VARCHAR2(64),
+        chunk_data VARCHAR2(4000)
+    ) ON COMMIT DELETE ROWS;
+    --
+
+    CREATE OR REPLACE PROCEDURE SP_EMB_CACHE_STATS (
+        p_model_id IN VARCHAR2,
+        p_hits     IN NUMBER,
+        p_misses   IN NUMBER
+    ) AS
+    BEGIN
+        MERGE INTO emb_cache_stats s
+        USING (SELECT p_model_id AS model_id FROM dual) m
+        ON (s.model_id = m.model_id)
+        WHEN MATCHED THEN UPDATE SET
+            s.hits       = s.hits + p_hits,
+            s.misses     = s.misses + p_misses,
+            s.updated_at = SYSTIMESTAMP
+        WHEN NOT MATCHED THEN INSERT (model_id, hits, misses)
+            VALUES (m.model_id, p_hits, p_misses);
+    END;
+    /
+    --
+
+    CREATE OR REPLACE TYPE t_emb_cache_texts AS TABLE OF VARCHAR2(4000);
+    --
+
+    CREATE OR REPLACE PROCEDURE SP_EMB_CACHE_EVICT (
+        p_max_rows IN NUMBER DEFAULT e_m_b__c_a_c_h_e__m_a_x__r_o_w_s
+    ) AS
+        l_models t_emb_cache_texts;
+        l_rows   NUMBER;
+    BEGIN
+        SELECT COUNT(1) INTO l_rows FROM emb_cache;
+        IF l_rows <= p_max_rows THEN
+            RETURN;
+        END IF;
+
+        /* Least recently used first */
+        DELETE FROM emb_cache
+        WHERE ROWID IN (
+            SELECT ROWID FROM emb_cache
+            ORDER BY last_used_at
+            FETCH FIRST (l_rows - p_max_rows) ROWS ONLY
+        )
+        RETURNING model_id BULK COLLECT INTO l_models;
+
+        /* One update per model with its total, not one per evicted row */
+        MERGE INTO emb_cache_stats s
+        USING (
+            SELECT COLUMN_VALUE AS model_id, COUNT(1) AS evictions
+            FROM TABLE(l_models)
+            GROUP BY COLUMN_VALUE
+        ) e
+        ON (s.model_id = e.model_id)
+        WHEN MATCHED THEN UPDATE SET
+            s.evictions  = s.evictions + e.evictions,
+            s.updated_at = SYSTIMESTAMP;
+    END;
+    /
+    --
+
+    CREATE OR REPLACE PROCEDURE SP_EMB_CACHE_TOUCH (
+        p_model_id IN  VARCHAR2,
+        p_hashes   IN  t_emb_cache_texts,
+        p_hits     OUT NUMBER
+    ) AS
+        /* Own transaction: the shared EMB_CACHE rows are not locked by the DOCS transaction of SP_VECTOR_STORE */
+        PRAGMA AUTONOMOUS_TRANSACTION;
+    BEGIN
+        UPDATE emb_cache c SET
+            c.hits         = c.hits + 1,
+            c.last_used_at = SYSTIMESTAMP
+        WHERE c.model_id = p_model_id
+        AND c.chunk_hash IN (SELECT COLUMN_VALUE FROM TABLE(p_hashes));
+        p_hits := SQL%ROWCOUNT;
+        COMMIT;
+    EXCEPTION
+        WHEN OTHERS THEN
+            ROLLBACK;
+            RAISE;
+    END;
+    /
+    --
+
+    CREATE OR REPLACE PROCEDURE SP_EMB_CACHE_FILL (
+        p_model_id IN  VARCHAR2,
+        p_hashes   IN  t_emb_cache_texts,
+        p_chunks   IN  t_emb_cache_texts,
+        p_misses   OUT NUMBER
+    ) AS
+        /* Own transaction, as SP_EMB_CACHE_TOUCH */
+        PRAGMA AUTONOMOUS_TRANSACTION;
+    BEGIN
+        FORALL i IN 1 .. p_hashes.COUNT
+            INSERT /*+ IGNORE_ROW_ON_DUPKEY_INDEX(emb_cache, pk_emb_cache) */
+            INTO emb_cache (model_id, chunk_hash, embedding)
+            VALUES (
+                p_model_id,
+                p_hashes(i),
+                dbms_vector_chain.utl_to_embedding(
+                    p_chunks(i),
+                    json('{
+                        "provider"        : "ocigenai",
+                        "credential_name" : "c_r_e_d_e_n_t_i_a_l__n_a_m_e",
+                        "url"             : "e_m_b__m_o_d_e_l__u_r_l",
+                        "model"           : "e_m_b__m_o_d_e_l__i_d"
+                    }')
+                )
+            );
+        p_misses := SQL%ROWCOUNT;
+        COMMIT;
+    EXCEPTION
+        WHEN OTHERS THEN
+            ROLLBACK;
+            RAISE;
+    END;
+    /
+    --
+
+    ALTER PROCEDURE SP_VECTOR_STORE COMPILE;
+    --
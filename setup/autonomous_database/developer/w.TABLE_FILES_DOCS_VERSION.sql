@@ -0,0 +1,7 @@
+    ALTER TABLE files ADD (
+        file_docs_version NUMBER DEFAULT 0 NOT NULL
+    );
+    --
+
+    ALTER PROCEDURE SP_VECTOR_STORE COMPILE;
+    --
@@ -0,0 +1,12 @@
+    ALTER TABLE files ADD (
+        file_docs_chunks NUMBER DEFAULT 0 NOT NULL
+    );
+    --
+
+    UPDATE files f SET
+        f.file_docs_chunks = (SELECT COUNT(1) FROM docs d WHERE d.file_id = f.file_id)
+    WHERE EXISTS (SELECT 1 FROM docs d WHERE d.file_id = f.file_id);
+    --
+
+    ALTER PROCEDURE SP_VECTOR_STORE COMPILE;
+    --
@@ -0,0 +1,25 @@
+    ALTER TABLE modules ADD (
+        module_chunker VARCHAR2(100)
+    );
+    --
+
+    UPDATE modules SET module_chunker = 'page:512:1' WHERE module_id = 3;
+    --
+
+    UPDATE modules SET module_chunker = 'srt:256:1' WHERE module_id = 4;
+    --
+
+    UPDATE modules SET module_chunker = 'sentence:256:1' WHERE module_id IN (5, 6);
+    --
+
+    UPDATE modules SET module_chunker = 'tokens:256:32' WHERE module_id = 7;
+    --
+
+    ALTER TABLE docs_chunks_tmp ADD (
+        chunk_offset NUMBER,
+        chunk_length NUMBER
+    );
+    --
+
+    ALTER PROCEDURE SP_VECTOR_STORE COMPILE;
+    --
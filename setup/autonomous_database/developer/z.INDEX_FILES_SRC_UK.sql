@@ -0,0 +1,52 @@
+    DECLARE
+        l_file_ids SYS.ODCINUMBERLIST;
+        l_keep_ids SYS.ODCINUMBERLIST;
+    BEGIN
+        /* Duplicated files (same name, module and pii): the highest version is kept */
+        SELECT file_id, keep_id
+        BULK COLLECT INTO l_file_ids, l_keep_ids
+        FROM (
+            SELECT
+                file_id,
+                FIRST_VALUE(file_id) OVER (
+                    PARTITION BY file_src_file_name, module_id, file_trg_pii
+                    ORDER BY file_version DESC, file_date DESC, file_id DESC
+                ) AS keep_id
+            FROM files
+        )
+        WHERE file_id <> keep_id;
+
+        /* Their users are linked to the kept file, once */
+        FORALL i IN 1 .. l_file_ids.COUNT
+            UPDATE file_user fu SET
+                fu.file_id = l_keep_ids(i)
+            WHERE fu.file_id = l_file_ids(i)
+            AND NOT EXISTS (
+                SELECT 1 FROM file_user x
+                WHERE x.file_id = l_keep_ids(i)
+                AND x.user_id = fu.user_id
+            );
+
+        FORALL i IN 1 .. l_file_ids.COUNT
+            DELETE FROM file_user WHERE file_id = l_file_ids(i);
+
+        FORALL i IN 1 .. l_file_ids.COUNT
+            DELETE FROM docs WHERE file_id = l_file_ids(i);
+
+        FORALL i IN 1 .. l_file_ids.COUNT
+            DELETE FROM files WHERE file_id = l_file_ids(i);
+    END;
+    /
+    --
+
+    BEGIN
+        EXECUTE IMMEDIATE 'CREATE UNIQUE INDEX files_src_uk ON files (file_src_file_name, module_id, file_trg_pii)';
+    EXCEPTION
+        WHEN OTHERS THEN
+            /* ORA-00955: already created by h.TABLE_FILES.sql, ORA-01408: columns already indexed */
+            IF SQLCODE NOT IN (-955, -1408) THEN
+                RAISE;
+            END IF;
+    END;
+    /
+    --
@@ -0,0 +1,24 @@
+    DECLARE
+        /* Created with their tables in g., i. and j.; this adds them to installs that predate them */
+        l_ddl SYS.ODCIVARCHAR2LIST := SYS.ODCIVARCHAR2LIST(
+            'CREATE INDEX agent_user_user_idx ON agent_user (user_id, agent_id)',
+            'CREATE INDEX agent_user_agent_idx ON agent_user (agent_id, owner)',
+            'CREATE INDEX file_user_user_idx ON file_user (user_id, file_id)',
+            'CREATE INDEX file_user_file_idx ON file_user (file_id, owner)',
+            'CREATE INDEX docs_file_id_idx ON docs (file_id)'
+        );
+    BEGIN
+        FOR i IN 1 .. l_ddl.COUNT LOOP
+            BEGIN
+                EXECUTE IMMEDIATE l_ddl(i);
+            EXCEPTION
+                WHEN OTHERS THEN
+                    /* ORA-00955: already created, ORA-01408: columns already indexed */
+                    IF SQLCODE NOT IN (-955, -1408) THEN
+                        RAISE;
+                    END IF;
+            END;
+        END LOOP;
+    END;
+    /
+    --
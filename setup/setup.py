@@ -100,6 +100,7 @@ def exec(user, file_name, message):
     con_gen_ai_service_endpoint = os.getenv('CON_GEN_AI_SERVICE_ENDPOINT')
     con_gen_ai_emb_model_url    = os.getenv('CON_GEN_AI_EMB_MODEL_URL')
     con_gen_ai_emb_model_id     = os.getenv('CON_GEN_AI_EMB_MODEL_ID')
+    con_emb_cache_max_rows      = os.getenv('CON_EMB_CACHE_MAX_ROWS', '1000000')
 
     # Leer el archivo SQL
     with open(os.path.join(file_path, 'autonomous_database', user, file_name), 'r') as file:
@@ -120,6 +121,9 @@ def exec(user, file_name, message):
     # .\autonomous_database\developer\j.SP_VECTOR_STORE.sql
     query = query.replace('e_m_b__m_o_d_e_l__u_r_l', con_gen_ai_emb_model_url)
     query = query.replace('e_m_b__m_o_d_e_l__i_d', con_gen_ai_emb_model_id)
+
+    # .\autonomous_database\developer\v.TABLE_EMB_CACHE.sql
+    query = query.replace('e_m_b__c_a_c_h_e__m_a_x__r_o_w_s', con_emb_cache_max_rows)
     
     # .\autonomous_database\developer\g.SP_SEL_AI_PROFILE.sql
     query = query.replace('r_e_g_i_o_n', con_gen_ai_region)
@@ -287,6 +291,36 @@ def main():
 
     exec('developer', 'q.SP_VECTOR_STORE.sql',
         '[OK][Q] CREATE PROCEDURE VECTOS STORRE.......................[ CREATE_VIEW ]')
+
+    exec('developer', 'r.TABLE_USER_PURGE.sql',
+        '[OK][R] CREATE TABLE USER_PURGE.............................[ CREATE_TABLE ]')
+
+    exec('developer', 's.SP_PURGE_USER.sql',
+        '[OK][S] CREATE PROCEDURE PURGE USER.....................[ CREATE_PROCEDURE ]')
+
+    exec('developer', 't.TABLE_USER_MODULE.sql',
+        '[OK][T] CREATE TABLE USER_MODULE............................[ CREATE_TABLE ]')
+
+    exec('developer', 'u.TABLE_DOCS_CHUNK_HASH.sql',
+        '[OK][U] ALTER TABLE DOCS CHUNK HASH..........................[ ALTER_TABLE ]')
+
+    exec('developer', 'v.TABLE_EMB_CACHE.sql',
+        '[OK][V] CREATE TABLE EMB_CACHE..............................[ CREATE_TABLE ]')
+
+    exec('developer', 'w.TABLE_FILES_DOCS_VERSION.sql',
+        '[OK][W] ALTER TABLE FILES DOCS VERSION.......................[ ALTER_TABLE ]')
+
+    exec('developer', 'x.TABLE_FILES_DOCS_CHUNKS.sql',
+        '[OK][X] ALTER TABLE FILES DOCS CHUNKS........................[ ALTER_TABLE ]')
+
+    exec('developer', 'y.TABLE_MODULES_CHUNKER.sql',
+        '[OK][Y] ALTER TABLE MODULES CHUNKER..........................[ ALTER_TABLE ]')
+
+    exec('developer', 'z.INDEX_FILES_SRC_UK.sql',
+        '[OK][Z] CREATE UNIQUE INDEX FILES SRC........................[ CREATE_INDEX ]')
+
+    exec('developer', 'za.INDEX_DOCS_SHARES.sql',
+        '[OK][ZA] CREATE INDEX DOCS AND SHARES........................[ CREATE_INDEX ]')
     
 
     # Copiar .streamlit (Windows: C:\Users\<usuario>\.streamlit, mac: /Users/<usuario>/.streamlit)
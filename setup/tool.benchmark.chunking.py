@@ -0,0 +1,110 @@
+import os
+import re
+import sys
+import math
+import random
+import numpy as np
+from dotenv import load_dotenv
+
+# Cambiar al directorio `app/`
+os.chdir(os.path.normpath(os.path.abspath(os.path.join(os.getcwd(), "..", "app"))))
+print(f"[INFO] Directorio actual: {os.getcwd()}")
+
+# Cargar variables de entorno desde .env en `app/`
+env_path = os.path.join(os.getcwd(), ".env")
+load_dotenv(dotenv_path=env_path)
+sys.path.insert(0, os.getcwd())
+
+from services.database.chunker import get_chunker, count_tokens, SENTENCE_RE
+from services.database.embedding import get_embedding_backend
+from services.database.vector_ingest import EMB_BATCH_SIZE
+
+# Corpus: extracciones de archivos (BENCH_FILE_IDS=12,15) y/o archivos locales (BENCH_PATHS=a.srt,b.txt)
+file_ids = [int(file_id) for file_id in os.getenv('BENCH_FILE_IDS', '').split(',') if file_id.strip()]
+paths    = [path for path in os.getenv('BENCH_PATHS', '').split(',') if path.strip()]
+
+# Estrategias a comparar (MODULES.MODULE_CHUNKER)
+chunkers = os.getenv('BENCH_CHUNKERS', 'characters:512:51,tokens:256:32,sentence:256:1,page:512:1,srt:256:1').split(',')
+
+# Embeddings de la recuperación: local (sin llamadas) u oci
+backend  = get_embedding_backend(os.getenv('BENCH_BACKEND', 'local'))
+queries  = int(os.getenv('BENCH_QUERIES', 100))
+top_k    = int(os.getenv('BENCH_TOP_K', 5))
+drop     = float(os.getenv('BENCH_DROP_WORDS', 0.3))
+rng      = random.Random(42)
+
+def load_corpora():
+    """
+    Returns the texts to chunk as {name: text}.
+    """
+    corpora = {}
+    if file_ids:
+        from services.database.connection import Connection
+        with Connection().acquire() as conn, conn.cursor() as cur:
+            for file_id in file_ids:
+                cur.execute("""
+                    SELECT FILE_SRC_FILE_NAME, FILE_TRG_EXTRACTION FROM FILES WHERE FILE_ID = :file_id
+                """, {"file_id": file_id})
+                row = cur.fetchone()
+                if row and row[1]:
+                    corpora[f"{file_id}:{row[0]}"] = row[1]
+    for path in paths:
+        with open(path, "r", encoding="utf-8") as file:
+            corpora[os.path.basename(path)] = file.read()
+    return corpora
+
+def sample_queries(text):
+    """
+    Sentences of the text with some words dropped (a paraphrase stand-in),
+    each with the offset of the sentence: the chunks covering it are relevant.
+    """
+    # Frases con al menos 6 palabras (no índices ni tiempos de SRT)
+    sentences = [m for m in SENTENCE_RE.finditer(text) if len(re.findall(r"[^\W\d_]{2,}", m.group())) >= 6]
+    samples   = []
+    for m in rng.sample(sentences, min(queries, len(sentences))):
+        words = m.group().split()
+        kept  = [word for word in words if rng.random() >= drop] or words
+        samples.append((" ".join(kept), m.start(), m.end()))
+    return samples
+
+def embed(texts):
+    vectors = []
+    for i in range(0, len(texts), EMB_BATCH_SIZE):
+        vectors.extend(backend.embed_documents(texts[i:i + EMB_BATCH_SIZE]))
+    return np.asarray(vectors, dtype=np.float32)
+
+def evaluate(text, chunks, samples):
+    """
+    Returns recall@k (a chunk covering the sentence is in the top k) and MRR.
+    """
+    chunk_vectors = embed([chunk.text for chunk in chunks])
+    query_vectors = embed([query for query, _, _ in samples])
+    hits, reciprocal = 0, 0.0
+    for vector, (_, start, end) in zip(query_vectors, samples):
+        ranking = np.argsort(-(chunk_vectors @ vector))[:top_k]
+        for rank, i in enumerate(ranking, start=1):
+            if chunks[i].start <= start and end <= chunks[i].end + 1:
+                hits += 1
+                reciprocal += 1 / rank
+                break
+    return hits / len(samples), reciprocal / len(samples)
+
+corpora = load_corpora()
+if not corpora:
+    print("[WARN] No corpus: set BENCH_FILE_IDS and/or BENCH_PATHS.")
+
+for name, text in corpora.items():
+    samples = sample_queries(text)
+    print(f"[INFO] {name}: {len(text)} caracteres, {count_tokens(text)} tokens, {len(samples)} consultas, top {top_k}")
+    for spec in chunkers:
+        chunker = get_chunker(spec)
+        chunks  = chunker.split(text)
+        if not chunks:
+            continue
+        tokens  = [count_tokens(chunk.text) for chunk in chunks]
+        calls   = math.ceil(len(chunks) / EMB_BATCH_SIZE)
+        recall, mrr = evaluate(text, chunks, samples) if samples else (0.0, 0.0)
+        print(
+            f"  {chunker.spec:<20} {len(chunks):>7} chunks  {np.mean(tokens):>7.1f} tokens/chunk  "
+            f"{max(tokens):>5} max  {calls:>5} embedding calls  recall@{top_k} {recall:6.3f}  MRR {mrr:6.3f}"
+        )
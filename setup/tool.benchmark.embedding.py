@@ -0,0 +1,131 @@
+import os
+import sys
+import time
+from dotenv import load_dotenv
+
+# Cambiar al directorio `app/`
+os.chdir(os.path.normpath(os.path.abspath(os.path.join(os.getcwd(), "..", "app"))))
+print(f"[INFO] Directorio actual: {os.getcwd()}")
+
+# Cargar variables de entorno desde .env en `app/`
+env_path = os.path.join(os.getcwd(), ".env")
+load_dotenv(dotenv_path=env_path)
+sys.path.insert(0, os.getcwd())
+
+from services.database.connection import Connection
+from services.database.docs import DocService
+from services.database.files import FileService
+from services.database.embedding import get_embedding_backend
+from services.database.vector_ingest import VectorIngest
+from services.database.embedding_cache import EmbeddingCache
+
+# Tamaños del texto a vectorizar (KB); se puede cambiar con BENCH_SIZES_KB=10,100
+sizes_kb = [int(size) for size in os.getenv('BENCH_SIZES_KB', '10,100,500').split(',')]
+
+# Motores a comparar: procedure (SP_VECTOR_STORE) y backends de Python (oci, local)
+engines = os.getenv('BENCH_ENGINES', 'procedure,oci,local').split(',')
+
+# Combinaciones de lote y concurrencia para el motor de Python
+batch_sizes   = [int(size) for size in os.getenv('BENCH_BATCH_SIZES', '96').split(',')]
+concurrencies = [int(size) for size in os.getenv('BENCH_CONCURRENCY', '1,4').split(',')]
+
+conn_instance = Connection()
+doc_service   = DocService()
+file_service  = FileService()
+
+def count_docs(file_id):
+    df = conn_instance.read_df("SELECT COUNT(1) AS N FROM DOCS WHERE FILE_ID = :file_id", params={"file_id": file_id})
+    return int(df["N"].iloc[0])
+
+def clear_docs(file_id, cache=True):
+    with conn_instance.acquire() as conn, conn.cursor() as cur:
+        # Sin los embeddings en EMB_CACHE, cada corrida vuelve a llamar al proveedor
+        if cache:
+            cur.execute("""
+                DELETE FROM EMB_CACHE
+                WHERE CHUNK_HASH IN (SELECT CHUNK_HASH FROM DOCS WHERE FILE_ID = :file_id)
+            """, {"file_id": file_id})
+        cur.execute("DELETE FROM DOCS WHERE FILE_ID = :file_id", {"file_id": file_id})
+        conn.commit()
+
+def report(label, size, chunks, elapsed, calls=None):
+    calls = "" if calls is None else f"{calls:>6} calls"
+    print(f"  {label:<28} {elapsed:>9.3f} s  {chunks:>7} chunks  {chunks / elapsed:>9.1f} chunks/s  {size / 1024 / elapsed:>8.1f} KB/s  {calls}")
+
+# Registro temporal en FILES (módulo con vector store) para las pruebas
+with conn_instance.acquire() as conn, conn.cursor() as cur:
+    cur.execute("SELECT MIN(MODULE_ID) FROM MODULES WHERE MODULE_VECTOR_STORE = 1")
+    module_id = cur.fetchone()[0]
+    file_id_var = cur.var(int)
+    # FILE_TRG_LANGUAGE es un código NLS de 3 letras como máximo (utils.constants.language_map)
+    cur.execute("""
+        INSERT INTO FILES (MODULE_ID, FILE_SRC_FILE_NAME, FILE_DESCRIPTION, FILE_TRG_LANGUAGE, FILE_STATE)
+        VALUES (:module_id, 'benchmark_embedding.txt', 'Benchmark vector store', 'gb', 1)
+        RETURNING FILE_ID INTO :file_id
+    """, {"module_id": module_id, "file_id": file_id_var})
+    file_id = file_id_var.getvalue()[0]
+    cur.execute("INSERT INTO FILE_USER (FILE_ID, USER_ID, OWNER) VALUES (:file_id, 0, 1)", {"file_id": file_id})
+    conn.commit()
+
+try:
+    for size_kb in sizes_kb:
+        size = size_kb * 1024
+        # Frases distintas: los chunks repetidos se guardan una sola vez
+        text = " ".join(f"Oracle AI Accelerator benchmark sentence number {i}." for i in range(size // 40 + 1))[:size]
+        # Nueva versión con el último 10% cambiado: solo se embeben los chunks nuevos
+        changed = text[:size * 9 // 10] + text[size * 9 // 10:].upper()
+        file_service.update_extraction(file_id, text)
+        print(f"[INFO] Vector store de {size_kb} KB")
+
+        for engine in engines:
+            if engine == "procedure":
+                clear_docs(file_id)
+                start = time.perf_counter()
+                doc_service.vector_store_procedure(file_id)
+                report("procedure", size, count_docs(file_id), time.perf_counter() - start)
+
+                file_service.update_extraction(file_id, changed)
+                start = time.perf_counter()
+                doc_service.vector_store_procedure(file_id)
+                report("procedure incremental", size, count_docs(file_id), time.perf_counter() - start)
+                file_service.update_extraction(file_id, text)
+
+                # Mismo texto en otro archivo: todos los chunks salen de EMB_CACHE
+                clear_docs(file_id, cache=False)
+                start = time.perf_counter()
+                doc_service.vector_store_procedure(file_id)
+                report("procedure cached", size, count_docs(file_id), time.perf_counter() - start)
+                continue
+
+            backend = get_embedding_backend(engine)
+            for batch_size in batch_sizes:
+                for concurrency in concurrencies:
+                    clear_docs(file_id)
+                    stats = VectorIngest(backend, batch_size, concurrency).vector_store(file_id)
+                    report(f"{engine} b={batch_size} c={concurrency}", size, stats["chunks"], stats["seconds"], stats["embedding_calls"])
+
+            file_service.update_extraction(file_id, changed)
+            stats = VectorIngest(backend).vector_store(file_id)
+            report(f"{engine} incremental", size, stats["new"], stats["seconds"], stats["embedding_calls"])
+            print(f"  {'':<28} new {stats['new']}, kept {stats['kept']}, deleted {stats['deleted']}")
+            file_service.update_extraction(file_id, text)
+
+            clear_docs(file_id, cache=False)
+            stats = VectorIngest(backend).vector_store(file_id)
+            report(f"{engine} cached", size, stats["chunks"], stats["seconds"], stats["embedding_calls"])
+            print(f"  {'':<28} cache hits {stats['cache_hits']}, misses {stats['cache_misses']}")
+
+    print("[INFO] EMB_CACHE")
+    print(EmbeddingCache().get_stats().to_string(index=False))
+
+finally:
+    with conn_instance.acquire() as conn, conn.cursor() as cur:
+        cur.execute("""
+            DELETE FROM EMB_CACHE
+            WHERE CHUNK_HASH IN (SELECT CHUNK_HASH FROM DOCS WHERE FILE_ID = :file_id)
+        """, {"file_id": file_id})
+        cur.execute("DELETE FROM DOCS WHERE FILE_ID = :file_id", {"file_id": file_id})
+        cur.execute("DELETE FROM FILE_USER WHERE FILE_ID = :file_id", {"file_id": file_id})
+        cur.execute("DELETE FROM FILES WHERE FILE_ID = :file_id", {"file_id": file_id})
+        conn.commit()
+    conn_instance.close_connection()
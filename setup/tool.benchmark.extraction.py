@@ -0,0 +1,90 @@
+import os
+import io
+import sys
+import time
+from dotenv import load_dotenv
+
+# Cambiar al directorio `app/`
+os.chdir(os.path.normpath(os.path.abspath(os.path.join(os.getcwd(), "..", "app"))))
+print(f"[INFO] Directorio actual: {os.getcwd()}")
+
+# Cargar variables de entorno desde .env en `app/`
+env_path = os.path.join(os.getcwd(), ".env")
+load_dotenv(dotenv_path=env_path)
+sys.path.insert(0, os.getcwd())
+
+from services.database.connection import Connection
+from services.database.files import FileService
+
+# Tamaños de extracción a comparar (KB); se puede cambiar con BENCH_SIZES_KB=10,100,1024
+sizes_kb = [int(size) for size in os.getenv('BENCH_SIZES_KB', '10,100,1024,10240,51200').split(',')]
+
+# El método anterior es cuadrático: solo se mide hasta este tamaño (KB)
+legacy_max_kb = int(os.getenv('BENCH_LEGACY_MAX_KB', 2048))
+
+conn_instance = Connection()
+file_service  = FileService()
+
+def legacy_update_extraction(file_id, text):
+    # Método anterior: CONCAT de 4.000 caracteres y commit por bloque
+    with conn_instance.acquire() as conn:
+        for i in range(0, len(text), 4000):
+            with conn.cursor() as cur:
+                cur.execute("""
+                    UPDATE FILES SET
+                        FILE_TRG_EXTRACTION = CONCAT(FILE_TRG_EXTRACTION, :chunk)
+                    WHERE FILE_ID = :file_id
+                """, {"chunk": text[i:i + 4000], "file_id": file_id})
+            conn.commit()
+
+def reset_extraction(file_id):
+    with conn_instance.acquire() as conn, conn.cursor() as cur:
+        cur.execute("UPDATE FILES SET FILE_TRG_EXTRACTION = NULL WHERE FILE_ID = :file_id", {"file_id": file_id})
+        conn.commit()
+
+def check_extraction(file_id, size):
+    df = conn_instance.read_df(
+        "SELECT DBMS_LOB.GETLENGTH(FILE_TRG_EXTRACTION) AS LEN FROM FILES WHERE FILE_ID = :file_id",
+        params={"file_id": file_id}
+    )
+    return int(df["LEN"].iloc[0]) == size
+
+def timed(label, size, func):
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+    print(f"  {label:<14} {elapsed:>9.3f} s  {size / 1024 / 1024 / elapsed:>8.2f} MB/s")
+
+# Registro temporal en FILES para las pruebas
+with conn_instance.acquire() as conn, conn.cursor() as cur:
+    file_id_var = cur.var(int)
+    cur.execute("""
+        INSERT INTO FILES (MODULE_ID, FILE_SRC_FILE_NAME, FILE_DESCRIPTION, FILE_STATE)
+        VALUES (0, 'benchmark_extraction.txt', 'Benchmark update_extraction', 0)
+        RETURNING FILE_ID INTO :file_id
+    """, {"file_id": file_id_var})
+    conn.commit()
+    file_id = file_id_var.getvalue()[0]
+
+try:
+    for size_kb in sizes_kb:
+        size = size_kb * 1024
+        text = ("Lorem ipsum dolor sit amet, consectetur adipiscing elit. ñ€\n" * (size // 60 + 1))[:size]
+        print(f"[INFO] Extracción de {size_kb} KB")
+
+        if size_kb <= legacy_max_kb:
+            reset_extraction(file_id)
+            timed("legacy", size, lambda: legacy_update_extraction(file_id, text))
+
+        reset_extraction(file_id)
+        timed("single bind", size, lambda: file_service.update_extraction(file_id, text))
+        print(f"  {'ok':<14} {check_extraction(file_id, size)}")
+
+        timed("stream", size, lambda: file_service.update_extraction(file_id, io.StringIO(text)))
+        print(f"  {'ok':<14} {check_extraction(file_id, size)}")
+
+finally:
+    with conn_instance.acquire() as conn, conn.cursor() as cur:
+        cur.execute("DELETE FROM FILES WHERE FILE_ID = :file_id", {"file_id": file_id})
+        conn.commit()
+    conn_instance.close_connection()
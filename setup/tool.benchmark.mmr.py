@@ -0,0 +1,116 @@
+import os
+import sys
+import time
+import array
+import numpy as np
+from dotenv import load_dotenv
+
+# Cambiar al directorio `app/`
+os.chdir(os.path.normpath(os.path.abspath(os.path.join(os.getcwd(), "..", "app"))))
+print(f"[INFO] Directorio actual: {os.getcwd()}")
+
+# Cargar variables de entorno desde .env en `app/`
+env_path = os.path.join(os.getcwd(), ".env")
+load_dotenv(dotenv_path=env_path)
+sys.path.insert(0, os.getcwd())
+
+from langchain_community.vectorstores.utils import maximal_marginal_relevance as langchain_mmr
+from services.database.docs_retriever import maximal_marginal_relevance, to_matrix, get_binds
+
+# Candidatos (fetch_k) y resultados (k) a comparar
+fetch_ks    = [int(fetch_k) for fetch_k in os.getenv('BENCH_FETCH_K', '20,50,200,500,1000').split(',')]
+top_k       = int(os.getenv('BENCH_TOP_K', 10))
+dimensions  = int(os.getenv('BENCH_DIMENSIONS', 1024))
+repeats     = int(os.getenv('BENCH_REPEATS', 20))
+lambda_mult = float(os.getenv('BENCH_LAMBDA_MULT', 0.5))
+
+# Opcional: búsqueda completa sobre DOCS de estos archivos (BENCH_FILE_IDS=12,15)
+file_ids = [int(file_id) for file_id in os.getenv('BENCH_FILE_IDS', '').split(',') if file_id.strip()]
+
+# Ruta anterior: texto, metadata y embedding de todos los candidatos
+SEARCH_FULL_QUERY = """
+    SELECT ID, TEXT, METADATA, EMBEDDING
+    FROM DOCS
+    WHERE FILE_ID IN ({file_binds})
+    ORDER BY VECTOR_DISTANCE(EMBEDDING, :embedding, COSINE)
+    FETCH EXACT FIRST :fetch_k ROWS ONLY
+"""
+
+# Ruta nueva: ids y embeddings de los candidatos, texto solo de los k elegidos
+SEARCH_IDS_QUERY = """
+    SELECT ID, EMBEDDING
+    FROM DOCS
+    WHERE FILE_ID IN ({file_binds})
+    ORDER BY VECTOR_DISTANCE(EMBEDDING, :embedding, COSINE)
+    FETCH EXACT FIRST :fetch_k ROWS ONLY
+"""
+
+GET_DOCS_BY_ID_QUERY = """
+    SELECT ID, TEXT, METADATA FROM DOCS WHERE ID IN ({id_binds})
+"""
+
+rng = np.random.default_rng(42)
+
+def timed(function, *args, **kwargs):
+    """Median milliseconds of BENCH_REPEATS calls, and the last result."""
+    times = []
+    for _ in range(repeats):
+        start  = time.perf_counter()
+        result = function(*args, **kwargs)
+        times.append(time.perf_counter() - start)
+    return np.median(times) * 1000, result
+
+def current_mmr(query, rows):
+    # Como antes: una lista de vectores (uno por fila) y el MMR de LangChain
+    return langchain_mmr(query, [np.asarray(row, dtype=np.float32) for row in rows], lambda_mult=lambda_mult, k=top_k)
+
+def vectorized_mmr(query, rows):
+    return maximal_marginal_relevance(query, to_matrix(rows), k=top_k, lambda_mult=lambda_mult)
+
+print(f"[INFO] MMR en memoria: {dimensions} dimensiones, top {top_k}, mediana de {repeats} repeticiones")
+for fetch_k in fetch_ks:
+    query = rng.standard_normal(dimensions).astype(np.float32)
+    rows  = [array.array("f", vector) for vector in rng.standard_normal((fetch_k, dimensions)).astype(np.float32)]
+    current_ms, current     = timed(current_mmr, query, rows)
+    vectorized_ms, selected = timed(vectorized_mmr, query, rows)
+    same = "igual" if list(current) == list(selected) else "DISTINTO"
+    print(f"  fetch_k={fetch_k:<6} langchain {current_ms:>9.2f} ms  vectorizado {vectorized_ms:>8.2f} ms  x{current_ms / vectorized_ms:>6.1f}  selección {same}")
+
+if file_ids:
+    from services.database.connection import Connection
+
+    conn_instance = Connection()
+    binds, params = get_binds("f", file_ids)
+
+    def current_search(cur, vector, fetch_k):
+        cur.arraysize = fetch_k
+        cur.execute(SEARCH_FULL_QUERY.format(file_binds=binds), {**params, "embedding": vector, "fetch_k": fetch_k})
+        rows = cur.fetchall()
+        selected = current_mmr(np.asarray(vector, dtype=np.float32), [row[3] for row in rows])
+        return [rows[i][0] for i in selected]
+
+    def vectorized_search(cur, vector, fetch_k):
+        cur.arraysize = fetch_k
+        cur.execute(SEARCH_IDS_QUERY.format(file_binds=binds), {**params, "embedding": vector, "fetch_k": fetch_k})
+        rows = cur.fetchall()
+        selected = vectorized_mmr(np.asarray(vector, dtype=np.float32), [row[1] for row in rows])
+        id_binds, id_params = get_binds("d", [rows[i][0] for i in selected])
+        cur.execute(GET_DOCS_BY_ID_QUERY.format(id_binds=id_binds), id_params)
+        cur.fetchall()
+        return [rows[i][0] for i in selected]
+
+    with conn_instance.acquire() as conn, conn.cursor() as cur:
+        # Consultas: embeddings guardados de los propios archivos
+        cur.execute(f"""
+            SELECT EMBEDDING FROM DOCS WHERE FILE_ID IN ({binds})
+            ORDER BY DBMS_RANDOM.VALUE FETCH FIRST 5 ROWS ONLY
+        """, params)
+        vectors = [row[0] for row in cur.fetchall()]
+
+        print(f"[INFO] Búsqueda + MMR sobre DOCS de los archivos {file_ids} ({len(vectors)} consultas)")
+        for fetch_k in fetch_ks:
+            current_ms    = np.mean([timed(current_search, cur, vector, fetch_k)[0] for vector in vectors])
+            vectorized_ms = np.mean([timed(vectorized_search, cur, vector, fetch_k)[0] for vector in vectors])
+            print(f"  fetch_k={fetch_k:<6} actual {current_ms:>9.2f} ms  nuevo {vectorized_ms:>9.2f} ms")
+
+    conn_instance.close_connection()
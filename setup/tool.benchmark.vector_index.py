@@ -0,0 +1,181 @@
+import os
+import sys
+import time
+import array
+import threading
+import numpy as np
+import oracledb
+from concurrent.futures import ThreadPoolExecutor
+from dotenv import load_dotenv
+
+# Cambiar al directorio `app/`
+os.chdir(os.path.normpath(os.path.abspath(os.path.join(os.getcwd(), "..", "app"))))
+print(f"[INFO] Directorio actual: {os.getcwd()}")
+
+# Cargar variables de entorno desde .env en `app/`
+env_path = os.path.join(os.getcwd(), ".env")
+load_dotenv(dotenv_path=env_path)
+sys.path.insert(0, os.getcwd())
+
+from services.database.connection import Connection, get_db_config
+from services.database.vector_index import VectorIndexService, DEFAULT_INDEX
+
+# Tamaños del corpus sintético (vectores); hasta 10M con BENCH_CORPUS_SIZES=10000,100000,1000000,10000000
+corpus_sizes = [int(size) for size in os.getenv('BENCH_CORPUS_SIZES', '10000,100000').split(',')]
+dimensions   = int(os.getenv('BENCH_DIMENSIONS', 1024))
+clusters     = int(os.getenv('BENCH_CLUSTERS', 256))
+queries      = int(os.getenv('BENCH_QUERIES', 100))
+top_k        = int(os.getenv('BENCH_TOP_K', 10))
+concurrency  = int(os.getenv('BENCH_CONCURRENCY', 4))
+load_batch   = int(os.getenv('BENCH_LOAD_BATCH', 5000))
+
+# Índices a comparar: ivf[:particiones] y hnsw[:neighbors[:efconstruction]]
+index_configs = os.getenv('BENCH_INDEXES', 'ivf,ivf:1000,hnsw:32:200').split(',')
+accuracies    = [int(accuracy) for accuracy in os.getenv('BENCH_ACCURACIES', '80,90,95,99').split(',')]
+
+BENCH_INDEX_NAME = DEFAULT_INDEX["index_name"]
+
+SEARCH_QUERY = """
+    SELECT ID FROM DOCS
+    ORDER BY VECTOR_DISTANCE(EMBEDDING, :embedding, COSINE)
+    FETCH {mode} FIRST :top_k ROWS ONLY{accuracy}
+"""
+
+conn_instance = Connection()
+index_service = VectorIndexService()
+rng           = np.random.default_rng(42)
+centroids     = rng.standard_normal((clusters, dimensions)).astype(np.float32)
+
+def synthetic_vectors(n):
+    """
+    Vectors around random centroids (clusters, as real embeddings), normalized.
+    """
+    vectors = centroids[rng.integers(0, clusters, n)] + 0.5 * rng.standard_normal((n, dimensions)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+def parse_index(config):
+    parts = config.split(':')
+    if parts[0] == "hnsw":
+        return {
+            "index_type"     : "hnsw",
+            "neighbors"      : int(parts[1]) if len(parts) > 1 else None,
+            "efconstruction" : int(parts[2]) if len(parts) > 2 else None
+        }
+    return {
+        "index_type"          : "ivf",
+        "neighbor_partitions" : int(parts[1]) if len(parts) > 1 else None
+    }
+
+def load_corpus(file_id, size):
+    """
+    Adds synthetic vectors to DOCS (under the benchmark FILE_ID) until the file has size rows.
+    """
+    with conn_instance.acquire() as conn, conn.cursor() as cur:
+        cur.execute("SELECT COUNT(1) FROM DOCS WHERE FILE_ID = :file_id", {"file_id": file_id})
+        loaded = cur.fetchone()[0]
+        start  = time.perf_counter()
+        while loaded < size:
+            n = min(load_batch, size - loaded)
+            cur.setinputsizes(embedding=oracledb.DB_TYPE_VECTOR)
+            cur.executemany("""
+                INSERT INTO DOCS (FILE_ID, TEXT, METADATA, EMBEDDING)
+                VALUES (:file_id, :text, '{}', :embedding)
+            """, [
+                {"file_id": file_id, "text": f"synthetic {loaded + i}", "embedding": array.array("f", vector)}
+                for i, vector in enumerate(synthetic_vectors(n))
+            ])
+            conn.commit()
+            loaded += n
+        print(f"[INFO] Corpus de {size} vectores ({time.perf_counter() - start:.1f} s de carga)")
+
+def search(cur, vector, mode, accuracy=None):
+    cur.execute(
+        SEARCH_QUERY.format(mode=mode, accuracy=f" WITH TARGET ACCURACY {accuracy}" if accuracy else ""),
+        {"embedding": array.array("f", vector), "top_k": top_k}
+    )
+    return [row[0] for row in cur.fetchall()]
+
+def run_queries(query_vectors, mode, accuracy=None):
+    """
+    Runs the queries with BENCH_CONCURRENCY sessions of their own.
+
+    Returns:
+        (list, list, float): ids per query, latency per query (s) and wall time (s).
+    """
+    local = threading.local()
+    sessions = []
+
+    def run(vector):
+        if not hasattr(local, "conn"):
+            local.conn = oracledb.connect(**get_db_config())
+            sessions.append(local.conn)
+        with local.conn.cursor() as cur:
+            start = time.perf_counter()
+            ids = search(cur, vector, mode, accuracy)
+            return ids, time.perf_counter() - start
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        results = list(executor.map(run, query_vectors))
+    wall = time.perf_counter() - start
+    for session in sessions:
+        session.close()
+    return [ids for ids, _ in results], [latency for _, latency in results], wall
+
+def report(label, latencies, wall, recall=None):
+    p50, p95, p99 = np.percentile(np.array(latencies) * 1000, [50, 95, 99])
+    recall = "" if recall is None else f"recall@{top_k} {recall:6.3f}"
+    print(f"  {label:<34} {len(latencies) / wall:>8.1f} QPS  p50 {p50:>7.1f} ms  p95 {p95:>7.1f} ms  p99 {p99:>7.1f} ms  {recall}")
+
+print("[WARN] The benchmark rebuilds the vector index of DOCS; run it on a test deployment.")
+
+# Registro temporal en FILES para los vectores sintéticos
+with conn_instance.acquire() as conn, conn.cursor() as cur:
+    cur.execute("SELECT MIN(MODULE_ID) FROM MODULES WHERE MODULE_VECTOR_STORE = 1")
+    module_id = cur.fetchone()[0]
+    file_id_var = cur.var(int)
+    # FILE_TRG_LANGUAGE es un código NLS de 3 letras como máximo (utils.constants.language_map)
+    cur.execute("""
+        INSERT INTO FILES (MODULE_ID, FILE_SRC_FILE_NAME, FILE_DESCRIPTION, FILE_TRG_LANGUAGE, FILE_STATE)
+        VALUES (:module_id, 'benchmark_vector_index.txt', 'Benchmark vector index', 'gb', 0)
+        RETURNING FILE_ID INTO :file_id
+    """, {"module_id": module_id, "file_id": file_id_var})
+    file_id = file_id_var.getvalue()[0]
+    conn.commit()
+
+try:
+    # Sin índice mientras se carga: la inserción masiva es más rápida
+    index_service.drop_index(BENCH_INDEX_NAME)
+
+    for size in corpus_sizes:
+        load_corpus(file_id, size)
+        query_vectors = synthetic_vectors(queries)
+
+        # Referencia: búsqueda exacta (recall 1.0)
+        exact_ids, latencies, wall = run_queries(query_vectors, "EXACT")
+        print(f"[INFO] {size} vectores, {dimensions} dimensiones, {queries} consultas, top {top_k}")
+        report("exact", latencies, wall)
+
+        for config in index_configs:
+            params  = parse_index(config)
+            seconds = index_service.rebuild_index(BENCH_INDEX_NAME, distance="COSINE", target_accuracy=95, **params)
+            print(f"  [{config}] índice creado en {seconds:.1f} s")
+
+            for accuracy in accuracies:
+                approx_ids, latencies, wall = run_queries(query_vectors, "APPROX", accuracy)
+                recall = np.mean([
+                    len(set(approx) & set(exact)) / max(len(exact), 1)
+                    for approx, exact in zip(approx_ids, exact_ids)
+                ])
+                report(f"{config} accuracy={accuracy}", latencies, wall, recall)
+
+            index_service.drop_index(BENCH_INDEX_NAME)
+
+finally:
+    with conn_instance.acquire() as conn, conn.cursor() as cur:
+        cur.execute("DELETE FROM DOCS WHERE FILE_ID = :file_id", {"file_id": file_id})
+        cur.execute("DELETE FROM FILES WHERE FILE_ID = :file_id", {"file_id": file_id})
+        conn.commit()
+    print(f"[INFO] Restaurando {BENCH_INDEX_NAME}")
+    index_service.restore_default_index()
+    conn_instance.close_connection()